@@ -1,21 +1,48 @@
 from .config import (
     ASYNC_DATABASE_URL,
+    REPLICA_ASYNC_DATABASE_URL, READ_YOUR_WRITES_SECONDS,
+    INVALIDATION_BUS, INVALIDATION_CHANNEL,
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING, DB_STATEMENT_CACHE_SIZE,
     LOG_LEVEL, LOG_FORMAT, LOG_FILE, LOG_MAX_SIZE, LOG_BACKUP_COUNT,
-    SECRET_KEY, ACCESS_TOKEN_EXPIRE_MINUTES, ALGORITHM,
+    LOG_QUEUE_ENABLED, LOG_QUEUE_SIZE, LOG_QUEUE_POLICY, LOG_SAMPLING,
+    SECRET_KEY, ACCESS_TOKEN_EXPIRE_MINUTES, ALGORITHM, TOKEN_CACHE_SIZE,
+    REFRESH_TOKEN_EXPIRE_DAYS,
     PASSWORD_HASH_ROUNDS, PASSWORD_SALT_SIZE,
+    PASSWORD_HASH_CONCURRENCY, PASSWORD_HASH_QUEUE_LIMIT,
+    PASSWORD_HASH_TARGET_MS,
     DOCS_USERNAME, DOCS_PASSWORD,
-    COUNT_REVIEWERS_FOR_PR
+    COUNT_REVIEWERS_FOR_PR, PR_BATCH_MAX_SIZE,
+    PR_GROUP_COMMIT_ENABLED, PR_GROUP_COMMIT_WAIT_MS, PR_GROUP_COMMIT_MAX_ITEMS,
+    REVIEWER_ASSIGNMENT_STRATEGY, REVIEWER_MAX_OPEN_REVIEWS,
+    REVIEWER_LOAD_TTL_SECONDS,
+    TEAM_ROSTER_CACHE_SIZE, TEAM_ROSTER_CACHE_TTL_SECONDS,
+    REVIEW_PAGE_SIZE, REVIEW_PAGE_MAX_SIZE,
 )
 from .logging import get_app_logger
 from .lprint import lprint
 
 __all__ = [
     "ASYNC_DATABASE_URL",
+    "REPLICA_ASYNC_DATABASE_URL", "READ_YOUR_WRITES_SECONDS",
+    "INVALIDATION_BUS", "INVALIDATION_CHANNEL",
+    "DB_POOL_SIZE", "DB_MAX_OVERFLOW", "DB_POOL_TIMEOUT", "DB_POOL_RECYCLE",
+    "DB_POOL_PRE_PING", "DB_STATEMENT_CACHE_SIZE",
     "LOG_LEVEL", "LOG_FORMAT", "LOG_FILE", "LOG_MAX_SIZE", "LOG_BACKUP_COUNT",
-    "SECRET_KEY", "ACCESS_TOKEN_EXPIRE_MINUTES", "ALGORITHM",
+    "LOG_QUEUE_ENABLED", "LOG_QUEUE_SIZE", "LOG_QUEUE_POLICY", "LOG_SAMPLING",
+    "SECRET_KEY", "ACCESS_TOKEN_EXPIRE_MINUTES", "ALGORITHM", "TOKEN_CACHE_SIZE",
+    "REFRESH_TOKEN_EXPIRE_DAYS",
     "PASSWORD_HASH_ROUNDS", "PASSWORD_SALT_SIZE",
+    "PASSWORD_HASH_CONCURRENCY", "PASSWORD_HASH_QUEUE_LIMIT",
+    "PASSWORD_HASH_TARGET_MS",
     "DOCS_USERNAME", "DOCS_PASSWORD",
-    "COUNT_REVIEWERS_FOR_PR",
+    "COUNT_REVIEWERS_FOR_PR", "PR_BATCH_MAX_SIZE",
+    "PR_GROUP_COMMIT_ENABLED", "PR_GROUP_COMMIT_WAIT_MS",
+    "PR_GROUP_COMMIT_MAX_ITEMS",
+    "REVIEWER_ASSIGNMENT_STRATEGY", "REVIEWER_MAX_OPEN_REVIEWS",
+    "REVIEWER_LOAD_TTL_SECONDS",
+    "TEAM_ROSTER_CACHE_SIZE", "TEAM_ROSTER_CACHE_TTL_SECONDS",
+    "REVIEW_PAGE_SIZE", "REVIEW_PAGE_MAX_SIZE",
     "get_app_logger",
     "lprint",
 ]
@@ -15,6 +15,32 @@ DB_PORT = str(os.getenv("db_port", "5432"))
 ASYNC_DATABASE_URL = (f"postgresql+asyncpg://"
                       f"{DB_USER_NAME}:{DB_PASSWORD}"
                       f"@{DB_HOST}:{DB_PORT}/{DB_NAME}")
+# Реплика только для чтения, без replica_db_host чтение идёт в основную БД
+REPLICA_DB_HOST = os.getenv("replica_db_host")
+REPLICA_DB_PORT = str(os.getenv("replica_db_port", DB_PORT))
+REPLICA_DB_NAME = str(os.getenv("replica_db_name", DB_NAME))
+REPLICA_DB_USER_NAME = str(os.getenv("replica_db_user_name", DB_USER_NAME))
+REPLICA_DB_PASSWORD = str(os.getenv("replica_db_password", DB_PASSWORD))
+REPLICA_ASYNC_DATABASE_URL = (f"postgresql+asyncpg://"
+                              f"{REPLICA_DB_USER_NAME}:{REPLICA_DB_PASSWORD}"
+                              f"@{REPLICA_DB_HOST}:{REPLICA_DB_PORT}"
+                              f"/{REPLICA_DB_NAME}") if REPLICA_DB_HOST else None
+# Сколько секунд после записи чтения пользователя идут в основную БД
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+# Шина сброса кэшей между воркерами: inprocess или postgres (LISTEN/NOTIFY)
+INVALIDATION_BUS = str(os.getenv("INVALIDATION_BUS", "inprocess")).lower()
+INVALIDATION_CHANNEL = str(os.getenv("INVALIDATION_CHANNEL",
+                                     "pr_service_invalidation"))
+# Пул соединений
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+# Сколько секунд ждать свободное соединение, прежде чем упасть с TimeoutError
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Через сколько секунд пересоздавать соединение, -1 - никогда
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = str(os.getenv("DB_POOL_PRE_PING", "true")).lower() == "true"
+# Кэш подготовленных выражений asyncpg, 0 - для pgbouncer в режиме transaction
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
 
 TEST_DB_NAME = str(os.getenv("test_db_name"))
 TEST_DB_USER_NAME = str(os.getenv("test_db_user_name"))
@@ -24,6 +50,16 @@ TEST_DB_PORT = str(os.getenv("test_db_port", "5431"))
 TEST_ASYNC_DATABASE_URL = (f"postgresql+asyncpg://"
                            f"{TEST_DB_USER_NAME}:{TEST_DB_PASSWORD}"
                            f"@{TEST_DB_HOST}:{TEST_DB_PORT}/{TEST_DB_NAME}")
+# Роль только для чтения в тестовой БД, изображает реплику
+TEST_REPLICA_DB_USER_NAME = str(os.getenv("test_replica_db_user_name",
+                                          "pr_test_reader"))
+TEST_REPLICA_DB_PASSWORD = str(os.getenv("test_replica_db_password",
+                                         "pr_reader_pass"))
+TEST_REPLICA_ASYNC_DATABASE_URL = (
+    f"postgresql+asyncpg://"
+    f"{TEST_REPLICA_DB_USER_NAME}:{TEST_REPLICA_DB_PASSWORD}"
+    f"@{TEST_DB_HOST}:{TEST_DB_PORT}/{TEST_DB_NAME}"
+)
 
 # Logging configuration
 LOG_LEVEL = str(os.getenv("LOG_LEVEL", "INFO")).upper()
@@ -31,18 +67,42 @@ LOG_FORMAT = str(os.getenv("LOG_FORMAT", "detailed"))
 LOG_FILE = str(os.getenv("LOG_FILE", "logs/app.log"))
 LOG_MAX_SIZE = int(os.getenv("LOG_MAX_SIZE", "10485760"))
 LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+# Запись логов в фоновом потоке через очередь: размер очереди и что делать,
+# когда она полна (drop - выбросить запись, block - ждать место)
+LOG_QUEUE_ENABLED = str(os.getenv("LOG_QUEUE_ENABLED", "false")).lower() == "true"
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_QUEUE_POLICY = str(os.getenv("LOG_QUEUE_POLICY", "drop")).lower()
+# Доля записей ниже WARNING, которые попадают в лог, по имени логгера или
+# модуля: "team_repository=0.01,uvicorn.access=0.1"
+LOG_SAMPLING = {
+    name.strip(): float(rate)
+    for name, rate in (
+        item.split("=", 1)
+        for item in os.getenv("LOG_SAMPLING", "").split(",") if item.strip()
+    )
+}
 
 # Security configuration
 ADMIN_AUTO_CREATED_PASSWORD = str(os.getenv("ADMIN_AUTO_CREATED_PASSWORD"))
 # Password hashing and encryption
 PASSWORD_HASH_ROUNDS = str(os.getenv("PASSWORD_HASH_ROUNDS"))
 PASSWORD_SALT_SIZE = str(os.getenv("PASSWORD_SALT_SIZE"))
+# Сколько хешей bcrypt считать одновременно и сколько может ждать в очереди
+PASSWORD_HASH_CONCURRENCY = int(os.getenv("PASSWORD_HASH_CONCURRENCY", "4"))
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "64"))
+# Целевое время одного хеша: при старте подбирается стоимость bcrypt
+# (0 - не калибровать, PASSWORD_HASH_ROUNDS=auto - взять подобранную)
+PASSWORD_HASH_TARGET_MS = float(os.getenv("PASSWORD_HASH_TARGET_MS", "0"))
 # JWT configuration
 SECRET_KEY = str(os.getenv("jwt_auth_key"))
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv(
-    "ACCESS_TOKEN_EXPIRE_MINUTES", "11520")  # 8 days
+    "ACCESS_TOKEN_EXPIRE_MINUTES", "15")
 )
+# Новые access-токены выдаются по refresh-токену без логина
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
 ALGORITHM = str(os.getenv("ALGORITHM", "HS256"))
+# Сколько проверенных токенов держать в памяти, 0 - не кэшировать
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
 
 # Documentation access credentials
 DOCS_USERNAME = str(os.getenv("DOCS_USERNAME"))
@@ -50,3 +110,31 @@ DOCS_PASSWORD = str(os.getenv("DOCS_PASSWORD"))
 
 
 COUNT_REVIEWERS_FOR_PR = int(os.getenv("COUNT_REWIEWEERS_FOR_PR", "2"))
+# Максимум PR в одном запросе /pullRequest/createBatch и mergeBatch
+PR_BATCH_MAX_SIZE = int(os.getenv("PR_BATCH_MAX_SIZE", "500"))
+# Групповая запись /pullRequest/create: создания, пришедшие за
+# PR_GROUP_COMMIT_WAIT_MS, но не больше PR_GROUP_COMMIT_MAX_ITEMS,
+# пишутся одной транзакцией
+PR_GROUP_COMMIT_ENABLED = str(os.getenv(
+    "PR_GROUP_COMMIT_ENABLED", "false")
+).lower() == "true"
+PR_GROUP_COMMIT_WAIT_MS = float(os.getenv("PR_GROUP_COMMIT_WAIT_MS", "2"))
+PR_GROUP_COMMIT_MAX_ITEMS = int(os.getenv("PR_GROUP_COMMIT_MAX_ITEMS", "64"))
+# Стратегия выбора ревьюеров: random, round_robin, least_open_reviews
+REVIEWER_ASSIGNMENT_STRATEGY = str(os.getenv(
+    "REVIEWER_ASSIGNMENT_STRATEGY", "random")
+).lower()
+# Максимум открытых ревью на пользователя, 0 - без ограничения.
+# Нагрузка учитывается в памяти каждого воркера, назначения других
+# воркеров видны после перечитывания (REVIEWER_LOAD_TTL_SECONDS)
+REVIEWER_MAX_OPEN_REVIEWS = int(os.getenv("REVIEWER_MAX_OPEN_REVIEWS", "0"))
+# Через сколько секунд перечитывать нагрузку команды из БД
+REVIEWER_LOAD_TTL_SECONDS = int(os.getenv("REVIEWER_LOAD_TTL_SECONDS", "60"))
+# Кэш составов команд: сколько команд держать и сколько секунд
+TEAM_ROSTER_CACHE_SIZE = int(os.getenv("TEAM_ROSTER_CACHE_SIZE", "1024"))
+TEAM_ROSTER_CACHE_TTL_SECONDS = float(os.getenv(
+    "TEAM_ROSTER_CACHE_TTL_SECONDS", "30")
+)
+# Размер страницы /users/getReview по умолчанию и максимальный
+REVIEW_PAGE_SIZE = int(os.getenv("REVIEW_PAGE_SIZE", "50"))
+REVIEW_PAGE_MAX_SIZE = int(os.getenv("REVIEW_PAGE_MAX_SIZE", "200"))
@@ -1,12 +1,298 @@
+import atexit
+import copy
+import json
 import logging
 import logging.config
+import logging.handlers
+import queue
+import random
+import threading
+import time
+from contextvars import ContextVar
 from pathlib import Path
 
 from app.core.config import (
     LOG_LEVEL, LOG_FORMAT, LOG_MAX_SIZE,
     LOG_FILE, LOG_BACKUP_COUNT,
+    LOG_QUEUE_ENABLED, LOG_QUEUE_SIZE, LOG_QUEUE_POLICY, LOG_SAMPLING,
 )
 
+# Поля текущего запроса для логов, заполняет RequestContextMiddleware.
+# Словарь изменяемый: зависимости в пуле потоков дописывают в него user_id.
+request_log_context: ContextVar[dict | None] = ContextVar(
+    "request_log_context", default=None
+)
+
+
+def bind_log_context(**fields):
+    """Добавляет поля к контексту текущего запроса, вне запроса ничего"""
+    context = request_log_context.get()
+    if context is not None:
+        context.update(fields)
+
+
+def get_log_context() -> dict | None:
+    """Снимок полей запроса для записи лога"""
+    context = request_log_context.get()
+    if context is None:
+        return None
+    route = context["scope"].get("route")
+    return {
+        "request_id": context["request_id"],
+        "method": context["method"],
+        "route": getattr(route, "path", context["path"]),
+        "user_id": context.get("user_id"),
+        "duration_ms": round(
+            (time.perf_counter() - context["started"]) * 1000, 3
+        ),
+    }
+
+
+class MoscowTimeFormatter(logging.Formatter):
+    """Время записей по Москве (UTC+3) независимо от часового пояса сервера"""
+
+    @staticmethod
+    def converter(timestamp: float) -> time.struct_time:
+        return time.gmtime(timestamp + 3 * 60 * 60)
+
+
+class JsonFormatter(MoscowTimeFormatter):
+    """Запись лога одной строкой JSON
+
+    Собирается через json.dumps, поэтому кавычки и переводы строк
+    в сообщении не ломают строку. Поля запроса берутся из записи
+    (их кладёт RequestContextFilter в потоке, где запись создана).
+    """
+
+    # json.dumps с параметрами создаёт кодировщик на каждый вызов
+    encoder = json.JSONEncoder(ensure_ascii=False, default=str)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (секунда, строка) одним кортежем: форматтер общий для потоков
+        # слушателей, а кортеж заменяется целиком
+        self._cached_time = (None, "")
+
+    def formatTime(self, record: logging.LogRecord, datefmt=None) -> str:
+        # без миллисекунд строка меняется раз в секунду
+        if datefmt is None:
+            return super().formatTime(record, datefmt)
+        second = int(record.created)
+        cached_second, timestamp = self._cached_time
+        if second != cached_second:
+            timestamp = super().formatTime(record, datefmt)
+            self._cached_time = (second, timestamp)
+        return timestamp
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": self.formatTime(record, self.datefmt),
+            "logger": record.name,
+            "level": record.levelname,
+            "function": record.funcName,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        context = getattr(record, "request_context", None)
+        if context:
+            entry.update(context)
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return self.encoder.encode(entry)
+
+
+class RequestContextFilter(logging.Filter):
+    """Запоминает в записи поля текущего запроса
+
+    Нужен на обработчике, а не в форматтере: с очередью логов запись
+    форматируется в другом потоке, где контекста запроса уже нет.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_context"):
+            record.request_context = get_log_context()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Пропускает только долю записей ниже WARNING
+
+    Доля задаётся по имени модуля (team_repository) или логгера
+    (uvicorn.access, учитываются и родительские). Решение сохраняется
+    в записи, чтобы консоль и файл выбросили одни и те же записи.
+    """
+
+    def __init__(self, rates: dict[str, float] | None = None):
+        super().__init__()
+        self.rates = dict(LOG_SAMPLING if rates is None else rates)
+        self._resolved: dict[tuple[str, str], float] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        sampled = getattr(record, "sampled", None)
+        if sampled is None:
+            sampled = (record.levelno >= logging.WARNING
+                       or random.random() < self.rate_for(record))
+            record.sampled = sampled
+        return sampled
+
+    def rate_for(self, record: logging.LogRecord) -> float:
+        key = (record.name, record.module)
+        rate = self._resolved.get(key)
+        if rate is None:
+            rate = self.rates.get(record.module)
+            name = record.name
+            while rate is None and name:
+                rate = self.rates.get(name)
+                name = name.rpartition(".")[0]
+            rate = 1.0 if rate is None else rate
+            self._resolved[key] = rate
+        return rate
+
+
+# traceback для записей очереди форматируется в потоке, где он возник
+_exception_formatter = logging.Formatter()
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """Кладёт запись в ограниченную очередь вместо записи на месте
+
+    При полной очереди запись выбрасывается (block=False) или поток
+    ждёт, пока фоновая запись освободит место (block=True).
+    """
+
+    def __init__(self, maxsize: int, block: bool):
+        super().__init__(queue.Queue(maxsize))
+        self.block = block
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Копия записи, которую можно отформатировать в другом потоке
+
+        Стандартный prepare вклеивает traceback в msg и убирает exc_info,
+        и JsonFormatter уже не видит исключения. Здесь в копии только
+        подставляются аргументы сообщения, а traceback сохраняется
+        в exc_text, который форматтеры выводят сами; stack_info остаётся.
+        """
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _exception_formatter.formatException(
+                record.exc_info
+            )
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        if self.block:
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+
+class DrainingQueueListener(logging.handlers.QueueListener):
+    """QueueListener, который при остановке дописывает всю очередь
+
+    Стандартный кладёт маркер остановки через put_nowait и падает
+    на полной очереди.
+    """
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class LogQueue:
+    """Запись логов в фоновых потоках вместо event loop
+
+    Каждый настоящий обработчик (консоль, файлы) получает свою очередь
+    и поток-слушатель, а в логгерах его место занимает BoundedQueueHandler
+    с тем же уровнем. Маршрутизация логгер -> обработчики не меняется.
+    """
+
+    POLICIES = ("drop", "block")
+
+    def __init__(self, maxsize: int = LOG_QUEUE_SIZE,
+                 policy: str = LOG_QUEUE_POLICY):
+        if policy not in self.POLICIES:
+            raise RuntimeError(
+                f"Unknown log queue policy '{policy}', "
+                f"expected one of: {', '.join(self.POLICIES)}"
+            )
+        self.maxsize = maxsize
+        self.policy = policy
+        self._queued: dict[logging.Handler, BoundedQueueHandler] = {}
+        self._listeners: list[DrainingQueueListener] = []
+        self._loggers: list[logging.Logger] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._listeners)
+
+    def install(self, loggers: list[logging.Logger]):
+        """Подменяет обработчики логгеров очередями и запускает слушателей"""
+        for logger in loggers:
+            logger.handlers = [self._wrap(handler) for handler in logger.handlers]
+            self._loggers.append(logger)
+        for listener in self._listeners:
+            listener.start()
+
+    def stop(self):
+        """Возвращает прежние обработчики и дописывает накопленное"""
+        originals = {queued: handler for handler, queued in self._queued.items()}
+        for handler, queued in self._queued.items():
+            handler.filters = queued.filters
+        for logger in self._loggers:
+            logger.handlers = [originals.get(handler, handler)
+                               for handler in logger.handlers]
+        for listener in self._listeners:
+            listener.stop()
+        self._listeners.clear()
+        self._loggers.clear()
+        self._queued.clear()
+
+    def stats(self) -> dict:
+        handlers = {
+            handler.get_name() or type(handler).__name__: {
+                "queued": queued.queue.qsize(),
+                "dropped": queued.dropped,
+            }
+            for handler, queued in self._queued.items()
+        }
+        return {
+            "enabled": self.running,
+            "policy": self.policy,
+            "queue_size": self.maxsize,
+            "dropped": sum(item["dropped"] for item in handlers.values()),
+            "handlers": handlers,
+        }
+
+    def _wrap(self, handler: logging.Handler) -> logging.Handler:
+        if isinstance(handler, BoundedQueueHandler):
+            return handler
+        queued = self._queued.get(handler)
+        if queued is None:
+            queued = BoundedQueueHandler(self.maxsize,
+                                         block=self.policy == "block")
+            queued.setLevel(handler.level)
+            # фильтры (выборка, поля запроса) работают в потоке записи
+            queued.filters, handler.filters = handler.filters, []
+            self._queued[handler] = queued
+            self._listeners.append(DrainingQueueListener(
+                queued.queue, handler, respect_handler_level=True
+            ))
+        return queued
+
 
 class LoggingConfig:
     """Класс для настройки логирования"""
@@ -25,15 +311,11 @@ class LoggingConfig:
         """Возвращает конфигурацию логирования"""
 
         # Форматы логов
+        # место вызова берётся из записи, lprint не разбирает стек сам
+        caller = "[%(asctime)s] %(filename)s:%(funcName)s - %(message)s"
         formats = {
-            "simple": "%(levelname)s - %(message)s",
-            "detailed": "%(name)s - %(levelname)s - %(message)s",
-            "json": '{"timestamp": "%(asctime)s", '
-                    '"logger": "%(name)s", '
-                    '"level": "%(levelname)s", '
-                    '"function": "%(funcName)s", '
-                    '"line": %(lineno)d, '
-                    '"message": "%(message)s"}'
+            "simple": "%(levelname)s - " + caller,
+            "detailed": "%(name)s - %(levelname)s - " + caller,
         }
 
         config = {
@@ -41,28 +323,41 @@ class LoggingConfig:
             "disable_existing_loggers": False,
             "formatters": {
                 "simple": {
-                    "format": formats["simple"]
+                    "()": MoscowTimeFormatter,
+                    "format": formats["simple"],
+                    "datefmt": "%Y-%m-%d %H:%M:%S"
                 },
                 "detailed": {
+                    "()": MoscowTimeFormatter,
                     "format": formats["detailed"],
                     "datefmt": "%Y-%m-%d %H:%M:%S"
                 },
                 "json": {
-                    "format": formats["json"],
+                    "()": JsonFormatter,
                     "datefmt": "%Y-%m-%d %H:%M:%S"
                 }
             },
+            "filters": {
+                "sampling": {
+                    "()": SamplingFilter,
+                },
+                "request_context": {
+                    "()": RequestContextFilter,
+                },
+            },
             "handlers": {
                 "console": {
                     "class": "logging.StreamHandler",
                     "level": self.log_level,
                     "formatter": self.log_format,
+                    "filters": ["sampling", "request_context"],
                     "stream": "ext://sys.stdout"
                 },
                 "file": {
                     "class": "logging.handlers.RotatingFileHandler",
                     "level": self.log_level,
                     "formatter": self.log_format,
+                    "filters": ["sampling", "request_context"],
                     "filename": self.log_file,
                     "maxBytes": self.max_file_size,
                     "backupCount": self.backup_count,
@@ -72,6 +367,7 @@ class LoggingConfig:
                     "class": "logging.handlers.RotatingFileHandler",
                     "level": "ERROR",
                     "formatter": self.log_format,
+                    "filters": ["sampling", "request_context"],
                     "filename": str(Path(self.log_file).parent / "error.log"),
                     "maxBytes": self.max_file_size,
                     "backupCount": self.backup_count,
@@ -122,7 +418,16 @@ class LoggingConfig:
     def setup_logging(self):
         """Настраивает логирование"""
         config = self.get_logging_config()
+        log_queue.stop()
         logging.config.dictConfig(config)
+        if LOG_QUEUE_ENABLED:
+            log_queue.install([logging.getLogger(name)
+                               for name in config["loggers"]])
+
+
+log_queue = LogQueue()
+# при выходе без lifespan (скрипты, миграции) очередь тоже дописывается
+atexit.register(log_queue.stop)
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -1,27 +1,33 @@
 import datetime
-import inspect
+import logging
 
 from app.core.config import get_app_logger
 
 
+class LazyMessage:
+    """Текст и аргументы lprint, склеиваются только при записи в лог"""
+
+    __slots__ = ("text", "args")
+
+    def __init__(self, text, args: tuple):
+        self.text = text
+        self.args = args
+
+    def __str__(self) -> str:
+        if not self.args:
+            return str(self.text)
+        return " ".join(map(str, (self.text, *self.args)))
+
+
 class lprint:
-    """логгер для приложения"""
+    """логгер для приложения
 
-    logger = get_app_logger()
+    Если уровень выключен, вызов сразу возвращается: ни форматирования,
+    ни разбора стека. Время и место вызова (filename, funcName) добавляет
+    форматтер из записи logging, stacklevel указывает на вызывающий код.
+    """
 
-    @classmethod
-    def _log(cls, level, text, *args):
-        """Универсальный метод логирования"""
-        moscow_time = (datetime.datetime.now(datetime.timezone.utc)
-                       + datetime.timedelta(hours=3))
-        time_str = moscow_time.strftime("%Y-%m-%d %H:%M:%S")
-        frame = inspect.currentframe().f_back.f_back
-        caller = (f"{frame.f_code.co_filename.split('\\')[-1]}"
-                  f":{frame.f_code.co_name}")
-        message = f"[{time_str}] {caller} - {text}"
-        if args:
-            message += " " + " ".join(map(str, args))
-        getattr(cls.logger, level)(message)
+    logger = get_app_logger()
 
     @classmethod
     def init(cls):
@@ -31,24 +37,29 @@ class lprint:
     @classmethod
     def debug(cls, text, *args):
         """Debug уровень"""
-        cls._log("debug", text, *args)
+        if cls.logger.isEnabledFor(logging.DEBUG):
+            cls.logger.debug("%s", LazyMessage(text, args), stacklevel=2)
 
     @classmethod
     def info(cls, text, *args):
         """Info уровень"""
-        cls._log("info", text, *args)
+        if cls.logger.isEnabledFor(logging.INFO):
+            cls.logger.info("%s", LazyMessage(text, args), stacklevel=2)
 
     @classmethod
     def warning(cls, text, *args):
         """Warning уровень"""
-        cls._log("warning", text, *args)
+        if cls.logger.isEnabledFor(logging.WARNING):
+            cls.logger.warning("%s", LazyMessage(text, args), stacklevel=2)
 
     @classmethod
     def error(cls, text, *args):
         """Error уровень"""
-        cls._log("error", text, *args)
+        if cls.logger.isEnabledFor(logging.ERROR):
+            cls.logger.error("%s", LazyMessage(text, args), stacklevel=2)
 
     @classmethod
     def critical(cls, text, *args):
         """Critical уровень"""
-        cls._log("critical", text, *args)
+        if cls.logger.isEnabledFor(logging.CRITICAL):
+            cls.logger.critical("%s", LazyMessage(text, args), stacklevel=2)
@@ -1,9 +1,21 @@
-from .access_token import create_jwt_token, get_user_info_by_token
+from .access_token import (
+    create_jwt_token, get_user_info_by_token,
+    create_refresh_token, decode_refresh_token,
+)
 from .password import PasswordUtils
+from .password_hasher import (
+    PasswordHasherBusyError, password_hasher,
+)
 from .rbac import PermissionChecker
+from .token_cache import token_cache
+from .token_revocation import token_revocation
 
 __all__ = [
     "create_jwt_token", "get_user_info_by_token",
+    "create_refresh_token", "decode_refresh_token",
     "PasswordUtils",
+    "PasswordHasherBusyError", "password_hasher",
     "PermissionChecker",
+    "token_cache",
+    "token_revocation",
 ]
@@ -1,3 +1,4 @@
+import uuid
 from datetime import timedelta, datetime, UTC
 
 import jwt
@@ -5,27 +6,66 @@ from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
 
 from app.core.config import (
-    ACCESS_TOKEN_EXPIRE_MINUTES,
+    ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS,
     SECRET_KEY, ALGORITHM, lprint,
 )
+from app.core.config.logging import bind_log_context
+from app.core.security.token_cache import token_cache
+from app.core.security.token_revocation import token_revocation
 from app.schemas import UserTokenData
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
 
-def create_jwt_token(data: UserTokenData) -> str:
+
+def create_jwt_token(data: UserTokenData, generation: int = 0) -> str:
     to_encode = data.model_dump()
 
     time_now = datetime.now(UTC)
-    to_encode.update({"iat": time_now})
+    to_encode.update({"iat": time_now, "type": ACCESS_TOKEN_TYPE,
+                      "gen": generation})
     expire = time_now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    lprint.debug(to_encode)
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    lprint.debug("JWT token created:", encoded_jwt)
+    # сам токен в лог не пишем: по нему можно войти
+    lprint.debug("JWT token created for user", data.id)
     return encoded_jwt
 
 
+def create_refresh_token(data: UserTokenData, family_id: uuid.UUID | None = None,
+                         generation: int = 0) -> tuple[str, dict]:
+    """Refresh-токен с данными пользователя, чтобы обновление не читало БД
+
+    Возвращает токен и его payload (jti, family, exp нужны для записи в БД).
+    """
+    time_now = datetime.now(UTC)
+    payload = data.model_dump(mode="json")
+    payload.update({
+        "type": REFRESH_TOKEN_TYPE,
+        "jti": str(uuid.uuid4()),
+        "family": str(family_id or uuid.uuid4()),
+        "gen": generation,
+        "iat": time_now,
+        "exp": time_now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    })
+    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM), payload
+
+
+def decode_refresh_token(token: str) -> dict:
+    """Проверяет подпись и срок refresh-токена, ValueError - токен не годится"""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except jwt.ExpiredSignatureError:
+        raise ValueError("Refresh token has expired")
+    except jwt.InvalidTokenError:
+        raise ValueError("Could not validate refresh token")
+    if payload.get("type") != REFRESH_TOKEN_TYPE:
+        raise ValueError("Could not validate refresh token")
+    return payload
+
+
 def decode_jwt_token(
         token: str | None = Depends(oauth2_scheme),
 ) -> dict:
@@ -37,9 +77,8 @@ def decode_jwt_token(
         )
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except jwt.ExpiredSignatureError:
-        # потом можно сделать автообновление токена
+        # клиент обновляет токен через /auth/refresh
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token has expired",
@@ -57,11 +96,42 @@ def decode_jwt_token(
             detail="Could not validate token",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    # refresh-токен не годится как access
+    if payload.get("type", ACCESS_TOKEN_TYPE) != ACCESS_TOKEN_TYPE:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return payload
 
 
 def get_user_info_by_token(
-        payload: dict = Depends(decode_jwt_token)
+        token: str | None = Depends(oauth2_scheme)
 ) -> UserTokenData:
-    """Получение информации о пользователе из токена"""
+    """Получение информации о пользователе из токена
+
+    Проверенные токены кэшируются до их exp, повторная проверка подписи
+    и валидация payload нужны только при промахе. Отзыв токенов сбрасывает
+    записи пользователя из кэша, поэтому проверка отзыва тоже только тут.
+    Пока номера поколений перечитываются из БД, кэш не используется.
+    """
+    use_cache = not token_revocation.reloading
+    if token and use_cache:
+        user_data = token_cache.get(token)
+        if user_data is not None:
+            bind_log_context(user_id=user_data.id)
+            return user_data
+    payload = decode_jwt_token(token)
     user_data = UserTokenData.model_validate(payload)
+    # токены деактивированного пользователя отозваны
+    if token_revocation.is_revoked(user_data.id, payload.get("gen", 0)):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if use_cache:
+        token_cache.put(token, user_data, payload.get("exp"))
+    bind_log_context(user_id=user_data.id)
     return user_data
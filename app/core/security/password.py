@@ -1,14 +1,23 @@
 import base64
 import secrets
+import time
 
 import bcrypt
 
 from app.core.config import lprint, PASSWORD_HASH_ROUNDS, PASSWORD_SALT_SIZE
 
 
+# стоимость bcrypt по умолчанию, пока PASSWORD_HASH_ROUNDS=auto не откалиброван
+DEFAULT_HASH_ROUNDS = 12
+
+
 class PasswordUtils:
     """Утилита для хеширования и проверки паролей"""
 
+    # текущая стоимость для новых хешей
+    rounds: int = (int(PASSWORD_HASH_ROUNDS) if PASSWORD_HASH_ROUNDS.isdigit()
+                   else DEFAULT_HASH_ROUNDS)
+
     @classmethod
     def generate_salt(cls, size: int = None) -> bytes:
         """Генерирует криптографически стойкую соль
@@ -37,7 +46,7 @@ class PasswordUtils:
             соль в виде строки в base64)
         """
         try:
-            rounds = rounds or int(PASSWORD_HASH_ROUNDS)
+            rounds = rounds or cls.rounds
 
             salt = cls.generate_salt()
             salt_str = base64.b64encode(salt).decode('utf-8')
@@ -76,3 +85,46 @@ class PasswordUtils:
         except Exception as e:
             lprint.error(f"Error verifying password: {e}")
             return False
+
+    @classmethod
+    def get_rounds(cls, stored_hash: str) -> int | None:
+        """Стоимость, с которой посчитан хеш ($2b$<rounds>$...)"""
+        try:
+            return int(stored_hash.split("$")[2])
+        except (AttributeError, IndexError, ValueError):
+            return None
+
+    @classmethod
+    def needs_rehash(cls, stored_hash: str) -> bool:
+        """Хеш посчитан не с текущей стоимостью"""
+        return cls.get_rounds(stored_hash) != cls.rounds
+
+    @classmethod
+    def measure_hash_ms(cls, rounds: int, samples: int = 1) -> float:
+        """Время одного хеша с заданной стоимостью, лучшее из samples"""
+        best = float("inf")
+        for _ in range(samples):
+            started = time.perf_counter()
+            bcrypt.hashpw(b"calibration", bcrypt.gensalt(rounds=rounds))
+            best = min(best, time.perf_counter() - started)
+        return best * 1000
+
+    @classmethod
+    def calibrate_rounds(cls, target_ms: float, min_rounds: int = 4,
+                         max_rounds: int = 16, samples: int = 3
+                         ) -> tuple[int, float]:
+        """Наибольшая стоимость, при которой хеш укладывается в target_ms
+
+        Каждый раунд удваивает время, поэтому стоимость поднимается, пока
+        удвоенный замер укладывается в цель. Замер - реальный хеш на этой
+        машине, а не экстраполяция. Меньше min_rounds не опускается.
+
+        Returns:
+            tuple[int, float]: (стоимость, время хеша с ней в мс)
+        """
+        rounds = min_rounds
+        elapsed_ms = cls.measure_hash_ms(rounds, samples)
+        while rounds < max_rounds and elapsed_ms * 2 <= target_ms:
+            rounds += 1
+            elapsed_ms = cls.measure_hash_ms(rounds, samples)
+        return rounds, elapsed_ms
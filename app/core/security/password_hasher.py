@@ -0,0 +1,138 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+from app.core.config import (
+    PASSWORD_HASH_CONCURRENCY, PASSWORD_HASH_QUEUE_LIMIT,
+    PASSWORD_HASH_ROUNDS, PASSWORD_HASH_TARGET_MS, lprint,
+)
+from app.core.security.password import PasswordUtils
+
+
+class PasswordHasherBusyError(RuntimeError):
+    """Очередь на хеширование переполнена, запрос отклонён сразу"""
+
+
+class PasswordHasher:
+    """bcrypt в отдельном пуле потоков с ограничением очереди
+
+    bcrypt отпускает GIL, поэтому хеширование в потоках не блокирует
+    event loop. Одновременно выполняется не больше concurrency хешей,
+    ждать своей очереди могут не больше queue_limit, остальные получают
+    PasswordHasherBusyError (503), а не копятся в очереди.
+    """
+
+    def __init__(self, concurrency: int = PASSWORD_HASH_CONCURRENCY,
+                 queue_limit: int = PASSWORD_HASH_QUEUE_LIMIT):
+        self.concurrency = concurrency
+        self.queue_limit = queue_limit
+        self._executor = ThreadPoolExecutor(max_workers=concurrency,
+                                            thread_name_prefix="bcrypt")
+        self._lock = Lock()
+        self._in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.max_queue_depth = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._hash_total = 0.0
+        self._hash_max = 0.0
+        self.calibration: dict | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        """Сколько запросов ждёт свободный поток"""
+        return max(0, self._in_flight - self.concurrency)
+
+    async def verify(self, password: str, stored_hash: str) -> bool:
+        return await self._run(PasswordUtils.verify_password,
+                               password, stored_hash)
+
+    async def hash(self, password: str, rounds: int = None) -> tuple[str, str]:
+        return await self._run(PasswordUtils.hash_password, password, rounds)
+
+    async def calibrate(self, target_ms: float = PASSWORD_HASH_TARGET_MS,
+                        apply: bool = PASSWORD_HASH_ROUNDS == "auto"
+                        ) -> dict | None:
+        """Подбирает стоимость bcrypt под target_ms на этой машине
+
+        С apply подобранная стоимость становится текущей (старые хеши
+        пересчитаются при входе), иначе только пишется в лог и /health/auth.
+        """
+        if not target_ms:
+            if apply:
+                raise RuntimeError("PASSWORD_HASH_ROUNDS=auto requires "
+                                   "PASSWORD_HASH_TARGET_MS")
+            return None
+        rounds, elapsed_ms = await asyncio.get_running_loop().run_in_executor(
+            self._executor, PasswordUtils.calibrate_rounds, target_ms
+        )
+        self.calibration = {
+            "target_ms": target_ms,
+            "rounds": rounds,
+            "hash_ms": round(elapsed_ms, 3),
+        }
+        if apply:
+            PasswordUtils.rounds = rounds
+        elif rounds != PasswordUtils.rounds:
+            lprint.warning(f"PASSWORD_HASH_ROUNDS={PasswordUtils.rounds}, "
+                           f"but cost {rounds} matches the {target_ms} ms "
+                           f"target on this machine")
+        lprint.info(f"bcrypt calibrated: cost {rounds} takes "
+                    f"{elapsed_ms:.1f} ms (target {target_ms} ms)")
+        return self.calibration
+
+    def stats(self) -> dict:
+        with self._lock:
+            completed = self.completed
+            return {
+                "rounds": PasswordUtils.rounds,
+                "calibration": self.calibration,
+                "concurrency": self.concurrency,
+                "queue_limit": self.queue_limit,
+                "in_flight": self._in_flight,
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "completed": completed,
+                "rejected": self.rejected,
+                "wait_avg_ms": round(self._wait_total / completed * 1000, 3)
+                if completed else 0.0,
+                "wait_max_ms": round(self._wait_max * 1000, 3),
+                "hash_avg_ms": round(self._hash_total / completed * 1000, 3)
+                if completed else 0.0,
+                "hash_max_ms": round(self._hash_max * 1000, 3),
+            }
+
+    async def _run(self, func, *args):
+        with self._lock:
+            if self._in_flight >= self.concurrency + self.queue_limit:
+                self.rejected += 1
+                raise PasswordHasherBusyError("Password hashing queue is full")
+            self._in_flight += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self.completed += 1
+                    self._wait_total += started - submitted
+                    self._wait_max = max(self._wait_max, started - submitted)
+                    self._hash_total += finished - started
+                    self._hash_max = max(self._hash_max, finished - started)
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, timed
+            )
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+
+password_hasher = PasswordHasher()
@@ -1,45 +1,42 @@
-from fastapi import HTTPException, status
-from functools import wraps
+from fastapi import Depends, HTTPException, status
 
 from app.core.config import lprint
+from app.core.security.access_token import get_user_info_by_token
 from app.enums import UserRoleEnum
+from app.schemas import UserTokenData
 
 
 class PermissionChecker:
-    """Декоратор для проверки ролей пользователя"""
+    """Зависимость для проверки ролей пользователя
+
+    Подключается в dependencies маршрута:
+    dependencies=[Depends(PermissionChecker([UserRoleEnum.ADMIN]))].
+    Такие зависимости FastAPI решает раньше параметров функции, поэтому
+    при 403 сессия БД для репозиториев не открывается.
+    """
 
     def __init__(self, roles: list[UserRoleEnum]):
         self.roles = roles  # Список разрешённых ролей
-
-    def __call__(self, func):
-        @wraps(func)
-        async def wrapper(*args, **kwargs):
-            # Получаем текущего пользователя
-            user_db = kwargs.get("current_user")
-            if not user_db:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Требуется аутентификация"
-                )
-
-            user_role = getattr(user_db, "role", None)
-            lprint.debug(f"PermissionChecker: user_role = {user_role}")
-
-            user_role_value = user_role.value if isinstance(
-                user_role,
-                UserRoleEnum
-            ) else user_role
-
-            allowed_roles_values = [role.value if isinstance(
-                role,
-                UserRoleEnum
-            ) else role for role in self.roles]
-
-            if user_role_value not in allowed_roles_values:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Недостаточно прав для доступа"
-                )
-            return await func(*args, **kwargs)
-
-        return wrapper
+        self.allowed_roles_values = {
+            role.value if isinstance(role, UserRoleEnum) else role
+            for role in roles
+        }
+
+    async def __call__(
+            self,
+            current_user: UserTokenData = Depends(get_user_info_by_token),
+    ) -> UserTokenData:
+        user_role = current_user.role
+        lprint.debug("PermissionChecker: user_role =", user_role)
+
+        user_role_value = user_role.value if isinstance(
+            user_role,
+            UserRoleEnum
+        ) else user_role
+
+        if user_role_value not in self.allowed_roles_values:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Недостаточно прав для доступа"
+            )
+        return current_user
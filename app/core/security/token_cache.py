@@ -0,0 +1,92 @@
+import hashlib
+import time
+from collections import OrderedDict
+
+from app.core.config import TOKEN_CACHE_SIZE
+from app.schemas import UserTokenData
+
+
+class VerifiedTokenCache:
+    """Кэш проверенных JWT: sha256 токена -> (UserTokenData, exp)
+
+    Хранится дайджест, а не сам токен. Запись с истёкшим exp не отдаётся
+    и удаляется при обращении. max_size=0 отключает кэш.
+    """
+
+    def __init__(self, max_size: int = TOKEN_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[UserTokenData, float]] = (
+            OrderedDict()
+        )
+        self._user_digests: dict[str, set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> UserTokenData | None:
+        if not self.max_size:
+            return None
+        key = self.digest(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        user, exp = entry
+        if exp <= time.time():
+            self._drop(key)
+            self.evictions += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return user
+
+    def put(self, token: str, user: UserTokenData, exp: float | None):
+        if not self.max_size or exp is None or exp <= time.time():
+            return
+        key = self.digest(token)
+        self._entries[key] = (user, exp)
+        self._entries.move_to_end(key)
+        self._user_digests.setdefault(str(user.id), set()).add(key)
+        while len(self._entries) > self.max_size:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self, token: str):
+        self._drop(self.digest(token))
+
+    def invalidate_user(self, user_id: str):
+        """Сбросить все закэшированные токены пользователя"""
+        for key in self._user_digests.pop(str(user_id), set()):
+            self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+        self._user_digests.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            digests = self._user_digests.get(str(entry[0].id))
+            if digests is not None:
+                digests.discard(key)
+                if not digests:
+                    del self._user_digests[str(entry[0].id)]
+
+
+token_cache = VerifiedTokenCache()
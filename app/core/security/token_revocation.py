@@ -0,0 +1,72 @@
+import asyncio
+from typing import Awaitable, Callable
+
+from app.core.config import lprint
+from app.core.security.token_cache import VerifiedTokenCache, token_cache
+
+# Загрузчик номеров поколений из БД: user_id -> token_generation
+GenerationsLoader = Callable[[], Awaitable[dict[str, int]]]
+
+
+class TokenRevocationRegistry:
+    """Отозванные токены без похода в БД на каждый запрос
+
+    В токене лежит номер поколения пользователя (gen). При деактивации
+    номер в БД растёт, и все токены с меньшим номером считаются
+    отозванными. В памяти хранятся только пользователи с ненулевым
+    номером, при старте набор читается из БД, дальше обновляется по шине.
+    Номера только растут, поэтому перечитанный набор сливается с текущим
+    по максимуму и не отменяет отзыв, пришедший во время чтения.
+    """
+
+    def __init__(self, cache: VerifiedTokenCache = token_cache):
+        self.cache = cache
+        self.loader: GenerationsLoader | None = None
+        self._generations: dict[str, int] = {}
+        self._reload_task: asyncio.Task | None = None
+
+    @property
+    def reloading(self) -> bool:
+        """Идёт перечитывание: кэш проверенных токенов не используется"""
+        return self._reload_task is not None and not self._reload_task.done()
+
+    def is_revoked(self, user_id: str, generation: int) -> bool:
+        return generation < self._generations.get(str(user_id), 0)
+
+    def revoke(self, user_id: str, generation: int):
+        """Токены пользователя с поколением меньше generation недействительны"""
+        user_id = str(user_id)
+        if generation > self._generations.get(user_id, 0):
+            self._generations[user_id] = generation
+        self.cache.invalidate_user(user_id)
+
+    def load(self, generations: dict[str, int]):
+        for user_id, generation in generations.items():
+            user_id = str(user_id)
+            if generation > self._generations.get(user_id, 0):
+                self._generations[user_id] = generation
+        self.cache.clear()
+        lprint.info(f"Token generations loaded for "
+                    f"{len(self._generations)} users")
+
+    async def reload(self):
+        if self.loader is not None:
+            self.load(await self.loader())
+
+    def on_invalidation(self, key: str | None):
+        """Обработчик шины: ключ "user_id:generation", None - перечитать всё"""
+        if key is not None:
+            user_id, generation = key.rsplit(":", 1)
+            self.revoke(user_id, int(generation))
+            return
+        # сообщения могли потеряться: кэш сбрасывается и, пока идёт
+        # перечитывание (reloading), не используется
+        self.cache.clear()
+        if self.loader is not None and (self._reload_task is None
+                                        or self._reload_task.done()):
+            self._reload_task = asyncio.get_running_loop().create_task(
+                self.reload()
+            )
+
+
+token_revocation = TokenRevocationRegistry()
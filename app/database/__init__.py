@@ -1,12 +1,17 @@
-from .database import Base, get_async_session
+from .database import (
+    Base, get_async_session, get_async_read_session, pin_reads_to_primary,
+)
 
 # Models
 from .models import User
 from .models import Team
 from .models import PullRequest
 from .models import ReviewerPullRequestAssignment
+from .models import RefreshToken
 
 __all__ = [
-    "Base", "get_async_session",
+    "Base", "get_async_session", "get_async_read_session",
+    "pin_reads_to_primary",
     "User", "Team", "PullRequest", "ReviewerPullRequestAssignment",
+    "RefreshToken",
 ]
@@ -1,14 +1,69 @@
+from fastapi import Depends, Request
 from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     create_async_engine,
+    AsyncEngine,
     AsyncSession
 )
 from sqlalchemy.orm import DeclarativeBase
 
-from app.core.config.config import ASYNC_DATABASE_URL
+from app.core.config.config import (
+    ASYNC_DATABASE_URL, REPLICA_ASYNC_DATABASE_URL,
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING, DB_STATEMENT_CACHE_SIZE,
+)
+from app.core.security import get_user_info_by_token
+from app.database.pool import (
+    PoolMetrics, instrument_engine, instrumented_pool_class, pool_metrics,
+    replica_pool_metrics,
+)
+from app.database.replica import ReadSessionRouter
+from app.schemas import UserTokenData
+
+
+def create_pooled_engine(url: str,
+                         metrics: PoolMetrics = pool_metrics) -> AsyncEngine:
+    engine = create_async_engine(
+        url,
+        poolclass=instrumented_pool_class(metrics),
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args={
+            # кэш asyncpg и кэш подготовленных выражений диалекта SQLAlchemy
+            "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+        },
+    )
+    instrument_engine(engine, metrics)
+    return engine
+
+
+engine = create_pooled_engine(ASYNC_DATABASE_URL)
+# expire_on_commit=False: репозитории собирают ответ из RETURNING и данных
+# в памяти, перечитывать объекты после commit не нужно
+async_session_maker = async_sessionmaker(
+    engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
 
-engine = create_async_engine(ASYNC_DATABASE_URL)
-async_session_maker = async_sessionmaker(engine, class_=AsyncSession)
+read_engine = None
+async_read_session_maker = None
+if REPLICA_ASYNC_DATABASE_URL:
+    read_engine = create_pooled_engine(REPLICA_ASYNC_DATABASE_URL,
+                                       replica_pool_metrics)
+    async_read_session_maker = async_sessionmaker(
+        read_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+    )
+read_session_router = ReadSessionRouter(
+    primary=async_session_maker,
+    replica=async_read_session_maker,
+)
 
 
 async def get_async_session():
@@ -16,5 +71,33 @@ async def get_async_session():
         yield session
 
 
+async def get_async_read_session(
+        request: Request,
+        current_user: UserTokenData = Depends(get_user_info_by_token),
+):
+    """Сессия для читающих эндпоинтов: реплика, если она настроена"""
+    session_maker = read_session_router.session_maker_for(
+        request, current_user.id
+    )
+    async with session_maker() as session:
+        # реплика может отставать: общие кэши процесса из неё не заполняются
+        session.info["replica"] = session_maker is read_session_router.replica
+        yield session
+
+
+async def pin_reads_to_primary(
+        current_user: UserTokenData = Depends(get_user_info_by_token),
+):
+    """Зависимость пишущих эндпоинтов: следующие чтения - из основной БД
+
+    Отметка ставится после успешной записи: подключается со
+    scope="function", код после yield выполняется, когда эндпоинт
+    вернул ответ, но до его отправки. Если эндпоинт бросил исключение,
+    оно приходит в yield и чтения не привязываются.
+    """
+    yield
+    read_session_router.pin(current_user.id)
+
+
 class Base(DeclarativeBase):
     pass
@@ -0,0 +1,244 @@
+import asyncio
+import json
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Callable
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from app.core.config import lprint
+from app.core.config.config import (
+    ASYNC_DATABASE_URL, INVALIDATION_BUS, INVALIDATION_CHANNEL,
+)
+
+# Обработчик получает ключ записи или None - сбросить всё по теме
+InvalidationHandler = Callable[[str | None], None]
+
+TEAM_TOPIC = "team"
+USER_TOKENS_TOPIC = "user_tokens"
+
+_CONNECTION_ERRORS = (OSError, asyncio.TimeoutError,
+                      asyncpg.PostgresError, asyncpg.InterfaceError)
+
+
+class InvalidationBus(ABC):
+    """Шина сброса кэшей между воркерами
+
+    Репозитории публикуют (тема, ключ) после commit, подписчики (кэши
+    в памяти процесса) выбрасывают соответствующие записи. Локальные
+    подписчики вызываются сразу при публикации.
+    """
+
+    name: str
+
+    def __init__(self):
+        self.origin = uuid.uuid4().hex
+        self._handlers: dict[str, list[InvalidationHandler]] = defaultdict(list)
+        self.published = 0
+        self.received = 0
+        self.publish_failures = 0
+        self.reconnects = 0
+        self.full_flushes = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    def subscribe(self, topic: str, handler: InvalidationHandler):
+        self._handlers[topic].append(handler)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def publish(self, topic: str, key: str | None):
+        self.published += 1
+        self._dispatch(topic, None if key is None else str(key))
+        await self._send(topic, None if key is None else str(key))
+
+    @abstractmethod
+    async def _send(self, topic: str, key: str | None):
+        """Доставка остальным воркерам"""
+
+    def flush_all(self):
+        """Сбросить все подписанные кэши, например после потери сообщений"""
+        self.full_flushes += 1
+        for topic in list(self._handlers):
+            self._dispatch(topic, None)
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "published": self.published,
+            "received": self.received,
+            "publish_failures": self.publish_failures,
+            "reconnects": self.reconnects,
+            "full_flushes": self.full_flushes,
+            "latency_avg_ms": round(
+                self._latency_total / self.received * 1000, 3
+            ) if self.received else 0.0,
+            "latency_max_ms": round(self._latency_max * 1000, 3),
+        }
+
+    def _receive(self, topic: str, key: str | None, sent_at: float):
+        latency = max(0.0, time.time() - sent_at)
+        self.received += 1
+        self._latency_total += latency
+        self._latency_max = max(self._latency_max, latency)
+        self._dispatch(topic, key)
+
+    def _dispatch(self, topic: str, key: str | None):
+        for handler in self._handlers.get(topic, ()):
+            try:
+                handler(key)
+            except Exception as e:
+                lprint.error(f"Invalidation handler failed for {topic}:{key}",
+                             e)
+
+
+class InProcessInvalidationBus(InvalidationBus):
+    """Один воркер: достаточно локальных подписчиков"""
+
+    name = "inprocess"
+
+    async def _send(self, topic: str, key: str | None):
+        pass
+
+
+class PostgresInvalidationBus(InvalidationBus):
+    """Сообщения между воркерами через LISTEN/NOTIFY в Postgres
+
+    Слушает отдельное соединение asyncpg вне пула SQLAlchemy. Пока оно
+    разорвано, уведомления теряются, поэтому после переподключения
+    сбрасываются все подписанные кэши.
+    """
+
+    name = "postgres"
+
+    def __init__(self, dsn: str = ASYNC_DATABASE_URL,
+                 channel: str = INVALIDATION_CHANNEL,
+                 reconnect_delay: float = 0.5,
+                 max_reconnect_delay: float = 10.0):
+        super().__init__()
+        self.dsn = make_url(dsn).set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self._listen_conn: asyncpg.Connection | None = None
+        self._notify_conn: asyncpg.Connection | None = None
+        self._notify_lock = asyncio.Lock()
+        self._reconnect_task: asyncio.Task | None = None
+        self._stopped = True
+
+    @property
+    def connected(self) -> bool:
+        return self._listen_conn is not None and not self._listen_conn.is_closed()
+
+    async def start(self):
+        self._stopped = False
+        try:
+            await self._listen()
+        except _CONNECTION_ERRORS as e:
+            lprint.error("Invalidation bus failed to connect, retrying", e)
+            self._schedule_reconnect()
+
+    async def stop(self):
+        self._stopped = True
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        for conn in (self._listen_conn, self._notify_conn):
+            if conn is not None and not conn.is_closed():
+                await conn.close()
+        self._listen_conn = self._notify_conn = None
+
+    async def _send(self, topic: str, key: str | None):
+        payload = json.dumps({
+            "topic": topic,
+            "key": key,
+            "origin": self.origin,
+            "sent_at": time.time(),
+        })
+        async with self._notify_lock:
+            try:
+                if self._notify_conn is None or self._notify_conn.is_closed():
+                    self._notify_conn = await asyncpg.connect(self.dsn)
+                await self._notify_conn.execute(
+                    "SELECT pg_notify($1, $2)", self.channel, payload
+                )
+            except _CONNECTION_ERRORS as e:
+                # остальные воркеры догонят по TTL кэшей
+                self.publish_failures += 1
+                self._notify_conn = None
+                lprint.error(f"Invalidation publish failed for {topic}:{key}",
+                             e)
+
+    async def _listen(self):
+        conn = await asyncpg.connect(self.dsn)
+        conn.add_termination_listener(self._on_termination)
+        await conn.add_listener(self.channel, self._on_notification)
+        self._listen_conn = conn
+
+    def _on_notification(self, connection, pid, channel, payload):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            lprint.warning(f"Malformed invalidation message: {payload}")
+            return
+        if message.get("origin") == self.origin:
+            return  # локальные подписчики уже вызваны при публикации
+        self._receive(message["topic"], message.get("key"),
+                      message.get("sent_at", time.time()))
+
+    def _on_termination(self, connection):
+        if connection is self._listen_conn:
+            self._listen_conn = None
+        if not self._stopped:
+            lprint.warning("Invalidation bus connection lost, reconnecting")
+            self._schedule_reconnect()
+
+    def _schedule_reconnect(self):
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.get_running_loop().create_task(
+                self._reconnect()
+            )
+
+    async def _reconnect(self):
+        delay = self.reconnect_delay
+        while not self._stopped:
+            try:
+                await self._listen()
+            except _CONNECTION_ERRORS as e:
+                lprint.error("Invalidation bus reconnect failed", e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+                continue
+            self.reconnects += 1
+            # что пришло, пока соединения не было, уже не узнать
+            self.flush_all()
+            return
+
+
+INVALIDATION_BUSES: dict[str, type[InvalidationBus]] = {
+    bus.name: bus
+    for bus in (InProcessInvalidationBus, PostgresInvalidationBus)
+}
+
+
+def create_invalidation_bus(name: str = INVALIDATION_BUS) -> InvalidationBus:
+    """Создаёт шину сброса кэшей по имени из конфигурации"""
+    try:
+        return INVALIDATION_BUSES[name]()
+    except KeyError:
+        raise RuntimeError(
+            f"Unknown invalidation bus '{name}', "
+            f"expected one of: {', '.join(INVALIDATION_BUSES)}"
+        )
+
+
+invalidation_bus = create_invalidation_bus()
@@ -0,0 +1,77 @@
+"""unique pull_request (author_id, name)
+
+Revision ID: 3f1c9a7d2e4b
+Revises: f875b4b264da
+Create Date: 2026-10-18 12:00:00.000000
+
+До этой миграции один автор мог создать несколько PR с одним именем.
+Перед созданием ограничения такие дубликаты переименовываются: самый
+ранний PR сохраняет имя, остальные получают суффикс " (2)", " (3)"...
+с обрезкой имени до 70 символов. Если переименованное имя всё равно с
+чем-то совпало, миграция останавливается со списком конфликтов.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7d2e4b'
+down_revision: Union[str, Sequence[str], None] = 'f875b4b264da'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+RENAME_DUPLICATES = sa.text("""
+    WITH ranked AS (
+        SELECT id,
+               row_number() OVER (PARTITION BY author_id, name
+                                  ORDER BY created_at, id) AS rn
+        FROM pull_request
+        WHERE name IS NOT NULL
+    )
+    UPDATE pull_request AS pr
+    SET name = left(pr.name, 70 - length(' (' || ranked.rn || ')'))
+               || ' (' || ranked.rn || ')'
+    FROM ranked
+    WHERE pr.id = ranked.id AND ranked.rn > 1
+""")
+
+REMAINING_DUPLICATES = sa.text("""
+    SELECT author_id, name, count(*) AS count
+    FROM pull_request
+    WHERE name IS NOT NULL
+    GROUP BY author_id, name
+    HAVING count(*) > 1
+    LIMIT 10
+""")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    bind.execute(RENAME_DUPLICATES)
+    remaining = bind.execute(REMAINING_DUPLICATES).all()
+    if remaining:
+        listed = ", ".join(f"author {row.author_id} name '{row.name}' "
+                           f"x{row.count}" for row in remaining)
+        raise RuntimeError(
+            "Cannot add unique (author_id, name) to pull_request: "
+            f"duplicates remain after renaming ({listed}). "
+            "Rename them manually and run the migration again."
+        )
+    op.create_unique_constraint(
+        'pull_request_author_id_name_key',
+        'pull_request',
+        ['author_id', 'name'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint(
+        'pull_request_author_id_name_key',
+        'pull_request',
+        type_='unique',
+    )
@@ -0,0 +1,32 @@
+"""user token_generation
+
+Revision ID: 9c4d1f0b6e23
+Revises: 5b2e8c41d7a9
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4d1f0b6e23'
+down_revision: Union[str, Sequence[str], None] = '5b2e8c41d7a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'user',
+        sa.Column('token_generation', sa.Integer(),
+                  server_default=sa.text('0'), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('user', 'token_generation')
@@ -0,0 +1,61 @@
+"""reviewer assignment pr_created_at, pr_status and page indexes
+
+Revision ID: b7e3a5c90d14
+Revises: 9c4d1f0b6e23
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3a5c90d14'
+down_revision: Union[str, Sequence[str], None] = '9c4d1f0b6e23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'reviewer_pull_request_assignment',
+        sa.Column('pr_created_at', sa.DateTime(timezone=True),
+                  server_default=sa.text('now()'), nullable=False),
+    )
+    op.add_column(
+        'reviewer_pull_request_assignment',
+        sa.Column('pr_status',
+                  postgresql.ENUM('OPEN', 'MERGED',
+                                  name='pull_request_status_enum',
+                                  create_type=False),
+                  server_default=sa.text("'OPEN'"), nullable=False),
+    )
+    op.execute(
+        "UPDATE reviewer_pull_request_assignment AS a "
+        "SET pr_created_at = pr.created_at, pr_status = pr.status "
+        "FROM pull_request AS pr WHERE pr.id = a.pr_id"
+    )
+    op.create_index(
+        'reviewer_pr_assignment_user_page_idx',
+        'reviewer_pull_request_assignment',
+        ['user_id', 'pr_created_at', 'pr_id'],
+    )
+    op.create_index(
+        'reviewer_pr_assignment_user_status_page_idx',
+        'reviewer_pull_request_assignment',
+        ['user_id', 'pr_status', 'pr_created_at', 'pr_id'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('reviewer_pr_assignment_user_status_page_idx',
+                  table_name='reviewer_pull_request_assignment')
+    op.drop_index('reviewer_pr_assignment_user_page_idx',
+                  table_name='reviewer_pull_request_assignment')
+    op.drop_column('reviewer_pull_request_assignment', 'pr_status')
+    op.drop_column('reviewer_pull_request_assignment', 'pr_created_at')
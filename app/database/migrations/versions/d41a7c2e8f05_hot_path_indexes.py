@@ -0,0 +1,53 @@
+"""hot path indexes: user.team_id, assignment pr_id and open reviews
+
+Revision ID: d41a7c2e8f05
+Revises: b7e3a5c90d14
+Create Date: 2026-10-18 21:00:00.000000
+
+Индексы строятся CONCURRENTLY, без блокировки записи в таблицы, поэтому
+миграцию можно накатывать на работающую базу. CONCURRENTLY не работает
+внутри транзакции - отсюда autocommit_block. Если построение прервётся,
+останется невалидный индекс: перед созданием он удаляется.
+
+pull_request.author_id отдельный индекс не нужен: его покрывает
+уникальный индекс pull_request_author_id_name_key (author_id, name).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41a7c2e8f05'
+down_revision: Union[str, Sequence[str], None] = 'b7e3a5c90d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    ('user_team_id_idx', 'user', ['team_id'], None),
+    ('reviewer_pr_assignment_pr_id_idx', 'reviewer_pull_request_assignment',
+     ['pr_id'], None),
+    ('reviewer_pr_assignment_open_user_idx',
+     'reviewer_pull_request_assignment', ['user_id', 'pr_id'],
+     sa.text("pr_status = 'OPEN'")),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.drop_index(name, table_name=table, if_exists=True,
+                          postgresql_concurrently=True)
+            op.create_index(name, table, columns,
+                            postgresql_where=where,
+                            postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True,
+                          postgresql_concurrently=True)
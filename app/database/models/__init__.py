@@ -3,8 +3,10 @@ from .user import User
 from .team import Team
 from .pull_request import PullRequest
 from .reviewer_pr_assignment import ReviewerPullRequestAssignment
+from .refresh_token import RefreshToken
 
 __all__ = [
     "TimestampMixin",
     "User", "Team", "PullRequest", "ReviewerPullRequestAssignment",
+    "RefreshToken",
 ]
@@ -1,7 +1,7 @@
 import uuid
 from typing import Optional, TYPE_CHECKING
 
-from sqlalchemy import text, String, ForeignKey
+from sqlalchemy import text, String, ForeignKey, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID, ENUM
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
@@ -15,6 +15,12 @@ if TYPE_CHECKING:
 
 class PullRequest(Base, TimestampMixin):
     __tablename__ = "pull_request"
+    __table_args__ = (
+        UniqueConstraint(
+            "author_id", "name",
+            name="pull_request_author_id_name_key",
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         PG_UUID(as_uuid=True),
@@ -1,14 +1,37 @@
 import uuid
+from datetime import datetime
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, DateTime, Index, func, text
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, ENUM
 
 from app.database import Base
+from app.enums import PRStatus
 
 
 class ReviewerPullRequestAssignment(Base):
     __tablename__ = "reviewer_pull_request_assignment"
+    __table_args__ = (
+        # страницы /users/getReview - диапазон одного из этих индексов
+        Index(
+            "reviewer_pr_assignment_user_page_idx",
+            "user_id", "pr_created_at", "pr_id",
+        ),
+        Index(
+            "reviewer_pr_assignment_user_status_page_idx",
+            "user_id", "pr_status", "pr_created_at", "pr_id",
+        ),
+        # первичный ключ начинается с user_id, ревьюеры PR ищутся по pr_id
+        Index("reviewer_pr_assignment_pr_id_idx", "pr_id"),
+        # открытые ревью участника: лимит нагрузки, деактивация.
+        # Смерженных назначений со временем большинство, в индекс они
+        # не попадают
+        Index(
+            "reviewer_pr_assignment_open_user_idx",
+            "user_id", "pr_id",
+            postgresql_where=text("pr_status = 'OPEN'"),
+        ),
+    )
 
     user_id: Mapped[uuid.UUID] = mapped_column(
         PG_UUID(as_uuid=True),
@@ -28,3 +51,16 @@ class ReviewerPullRequestAssignment(Base):
         ),
         primary_key=True,
     )
+    # копии created_at и status из pull_request для постраничной выборки
+    pr_created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+    pr_status: Mapped[PRStatus] = mapped_column(
+        ENUM(PRStatus,
+             name="pull_request_status_enum",
+             create_type=False),
+        server_default=text("'OPEN'"),
+        nullable=False,
+    )
@@ -1,7 +1,7 @@
 import uuid
 from typing import List, Optional, TYPE_CHECKING
 
-from sqlalchemy import Boolean, ForeignKey, String, text
+from sqlalchemy import Boolean, ForeignKey, Index, Integer, String, text
 from sqlalchemy.dialects.postgresql import ENUM, UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -16,6 +16,10 @@ if TYPE_CHECKING:
 
 class User(Base, TimestampMixin):
     __tablename__ = "user"
+    __table_args__ = (
+        # участники команды: выбор ревьюеров, состав команды, деактивация
+        Index("user_team_id_idx", "team_id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         PG_UUID(as_uuid=True),
@@ -36,6 +40,13 @@ class User(Base, TimestampMixin):
         default=True,
         nullable=False,
     )
+    # растёт при деактивации, токены с меньшим номером недействительны
+    token_generation: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default=text("0"),
+        nullable=False,
+    )
     role: Mapped[UserRoleEnum] = mapped_column(
         ENUM(UserRoleEnum, name="user_role_enum", create_constraint=True),
         default=UserRoleEnum.USER,
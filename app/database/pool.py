@@ -0,0 +1,118 @@
+import time
+from threading import Lock
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class PoolMetrics:
+    """Счётчики пула соединений, накопленные с момента запуска процесса"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.connects = 0
+            self.invalidations = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def record_invalidation(self):
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            waits = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "wait_avg_ms": round(self.wait_total / waits * 1000, 3)
+                if waits else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+
+
+pool_metrics = PoolMetrics()
+# у реплики свой пул и свои счётчики
+replica_pool_metrics = PoolMetrics()
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool, замеряющий ожидание свободного соединения
+
+    События пула срабатывают уже после выдачи соединения, поэтому время
+    ожидания и таймауты считаются вокруг _do_get.
+    """
+
+    metrics = pool_metrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_wait(time.perf_counter() - started,
+                                     timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+
+def instrumented_pool_class(metrics: PoolMetrics
+                            ) -> type[InstrumentedAsyncQueuePool]:
+    """Класс пула, пишущий в metrics: счётчики задаются на классе пула"""
+    if metrics is InstrumentedAsyncQueuePool.metrics:
+        return InstrumentedAsyncQueuePool
+    return type("InstrumentedAsyncQueuePool", (InstrumentedAsyncQueuePool,),
+                {"metrics": metrics})
+
+
+def instrument_engine(engine: AsyncEngine, metrics: PoolMetrics = pool_metrics):
+    """Подписывает счётчики на события пула движка"""
+    pool = engine.sync_engine.pool
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        metrics.record_connect()
+
+    @event.listens_for(pool, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.record_invalidation()
+
+
+def get_pool_status(engine: AsyncEngine,
+                    metrics: PoolMetrics = pool_metrics) -> dict:
+    """Текущее состояние пула и накопленные счётчики"""
+    pool = engine.sync_engine.pool
+    status = {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        # до заполнения пула overflow() отрицателен
+        "overflow": max(0, pool.overflow()),
+        "timeout": pool.timeout(),
+    }
+    status.update(metrics.snapshot())
+    return status
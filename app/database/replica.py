@@ -0,0 +1,53 @@
+import time
+
+from fastapi import Request
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config.config import READ_YOUR_WRITES_SECONDS
+
+CONSISTENCY_HEADER = "X-Consistency"
+STRONG_CONSISTENCY = "strong"
+
+
+class ReadSessionRouter:
+    """Выбор основной БД или реплики для читающих запросов
+
+    Чтение идёт в реплику, кроме двух случаев: клиент явно попросил
+    X-Consistency: strong, или этот пользователь сам писал в БД последние
+    window_seconds секунд (read-your-writes). Отметки о записях живут
+    в памяти процесса, поэтому за балансировщиком надёжен только заголовок.
+    """
+
+    def __init__(self, primary: async_sessionmaker,
+                 replica: async_sessionmaker | None = None,
+                 window_seconds: float = READ_YOUR_WRITES_SECONDS):
+        self.primary = primary
+        self.replica = replica
+        self.window_seconds = window_seconds
+        self._pinned_until: dict[str, float] = {}
+
+    def pin(self, user_id: str):
+        """Отправлять чтения пользователя в основную БД в ближайшее окно"""
+        now = time.monotonic()
+        self._pinned_until[str(user_id)] = now + self.window_seconds
+        if len(self._pinned_until) > 10_000:
+            self._pinned_until = {
+                pinned_id: until
+                for pinned_id, until in self._pinned_until.items()
+                if until > now
+            }
+
+    def is_pinned(self, user_id: str) -> bool:
+        until = self._pinned_until.get(str(user_id))
+        return until is not None and until > time.monotonic()
+
+    def session_maker_for(self, request: Request,
+                          user_id: str | None = None) -> async_sessionmaker:
+        if self.replica is None:
+            return self.primary
+        consistency = request.headers.get(CONSISTENCY_HEADER, "")
+        if consistency.lower() == STRONG_CONSISTENCY:
+            return self.primary
+        if user_id is not None and self.is_pinned(user_id):
+            return self.primary
+        return self.replica
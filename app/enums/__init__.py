@@ -1,7 +1,8 @@
 from .user_enums import UserRoleEnum
-from .pull_pequest_enums import PRStatus
+from .pull_pequest_enums import PRStatus, BatchItemStatus
 
 __all__ = [
     "UserRoleEnum",
     "PRStatus",
+    "BatchItemStatus",
 ]
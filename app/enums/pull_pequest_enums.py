@@ -4,3 +4,10 @@ import enum
 class PRStatus(str, enum.Enum):
     OPEN = "OPEN"
     MERGED = "MERGED"
+
+
+class BatchItemStatus(str, enum.Enum):
+    CREATED = "CREATED"
+    DUPLICATE = "DUPLICATE"
+    MERGED = "MERGED"
+    ERROR = "ERROR"
@@ -1,6 +1,8 @@
 from .docs_auth_middleware import DocsAuthMiddleware
+from .request_context_middleware import RequestContextMiddleware
 
 
 __all__ = [
     "DocsAuthMiddleware",
+    "RequestContextMiddleware",
 ]
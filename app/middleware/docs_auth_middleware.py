@@ -1,51 +1,57 @@
 import base64
+import secrets
 
-from fastapi import Request, status
+from fastapi import status
 from fastapi.responses import Response
-from starlette.middleware.base import BaseHTTPMiddleware
 
 from app.core.config.config import DOCS_USERNAME, DOCS_PASSWORD
 
 
-class DocsAuthMiddleware(BaseHTTPMiddleware):
+class DocsAuthMiddleware:
     """
     Middleware для защиты:
     Swagger UI (/docs) и ReDoc (/redoc) с помощью HTTP Basic Auth
+    Чистый ASGI: остальные запросы передаются дальше как есть, без
+    обёртки запроса и ответа, которую делает BaseHTTPMiddleware.
     """
 
-    def __init__(self, app):
-        super().__init__(app)
-        self.protected_paths = ["/docs", "/redoc", "/openapi.json"]
+    def __init__(self, app, username: str = DOCS_USERNAME,
+                 password: str = DOCS_PASSWORD):
+        self.app = app
+        self.protected_paths = ("/docs", "/redoc", "/openapi.json")
+        self._username = username.encode("utf-8")
+        self._password = password.encode("utf-8")
 
-    async def dispatch(self, request: Request, call_next):
+    async def __call__(self, scope, receive, send):
         """Проверка авторизации для защищенных путей"""
-
-        if any(request.url.path.startswith(path)
-               for path in self.protected_paths):
-            authorization = request.headers.get("Authorization")
-
-            if not authorization:
-                return self._get_unauthorized_response()
-
-            if not authorization.startswith("Basic "):
-                return self._get_unauthorized_response()
-
-            try:
-                encoded_credentials = authorization.split(" ")[1]
-                decoded_credentials = base64.b64decode(
-                    encoded_credentials
-                ).decode("utf-8")
-                username, password = decoded_credentials.split(":", 1)
-
-                if username == DOCS_USERNAME and password == DOCS_PASSWORD:
-                    return await call_next(request)
-                else:
-                    return self._get_unauthorized_response()
-
-            except (ValueError, IndexError, UnicodeDecodeError):
-                return self._get_unauthorized_response()
-
-        return await call_next(request)
+        if (scope["type"] != "http"
+                or not scope["path"].startswith(self.protected_paths)):
+            await self.app(scope, receive, send)
+            return
+
+        if self._is_authorized(scope):
+            await self.app(scope, receive, send)
+            return
+        await self._get_unauthorized_response()(scope, receive, send)
+
+    def _is_authorized(self, scope) -> bool:
+        authorization = next(
+            (value for name, value in scope["headers"]
+             if name == b"authorization"),
+            None,
+        )
+        if not authorization or not authorization.startswith(b"Basic "):
+            return False
+        try:
+            username, password = base64.b64decode(
+                authorization[6:].strip(), validate=True
+            ).split(b":", 1)
+        except ValueError:
+            return False
+        # сравнение за постоянное время, обе части проверяются всегда
+        username_ok = secrets.compare_digest(username, self._username)
+        password_ok = secrets.compare_digest(password, self._password)
+        return username_ok and password_ok
 
     def _get_unauthorized_response(self) -> Response:
         """Возвращает ответ 401 с заголовком WWW-Authenticate для Basic Auth"""
@@ -0,0 +1,58 @@
+import time
+import uuid
+
+from app.core.config.logging import request_log_context
+
+REQUEST_ID_HEADER = b"x-request-id"
+
+
+class RequestContextMiddleware:
+    """
+    Middleware, которое заводит контекст запроса для логов:
+    request id (из X-Request-ID или новый), метод, путь и время начала.
+    Id возвращается клиенту в заголовке X-Request-ID.
+    Чистый ASGI, без BaseHTTPMiddleware: тело ответа не проходит через
+    лишнюю очередь.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = self._get_request_id(scope)
+        token = request_log_context.set({
+            "request_id": request_id,
+            "method": scope["method"],
+            "path": scope["path"],
+            # маршрут FastAPI записывает в scope при разборе пути
+            "scope": scope,
+            "started": time.perf_counter(),
+        })
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (REQUEST_ID_HEADER, request_id.encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_log_context.reset(token)
+
+    @staticmethod
+    def _get_request_id(scope) -> str:
+        """Id из заголовка, если он похож на id, иначе новый"""
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER:
+                request_id = value.decode("latin-1")
+                if 0 < len(request_id) <= 64 and request_id.isprintable():
+                    return request_id
+                break
+        return uuid.uuid4().hex
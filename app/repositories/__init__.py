@@ -1,9 +1,16 @@
-from .user_repository import UserRepository, get_user_repo
-from .team_repository import TeamRepository, get_team_repo
+from .user_repository import (
+    UserRepository, get_user_repo, get_user_read_repo, decode_review_cursor,
+)
+from .team_repository import TeamRepository, get_team_repo, get_team_read_repo
 from .pull_request_repository import PullRequestRepository, get_pr_repo
+from .refresh_token_repository import (
+    RefreshTokenRepository, get_refresh_token_repo,
+)
 
 __all__ = [
-    "UserRepository", "get_user_repo",
-    "TeamRepository", "get_team_repo",
+    "UserRepository", "get_user_repo", "get_user_read_repo",
+    "decode_review_cursor",
+    "TeamRepository", "get_team_repo", "get_team_read_repo",
     "PullRequestRepository", "get_pr_repo",
+    "RefreshTokenRepository", "get_refresh_token_repo",
 ]
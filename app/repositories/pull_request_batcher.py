@@ -0,0 +1,206 @@
+import asyncio
+import time
+import uuid
+from collections import Counter
+
+from app.core.config import (
+    lprint, PR_GROUP_COMMIT_ENABLED, PR_GROUP_COMMIT_WAIT_MS,
+    PR_GROUP_COMMIT_MAX_ITEMS,
+)
+from app.schemas import PullRequestOut
+
+DUPLICATE_MESSAGE = ("Pull Request with the same name already "
+                     "exists for this author")
+
+
+class _Batch:
+    """Создания PR одного окна"""
+
+    def __init__(self):
+        # (id автора, имя, ревьюеры, future вызывающего, время постановки)
+        self.items: list[tuple[str, str, list[str], asyncio.Future, float]] = []
+        self.closed = asyncio.Event()
+
+
+class PullRequestCreateBatcher:
+    """Групповая запись новых PR (group commit)
+
+    Создания PR, пришедшие в пределах max_wait_ms, пишутся одной
+    транзакцией многострочными INSERT. Первый запрос окна - ведущий: он
+    ждёт окно или max_items заявок и пишет пачку через свою сессию.
+    Остальные только ждут свой результат, соединение из пула им не нужно.
+    """
+
+    def __init__(self, enabled: bool = PR_GROUP_COMMIT_ENABLED,
+                 max_wait_ms: float = PR_GROUP_COMMIT_WAIT_MS,
+                 max_items: int = PR_GROUP_COMMIT_MAX_ITEMS):
+        self.enabled = enabled
+        self.max_wait_ms = max_wait_ms
+        self.max_items = max_items
+        self._open: _Batch | None = None
+        self.reset_stats()
+
+    async def submit(self, repo, author_id: str, name: str,
+                     reviewers: list[str]) -> PullRequestOut:
+        """Ставит создание PR в текущее окно и ждёт его записи
+
+        repo - PullRequestRepository вызывающего, через него пишет
+        пачку ведущий. Занятое имя - NameError, как без группировки.
+        """
+        future = asyncio.get_running_loop().create_future()
+        batch = self._open
+        leader = batch is None
+        if leader:
+            batch = self._open = _Batch()
+        batch.items.append((str(uuid.UUID(str(author_id))), name, reviewers,
+                            future, time.perf_counter()))
+        if len(batch.items) >= self.max_items:
+            self._close(batch)
+        if leader:
+            await self._lead(repo, batch)
+        return await future
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "max_wait_ms": self.max_wait_ms,
+            "max_items": self.max_items,
+            "batches": self.batches,
+            "items": self.items,
+            "failed_batches": self.failed_batches,
+            "batch_avg_size": round(self.items / self.batches, 3)
+            if self.batches else 0.0,
+            "batch_max_size": self.batch_max_size,
+            # размер пачки -> сколько пачек, по степеням двойки: "1", "2-3", ...
+            "batch_sizes": {
+                f"{2 ** (bits - 1)}-{2 ** bits - 1}" if bits > 1 else "1": count
+                for bits, count in sorted(self._size_buckets.items())
+            },
+            "wait_avg_ms": round(self._wait_total / self.items * 1000, 3)
+            if self.items else 0.0,
+            "wait_max_ms": round(self._wait_max * 1000, 3),
+            "commit_avg_ms": round(self._commit_total / self.batches * 1000, 3)
+            if self.batches else 0.0,
+            "commit_max_ms": round(self._commit_max * 1000, 3),
+        }
+
+    def reset_stats(self):
+        self.batches = 0
+        self.items = 0
+        self.failed_batches = 0
+        self.batch_max_size = 0
+        self._size_buckets: Counter[int] = Counter()
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._commit_total = 0.0
+        self._commit_max = 0.0
+
+    def _close(self, batch: _Batch):
+        """Новые заявки пойдут уже в следующее окно"""
+        if self._open is batch:
+            self._open = None
+        batch.closed.set()
+
+    async def _lead(self, repo, batch: _Batch):
+        """Ждёт окно и пишет пачку в отдельной задаче
+
+        Отмена запроса ведущего (например, клиент отключился) касается
+        только его: пачка остальных всё равно пишется.
+        """
+        cancelled = False
+        try:
+            await asyncio.wait_for(batch.closed.wait(),
+                                   self.max_wait_ms / 1000)
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            cancelled = True
+        self._close(batch)
+        items = batch.items
+        if cancelled:
+            # PR отменённого ведущего не пишем
+            items[0][3].cancel()
+            items = items[1:]
+        if items:
+            flush = asyncio.create_task(self._flush(repo, items))
+            try:
+                await asyncio.shield(flush)
+            except asyncio.CancelledError:
+                cancelled = True
+                # пачка пишется через сессию ведущего, её нельзя закрыть
+                # раньше, чем запись закончится
+                await asyncio.wait({flush})
+        if cancelled:
+            raise asyncio.CancelledError
+
+    async def _flush(self, repo, items: list):
+        started = time.perf_counter()
+        unique: dict[tuple[str, str], tuple[list[str], asyncio.Future]] = {}
+        duplicates = []
+        for author_id, name, reviewers, future, submitted in items:
+            wait = started - submitted
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+            if (author_id, name) in unique:
+                duplicates.append(future)
+            else:
+                unique[(author_id, name)] = (reviewers, future)
+
+        try:
+            created = await self._insert(repo, unique)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.batches += 1
+            self.items += len(items)
+            self.batch_max_size = max(self.batch_max_size, len(items))
+            self._size_buckets[len(items).bit_length()] += 1
+            self._commit_total += elapsed
+            self._commit_max = max(self._commit_max, elapsed)
+
+        for key, (_, future) in unique.items():
+            if future.done():
+                continue
+            pr = created.get(key)
+            if pr is None:
+                future.set_exception(NameError(DUPLICATE_MESSAGE))
+            else:
+                future.set_result(pr)
+        for future in duplicates:
+            if not future.done():
+                future.set_exception(NameError(DUPLICATE_MESSAGE))
+
+    async def _insert(self, repo, unique: dict) -> dict:
+        """Пишет пачку; если она не записалась - каждую заявку отдельно
+
+        Так ошибка одной строки (например, автор уже удалён) достаётся
+        только её заявке, а не всем запросам окна.
+        """
+        try:
+            return await repo.insert_pull_requests([
+                (author_id, name, reviewers)
+                for (author_id, name), (reviewers, _) in unique.items()
+            ])
+        except Exception as e:
+            self.failed_batches += 1
+            lprint.error("Pull Request batch failed:", len(unique), "items:", e)
+            await repo.session.rollback()
+            if len(unique) == 1:
+                for _, future in unique.values():
+                    if not future.done():
+                        future.set_exception(e)
+                return {}
+
+        created = {}
+        for (author_id, name), (reviewers, future) in unique.items():
+            try:
+                created.update(await repo.insert_pull_requests(
+                    [(author_id, name, reviewers)]
+                ))
+            except Exception as e:
+                await repo.session.rollback()
+                if not future.done():
+                    future.set_exception(e)
+        return created
+
+
+pr_create_batcher = PullRequestCreateBatcher()
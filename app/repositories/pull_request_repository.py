@@ -1,14 +1,52 @@
 import uuid
 
 from fastapi import Depends
-from sqlalchemy import select
+from sqlalchemy import (
+    select, update, true, false, case, func, exists, literal, or_,
+    values, column, String,
+)
+from sqlalchemy.dialects.postgresql import insert, ARRAY, UUID as PG_UUID
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, aliased
 
 from app.core.config import lprint
-from app.database import PullRequest, get_async_session, ReviewerPullRequestAssignment
+from app.database import (
+    PullRequest, get_async_session, ReviewerPullRequestAssignment, User
+)
 from app.enums import PRStatus
-from app.schemas import PullRequestOut
+from app.repositories.pull_request_batcher import pr_create_batcher
+from app.repositories.user_repository import USER_OUT_COLUMNS
+from app.schemas import PullRequestOut, UserOut
+
+REVIEWER_COLUMNS = tuple(
+    column.label(f"reviewer_{column.key}") for column in USER_OUT_COLUMNS
+)
+
+
+def _pull_request_from_rows(rows) -> PullRequestOut:
+    """Собирает PullRequestOut из строк "PR + один ревьюер" (LEFT JOIN)"""
+    pr = rows[0]
+    return PullRequestOut(
+        id=pr.id,
+        name=pr.name,
+        author_id=pr.author_id,
+        status=pr.status,
+        reviewers=[
+            UserOut(**{column.key: getattr(row, f"reviewer_{column.key}")
+                       for column in USER_OUT_COLUMNS})
+            for row in rows if row.reviewer_id is not None
+        ],
+    )
+
+
+def _pull_requests_from_rows(rows) -> dict[str, PullRequestOut]:
+    """PullRequestOut по id из строк нескольких PR"""
+    grouped: dict[str, list] = {}
+    for row in rows:
+        grouped.setdefault(str(row.id), []).append(row)
+    return {pr_id: _pull_request_from_rows(pr_rows)
+            for pr_id, pr_rows in grouped.items()}
 
 
 async def get_pr_repo(session: AsyncSession = Depends(get_async_session)):
@@ -26,6 +64,7 @@ class PullRequestRepository:
             .options(
                 selectinload(PullRequest.reviewers)
             )
+            .execution_options(populate_existing=True)
         )
         pr = result.scalars().first()
         if not pr:
@@ -37,20 +76,138 @@ class PullRequestRepository:
 
     async def create_pull_request(self, name: str, author_id: str, reviewers: list[str]
                                   ) -> PullRequestOut:
-        new_pr_id = uuid.uuid4()
-        new_reviewers_pr_assignments = []
-        for reviewer_id in reviewers:
-            assignment = ReviewerPullRequestAssignment(
-                pr_id=new_pr_id,
-                user_id=reviewer_id,
-            )
-            new_reviewers_pr_assignments.append(assignment)
-            self.session.add(assignment)
-        new_pr = PullRequest(id=new_pr_id, name=name, author_id=author_id)
-        self.session.add(new_pr)
+        """Создаёт PR и назначения ревьюеров одним запросом
+
+        PR, назначения и данные ревьюеров для ответа берутся из
+        INSERT ... RETURNING, повторного чтения после commit нет.
+        С групповой записью PR уходит в общую транзакцию с соседними.
+        """
+        if pr_create_batcher.enabled:
+            return await pr_create_batcher.submit(
+                self, author_id=author_id, name=name, reviewers=reviewers,
+            )
+        pr_table = PullRequest.__table__
+        assignment_table = ReviewerPullRequestAssignment.__table__
+        new_pr = (
+            insert(pr_table)
+            .values(id=uuid.uuid4(), name=name, author_id=author_id,
+                    status=PRStatus.OPEN)
+            .on_conflict_do_nothing(
+                index_elements=[pr_table.c.author_id, pr_table.c.name],
+            )
+            .returning(pr_table.c.id, pr_table.c.name,
+                       pr_table.c.status, pr_table.c.author_id,
+                       pr_table.c.created_at)
+            .cte("new_pr")
+        )
+        new_assignments = (
+            insert(assignment_table)
+            .from_select(
+                ["pr_id", "pr_created_at", "pr_status", "user_id"],
+                select(new_pr.c.id, new_pr.c.created_at, new_pr.c.status,
+                       User.id).join(
+                    User, User.id.in_([uuid.UUID(str(r)) for r in reviewers])
+                ),
+            )
+            .returning(assignment_table.c.user_id)
+            .cte("new_assignments")
+        )
+        result = await self.session.execute(
+            select(new_pr, *REVIEWER_COLUMNS)
+            .select_from(new_pr)
+            .outerjoin(new_assignments, true())
+            .outerjoin(User, User.id == new_assignments.c.user_id)
+        )
+        rows = result.all()
+        if not rows:
+            await self.session.rollback()
+            raise NameError("Pull Request with the same name already "
+                            "exists for this author")
+        await self.session.commit()
+
+        lprint.debug("Pull Request created:", rows[0].id)
+        return _pull_request_from_rows(rows)
+
+    async def create_pull_requests(self, author_id: str,
+                                   items: list[tuple[str, list[str]]]
+                                   ) -> dict[str, PullRequestOut]:
+        """Создаёт пачку PR автора и их назначения одним запросом
+
+        items - пары (имя PR, id ревьюеров), имена внутри пачки
+        различны. Возвращает созданные PR по имени; имён, которые
+        у автора уже заняты, в ответе нет.
+        """
+        created = await self.insert_pull_requests(
+            [(author_id, name, reviewers) for name, reviewers in items]
+        )
+        return {name: pr for (_, name), pr in created.items()}
+
+    async def insert_pull_requests(self, items: list[tuple[str, str, list[str]]]
+                                   ) -> dict[tuple[str, str], PullRequestOut]:
+        """Пишет PR разных авторов и их назначения одной транзакцией
+
+        items - тройки (id автора, имя PR, id ревьюеров), пары (автор,
+        имя) различны. PR и назначения пишутся многострочными INSERT
+        одного запроса. Возвращает созданные PR по (id автора, имя);
+        пар, которые уже заняты, в ответе нет.
+        """
+        pr_table = PullRequest.__table__
+        assignment_table = ReviewerPullRequestAssignment.__table__
+        new_prs = (
+            insert(pr_table)
+            .values([{"id": uuid.uuid4(), "name": name, "author_id": author_id,
+                      "status": PRStatus.OPEN} for author_id, name, _ in items])
+            .on_conflict_do_nothing(
+                index_elements=[pr_table.c.author_id, pr_table.c.name],
+            )
+            .returning(pr_table.c.id, pr_table.c.name,
+                       pr_table.c.status, pr_table.c.author_id,
+                       pr_table.c.created_at)
+            .cte("new_prs")
+        )
+        query = select(new_prs, *REVIEWER_COLUMNS).select_from(new_prs)
+        # повтор ревьюера в одном PR нарушил бы первичный ключ назначений
+        reviewer_rows = [
+            (uuid.UUID(str(author_id)), name, reviewer)
+            for author_id, name, reviewers in items
+            for reviewer in dict.fromkeys(uuid.UUID(str(reviewer))
+                                          for reviewer in reviewers)
+        ]
+        if reviewer_rows:
+            pairs = values(
+                column("author_id", PG_UUID(as_uuid=True)),
+                column("name", String),
+                column("user_id", PG_UUID(as_uuid=True)),
+                name="pairs",
+            ).data(reviewer_rows)
+            new_assignments = (
+                insert(assignment_table)
+                .from_select(
+                    ["pr_id", "pr_created_at", "pr_status", "user_id"],
+                    select(new_prs.c.id, new_prs.c.created_at,
+                           new_prs.c.status, User.id)
+                    .select_from(new_prs)
+                    .join(pairs, (pairs.c.author_id == new_prs.c.author_id)
+                          & (pairs.c.name == new_prs.c.name))
+                    .join(User, User.id == pairs.c.user_id),
+                )
+                .returning(assignment_table.c.pr_id, assignment_table.c.user_id)
+                .cte("new_assignments")
+            )
+            query = (
+                query
+                .outerjoin(new_assignments,
+                           new_assignments.c.pr_id == new_prs.c.id)
+                .outerjoin(User, User.id == new_assignments.c.user_id)
+            )
+        else:
+            query = query.outerjoin(User, false())
+        result = await self.session.execute(query)
+        created = _pull_requests_from_rows(result.all())
         await self.session.commit()
 
-        return await self.get_pull_request_by_id(pr_id=str(new_pr_id))
+        lprint.debug("Pull Requests created:", len(created), "of", len(items))
+        return {(str(pr.author_id), pr.name): pr for pr in created.values()}
 
     async def get_pull_request_by_name_and_author(self, name: str, author_id: str
                                                   ) -> PullRequestOut | None:
@@ -72,55 +229,240 @@ class PullRequestRepository:
 
     async def merge_pull_request(self, pr_id: str, user_id: str
                                  ) -> PullRequestOut | None:
-        result = await self.session.execute(
-            select(PullRequest)
-            .where(PullRequest.id == pr_id)
-            .options(
-                selectinload(PullRequest.reviewers)
+        """Мержит PR одним условным UPDATE
+
+        Строка PR блокируется (FOR UPDATE) раньше строки назначения
+        (FOR SHARE) - в том же порядке, что и при переназначении, поэтому
+        конкурентные merge/reassign одного PR выполняются по очереди.
+        Повторный merge уже смерженного PR ничего не меняет.
+        Копия статуса в строках назначений обновляется тем же запросом.
+        """
+        pr_table = PullRequest.__table__
+        assignment_table = ReviewerPullRequestAssignment.__table__
+        target = (
+            select(pr_table.c.id)
+            .where(pr_table.c.id == pr_id)
+            .with_for_update()
+            .cte("target")
+        )
+        reviewer = (
+            select(assignment_table.c.pr_id)
+            .join(target, target.c.id == assignment_table.c.pr_id)
+            .where(assignment_table.c.user_id == user_id)
+            .with_for_update(read=True, of=assignment_table)
+            .cte("reviewer")
+        )
+        merged = (
+            update(pr_table)
+            .where(pr_table.c.id == reviewer.c.pr_id)
+            .values(
+                status=PRStatus.MERGED,
+                updated_at=case(
+                    (pr_table.c.status == PRStatus.OPEN, func.now()),
+                    else_=pr_table.c.updated_at,
+                ),
             )
+            .returning(pr_table.c.id, pr_table.c.name,
+                       pr_table.c.status, pr_table.c.author_id)
+            .cte("merged")
         )
-        pr = result.scalars().first()
-        if not pr:
+        merged_assignments = (
+            update(assignment_table)
+            .where(assignment_table.c.pr_id == merged.c.id)
+            .values(pr_status=PRStatus.MERGED)
+            .cte("merged_assignments")
+        )
+        result = await self.session.execute(
+            select(merged, *REVIEWER_COLUMNS)
+            .add_cte(merged_assignments)
+            .select_from(merged)
+            .outerjoin(assignment_table,
+                       assignment_table.c.pr_id == merged.c.id)
+            .outerjoin(User, User.id == assignment_table.c.user_id)
+        )
+        rows = result.all()
+        await self.session.commit()
+        if rows:
+            lprint.debug("Pull Request merged:", pr_id, "by", user_id)
+            return _pull_request_from_rows(rows)
+
+        state = await self._get_review_state(pr_id=pr_id, user_id=user_id)
+        if state is None:
             raise ValueError("Pull Request not found")
-        if all(str(reviewer.id) != user_id for reviewer in pr.reviewers):
-            raise NameError("User is not a reviewer of this Pull Request")
-        if pr.status != PRStatus.MERGED:
-            pr.status = PRStatus.MERGED
-            await self.session.commit()
+        raise NameError("User is not a reviewer of this Pull Request")
 
-        return await self.get_pull_request_by_id(pr_id=pr_id)
+    async def merge_pull_requests(self, pr_ids: list[str], user_id: str
+                                  ) -> tuple[dict[str, PullRequestOut],
+                                             dict[str, str]]:
+        """Мержит пачку PR ревьюера user_id одним UPDATE
 
-    async def reassign_pull_request(self, pr_id: str, user_id: str,
-                                    change_to_user_id: str
-                                    ) -> PullRequestOut | None:
+        PR блокируются в порядке id, поэтому встречные пачки не ловят
+        взаимоблокировку. Возвращает смерженные PR и причины отказа
+        по id для остальных.
+        """
+        pr_table = PullRequest.__table__
+        assignment_table = ReviewerPullRequestAssignment.__table__
+        ids = sorted({uuid.UUID(str(pr_id)) for pr_id in pr_ids})
+        target = (
+            select(pr_table.c.id)
+            .where(pr_table.c.id.in_(ids))
+            .order_by(pr_table.c.id)
+            .with_for_update()
+            .cte("target")
+        )
+        reviewer = (
+            select(assignment_table.c.pr_id)
+            .join(target, target.c.id == assignment_table.c.pr_id)
+            .where(assignment_table.c.user_id == user_id)
+            .with_for_update(read=True, of=assignment_table)
+            .cte("reviewer")
+        )
+        merged = (
+            update(pr_table)
+            .where(pr_table.c.id == reviewer.c.pr_id)
+            .values(
+                status=PRStatus.MERGED,
+                updated_at=case(
+                    (pr_table.c.status == PRStatus.OPEN, func.now()),
+                    else_=pr_table.c.updated_at,
+                ),
+            )
+            .returning(pr_table.c.id, pr_table.c.name,
+                       pr_table.c.status, pr_table.c.author_id)
+            .cte("merged")
+        )
+        merged_assignments = (
+            update(assignment_table)
+            .where(assignment_table.c.pr_id == merged.c.id)
+            .values(pr_status=PRStatus.MERGED)
+            .cte("merged_assignments")
+        )
         result = await self.session.execute(
-            select(PullRequest)
-            .where(PullRequest.id == pr_id)
-            .options(
-                selectinload(PullRequest.reviewers)
+            select(merged, *REVIEWER_COLUMNS)
+            .add_cte(merged_assignments)
+            .select_from(merged)
+            .outerjoin(assignment_table,
+                       assignment_table.c.pr_id == merged.c.id)
+            .outerjoin(User, User.id == assignment_table.c.user_id)
+        )
+        merged_prs = _pull_requests_from_rows(result.all())
+        await self.session.commit()
+        lprint.debug("Pull Requests merged:", len(merged_prs), "of", len(ids),
+                     "by", user_id)
+
+        rest = [pr_id for pr_id in ids if str(pr_id) not in merged_prs]
+        errors = {str(pr_id): "Pull Request not found" for pr_id in rest}
+        if rest:
+            result = await self.session.execute(
+                select(PullRequest.id).where(PullRequest.id.in_(rest))
             )
+            for row in result.all():
+                errors[str(row.id)] = "User is not a reviewer of this Pull Request"
+            await self.session.commit()
+        return merged_prs, errors
+
+    async def reassign_pull_request(self, pr_id: str, user_id: str,
+                                    candidate_ids: list[str]
+                                    ) -> tuple[PullRequestOut, str]:
+        """Заменяет ревьюера user_id первым подходящим из candidate_ids
+
+        Один запрос: блокирует открытый PR (FOR UPDATE), выбирает первого
+        кандидата, который не автор и ещё не ревьюер, и меняет строку
+        назначения. Причина отказа выясняется отдельным запросом только
+        если замена не произошла.
+
+        Returns:
+            tuple[PullRequestOut, str]: PR и id назначенного ревьюера
+        """
+        pr_table = PullRequest.__table__
+        assignment_table = ReviewerPullRequestAssignment.__table__
+        candidates = [uuid.UUID(str(candidate)) for candidate in candidate_ids]
+        already_assigned = aliased(assignment_table)
+
+        target = (
+            select(pr_table.c.id, pr_table.c.name,
+                   pr_table.c.status, pr_table.c.author_id)
+            .where(pr_table.c.id == pr_id,
+                   pr_table.c.status == PRStatus.OPEN)
+            .with_for_update()
+            .cte("target")
         )
-        pr = result.scalars().first()
-        if not pr:
+        candidate = (
+            select(User.id, target.c.id.label("pr_id"))
+            .join(target, true())
+            .where(
+                User.id.in_(candidates),
+                User.id != target.c.author_id,
+                ~exists().where(
+                    already_assigned.c.pr_id == target.c.id,
+                    already_assigned.c.user_id == User.id,
+                ),
+            )
+            .order_by(func.array_position(
+                literal(candidates, ARRAY(PG_UUID(as_uuid=True))), User.id
+            ))
+            .limit(1)
+            .cte("candidate")
+        )
+        changed = (
+            update(assignment_table)
+            .where(
+                assignment_table.c.pr_id == candidate.c.pr_id,
+                assignment_table.c.user_id == user_id,
+            )
+            .values(user_id=candidate.c.id)
+            .returning(assignment_table.c.user_id)
+            .cte("changed")
+        )
+        remaining = (
+            select(assignment_table.c.user_id)
+            .where(
+                assignment_table.c.pr_id == pr_id,
+                assignment_table.c.user_id != user_id,
+            )
+        )
+        try:
+            result = await self.session.execute(
+                select(target, *REVIEWER_COLUMNS,
+                       changed.c.user_id.label("new_reviewer_id"))
+                .select_from(target)
+                .join(changed, true())
+                .outerjoin(User, or_(User.id == changed.c.user_id,
+                                     User.id.in_(remaining)))
+            )
+            rows = result.all()
+            await self.session.commit()
+        except IntegrityError:
+            # кандидата параллельно назначили на этот же PR
+            await self.session.rollback()
+            raise NameError("Reviewer is already assigned to this Pull Request")
+        if rows:
+            lprint.debug("Pull Request reassigned:", pr_id, "from", user_id)
+            return _pull_request_from_rows(rows), str(rows[0].new_reviewer_id)
+
+        state = await self._get_review_state(pr_id=pr_id, user_id=user_id)
+        if state is None:
             raise ValueError("Pull Request not found")
-        if pr.status == PRStatus.MERGED:
+        pr_status, is_reviewer = state
+        if pr_status == PRStatus.MERGED:
             raise NameError("Cannot reassign reviewers for a merged Pull Request")
-        lprint.debug([reviewer.id for reviewer in pr.reviewers])
-        for reviewer in pr.reviewers:
-            if str(reviewer.id) == user_id:
-                break
-        else:
+        if not is_reviewer:
             raise NameError("User is not a reviewer of this Pull Request")
+        raise NameError("No available team members to assign as reviewers")
 
+    async def _get_review_state(self, pr_id: str, user_id: str
+                                ) -> tuple[PRStatus, bool] | None:
+        """Статус PR и является ли user_id его ревьюером"""
         result = await self.session.execute(
-            select(ReviewerPullRequestAssignment)
-            .where(
-                ReviewerPullRequestAssignment.pr_id == pr_id,
-                ReviewerPullRequestAssignment.user_id == user_id
+            select(
+                PullRequest.status,
+                exists().where(
+                    ReviewerPullRequestAssignment.pr_id == PullRequest.id,
+                    ReviewerPullRequestAssignment.user_id == user_id,
+                ),
             )
+            .where(PullRequest.id == pr_id)
         )
-        pr_rev_assignment = result.scalars().first()
-        pr_rev_assignment.user_id = uuid.UUID(change_to_user_id)
+        row = result.first()
         await self.session.commit()
-
-        return await self.get_pull_request_by_id(pr_id=pr_id)
+        return tuple(row) if row else None
@@ -0,0 +1,95 @@
+import uuid
+from datetime import datetime
+
+from fastapi import Depends
+from sqlalchemy import select, update, func, literal
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import lprint
+from app.database import RefreshToken, get_async_session
+
+
+async def get_refresh_token_repo(
+        session: AsyncSession = Depends(get_async_session)
+):
+    return RefreshTokenRepository(session)
+
+
+class RefreshTokenRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def add_refresh_token(self, jti: str, family_id: str, user_id: str,
+                                expires_at: datetime):
+        await self.session.execute(
+            insert(RefreshToken).values(
+                jti=jti,
+                family_id=family_id,
+                user_id=user_id,
+                expires_at=expires_at,
+            )
+        )
+        await self.session.commit()
+
+    async def rotate_refresh_token(self, jti: str, new_jti: str,
+                                   expires_at: datetime) -> bool:
+        """Гасит jti и выдаёт в той же цепочке new_jti одним запросом
+
+        False - токен неизвестен, отозван, истёк или уже был использован.
+        """
+        used = (
+            update(RefreshToken)
+            .where(
+                RefreshToken.jti == jti,
+                RefreshToken.used_at.is_(None),
+                RefreshToken.revoked_at.is_(None),
+                RefreshToken.expires_at > func.now(),
+            )
+            .values(used_at=func.now())
+            .returning(RefreshToken.family_id, RefreshToken.user_id)
+            .cte("used")
+        )
+        result = await self.session.execute(
+            insert(RefreshToken)
+            .from_select(
+                ["jti", "family_id", "user_id", "expires_at"],
+                select(
+                    literal(uuid.UUID(str(new_jti))),
+                    used.c.family_id,
+                    used.c.user_id,
+                    literal(expires_at),
+                ),
+            )
+            .returning(RefreshToken.jti)
+        )
+        rotated = result.first() is not None
+        await self.session.commit()
+        return rotated
+
+    async def revoke_family_if_reused(self, jti: str) -> bool:
+        """Если jti уже обменивали, отзывает всю его цепочку
+
+        Повторное предъявление использованного refresh-токена значит,
+        что его копия есть у кого-то ещё.
+        """
+        reused_family = (
+            select(RefreshToken.family_id)
+            .where(RefreshToken.jti == jti, RefreshToken.used_at.is_not(None))
+            .scalar_subquery()
+        )
+        result = await self.session.execute(
+            update(RefreshToken)
+            .where(
+                RefreshToken.family_id == reused_family,
+                RefreshToken.revoked_at.is_(None),
+            )
+            .values(revoked_at=func.now())
+            .returning(RefreshToken.jti)
+        )
+        revoked = result.all()
+        await self.session.commit()
+        if revoked:
+            lprint.warning(f"Refresh token reuse detected, revoked "
+                           f"{len(revoked)} tokens of the family of {jti}")
+        return bool(revoked)
@@ -1,10 +1,12 @@
 from fastapi import Depends
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.core.config import lprint
-from app.database import Team, get_async_session
+from app.database import Team, get_async_session, get_async_read_session
+from app.database.invalidation import TEAM_TOPIC, invalidation_bus
 from app.schemas import TeamOut
 
 
@@ -12,6 +14,12 @@ async def get_team_repo(session: AsyncSession = Depends(get_async_session)):
     return TeamRepository(session)
 
 
+async def get_team_read_repo(
+        session: AsyncSession = Depends(get_async_read_session)
+):
+    return TeamRepository(session)
+
+
 class TeamRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -26,7 +34,7 @@ class TeamRepository:
         )
         team = result.scalars().first()
         if team:
-            lprint.info(f"Team found by ID: {team_id}")
+            lprint.info("Team found by ID:", team_id)
             return TeamOut.model_validate(
                 team,
                 from_attributes=True,
@@ -43,7 +51,7 @@ class TeamRepository:
         )
         team = result.scalars().first()
         if team:
-            lprint.info(f"Team found by name: {team_name}")
+            lprint.info("Team found by name:", team_name)
             return TeamOut.model_validate(
                 team,
                 from_attributes=True,
@@ -52,24 +60,32 @@ class TeamRepository:
 
     async def add_team(self, team_name: str) -> TeamOut | None:
         try:
-            new_team = Team(
-                name=team_name,
+            result = await self.session.execute(
+                insert(Team)
+                .values(name=team_name)
+                .on_conflict_do_nothing(index_elements=[Team.name])
+                .returning(Team.id, Team.name)
             )
-            self.session.add(new_team)
+            new_team = result.first()
             await self.session.commit()
-            await self.session.refresh(new_team)
-
-            lprint.info(f"Team added: {new_team.id}")
-            team_data = {
-                "id": new_team.id,
-                "name": new_team.name,
-                "members": [],
-            }
-            return TeamOut.model_validate(team_data)
         except Exception as e:
             lprint.error(f"Error adding team: {str(e)}")
+            await self.session.rollback()
             return None
 
+        if new_team is None:
+            lprint.info(f"Team already exists: {team_name}")
+            raise ValueError("Team with this name already exists")
+
+        lprint.info(f"Team added: {new_team.id}")
+        await invalidation_bus.publish(TEAM_TOPIC, new_team.id)
+        team_data = {
+            "id": new_team.id,
+            "name": new_team.name,
+            "members": [],
+        }
+        return TeamOut.model_validate(team_data)
+
     async def get_team_members_to_review(self, team_id: str) -> list[str]:
         result = await self.session.execute(
             select(Team)
@@ -84,5 +100,5 @@ class TeamRepository:
             raise ValueError("Team not found")
 
         member_ids = [str(member.id) for member in team.members]
-        lprint.info(f"Team members retrieved for team ID {team_id}: {member_ids}")
+        lprint.info("Team members retrieved for team ID", team_id, member_ids)
         return member_ids
@@ -1,17 +1,59 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+
 from fastapi import Depends
-from sqlalchemy import select
+from sqlalchemy import select, update, func, true, exists, tuple_, case
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, aliased
 
-from app.core.config import lprint
-from app.database import User, get_async_session, PullRequest
+from app.core.config import lprint, REVIEW_PAGE_SIZE, COUNT_REVIEWERS_FOR_PR
+from app.database import (
+    User, get_async_session, get_async_read_session,
+    PullRequest, ReviewerPullRequestAssignment, RefreshToken,
+)
+from app.database.invalidation import (
+    TEAM_TOPIC, USER_TOKENS_TOPIC, invalidation_bus,
+)
+from app.enums import PRStatus
 from app.schemas import UserOutWithPassword, UserOut, PullRequestOut
 
 
+USER_OUT_COLUMNS = (
+    User.id, User.username, User.role, User.team_id, User.is_active,
+)
+
+
+def encode_review_cursor(created_at: datetime, pr_id: uuid.UUID) -> str:
+    """Непрозрачный курсор страницы ревью из ключа (created_at, id)"""
+    raw = json.dumps([created_at.isoformat(), str(pr_id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_review_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """Ключ (created_at, id) из курсора, ValueError - если курсор битый"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, pr_id = json.loads(raw)
+        created_at = datetime.fromisoformat(created_at)
+        if created_at.tzinfo is None:
+            raise ValueError("cursor without timezone")
+        return created_at, uuid.UUID(pr_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
 async def get_user_repo(session: AsyncSession = Depends(get_async_session)):
     return UserRepository(session)
 
 
+async def get_user_read_repo(
+        session: AsyncSession = Depends(get_async_read_session)
+):
+    return UserRepository(session)
+
+
 class UserRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -47,53 +89,398 @@ class UserRepository:
             )
         return None
 
-    async def update_user(self, user: UserOutWithPassword) -> UserOut | None:
+    async def sample_reviewer_ids(self, author_id: str, need_count: int,
+                                  exclude_ids: list[str] | None = None,
+                                  is_active: bool = True,
+                                  max_open_reviews: int = 0) -> list[str]:
+        """Случайная выборка ревьюеров из команды автора одним запросом
+
+        Кандидаты отбираются и перемешиваются на стороне БД, в приложение
+        возвращаются только выбранные id, без загрузки всей команды.
+
+        Args:
+            author_id: Пользователь, из команды которого выбираются ревьюеры
+            need_count: Сколько ревьюеров нужно выбрать
+            exclude_ids: Пользователи, которых нельзя выбирать
+            is_active: Требуемое значение флага активности кандидатов
+            max_open_reviews: Не выбирать тех, у кого уже столько открытых
+                ревью (0 - без ограничения)
+
+        Returns:
+            list[str]: id выбранных ревьюеров (может быть меньше need_count)
+        """
+        author = aliased(User)
+        candidate = aliased(User)
+        exclude_ids = [uuid.UUID(str(user_id)) for user_id in exclude_ids or []]
+
+        candidates = (
+            select(candidate.id)
+            .where(
+                candidate.team_id == author.team_id,
+                candidate.is_active.is_(is_active),
+                candidate.id != author.id,
+                candidate.id.not_in(exclude_ids),
+            )
+        )
+        if max_open_reviews:
+            open_reviews = (
+                select(func.count())
+                .select_from(ReviewerPullRequestAssignment)
+                .where(
+                    ReviewerPullRequestAssignment.user_id == candidate.id,
+                    ReviewerPullRequestAssignment.pr_status == PRStatus.OPEN,
+                )
+                .scalar_subquery()
+            )
+            candidates = candidates.where(open_reviews < max_open_reviews)
+        candidates = (
+            candidates
+            .order_by(func.random())
+            .limit(need_count)
+            .lateral()
+        )
         result = await self.session.execute(
-            select(User)
-            .where(User.id == user.id)
-            .options(selectinload(User.team))
+            select(author.team_id, candidates.c.id)
+            .outerjoin(candidates, true())
+            .where(author.id == author_id)
         )
-        user_db = result.scalars().one_or_none()
-        if user_db:
-            try:
-                for field, value in user.model_dump(exclude_unset=True).items():
-                    setattr(user_db, field, value)
-                await self.session.commit()
-                await self.session.refresh(user_db)
-                lprint.info("User updated:", user.id)
-                return UserOut.model_validate(
-                    user_db,
-                    from_attributes=True,
+        rows = result.all()
+        if not rows:
+            raise ValueError("User not found")
+        if rows[0].team_id is None:
+            raise ValueError("Team not found")
+
+        reviewer_ids = [str(row.id) for row in rows if row.id is not None]
+        lprint.debug("Reviewers sampled for", author_id, reviewer_ids)
+        return reviewer_ids
+
+    async def get_user_team_id(self, user_id: str) -> str:
+        result = await self.session.execute(
+            select(User.team_id).where(User.id == user_id)
+        )
+        row = result.first()
+        if not row:
+            raise ValueError("User not found")
+        if row.team_id is None:
+            raise ValueError("Team not found")
+        return str(row.team_id)
+
+    async def get_team_open_reviews(self, team_id: str
+                                    ) -> dict[str, set[str]]:
+        """Открытые ревью каждого активного участника команды
+
+        Returns:
+            dict[str, set[str]]: id участника -> id его открытых PR
+        """
+        result = await self.session.execute(
+            select(User.id, ReviewerPullRequestAssignment.pr_id)
+            .outerjoin(
+                ReviewerPullRequestAssignment,
+                (ReviewerPullRequestAssignment.user_id == User.id)
+                & (ReviewerPullRequestAssignment.pr_status == PRStatus.OPEN),
+            )
+            .where(User.team_id == team_id, User.is_active.is_(True))
+        )
+        open_reviews: dict[str, set[str]] = {}
+        for row in result.all():
+            reviews = open_reviews.setdefault(str(row.id), set())
+            if row.pr_id is not None:
+                reviews.add(str(row.pr_id))
+        lprint.debug("Open reviews loaded for team", team_id)
+        return open_reviews
+
+    async def set_user_is_active(self, user_id: str, is_active: bool
+                                 ) -> UserOut | None:
+        """Меняет флаг активности
+
+        При деактивации в том же UPDATE растёт token_generation, а
+        refresh-токены пользователя отзываются до commit. После commit
+        новый номер рассылается по шине, и выданные access-токены
+        перестают приниматься во всех воркерах.
+        """
+        values = {"is_active": is_active}
+        if not is_active:
+            values["token_generation"] = User.token_generation + 1
+        result = await self.session.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(**values)
+            .returning(*USER_OUT_COLUMNS, User.token_generation)
+        )
+        user_db = result.first()
+        if user_db and not is_active:
+            await self.session.execute(
+                update(RefreshToken)
+                .where(
+                    RefreshToken.user_id == user_id,
+                    RefreshToken.revoked_at.is_(None),
                 )
-            except Exception as e:
-                lprint.error(f"Error updating user {user.id}: {str(e)}")
-                await self.session.rollback()
-                return None
+                .values(revoked_at=func.now())
+            )
+        await self.session.commit()
+        if not user_db:
+            lprint.warning("User not found for update:", user_id)
+            return None
+        lprint.info("User active status updated:", user_id, is_active)
+        await invalidation_bus.publish(TEAM_TOPIC, user_db.team_id)
+        if not is_active:
+            await invalidation_bus.publish(
+                USER_TOKENS_TOPIC, f"{user_db.id}:{user_db.token_generation}"
+            )
+        return UserOut.model_validate(user_db._mapping)
+
+    async def deactivate_users(self, user_ids: list[str] | None = None,
+                               team_id: str | None = None,
+                               reviewers_per_pr: int = COUNT_REVIEWERS_FOR_PR
+                               ) -> dict | None:
+        """Деактивирует пользователей (или всю команду) и переназначает
+        их открытые ревью одной транзакцией
+
+        Пользователи и refresh-токены меняются как в set_user_is_active.
+        Открытые назначения переносятся одним UPDATE: для каждого PR
+        кандидаты идут по кругу по активным участникам команды ревьюера
+        со сдвигом, зависящим от номера PR в команде, так что нагрузка
+        расходится по всем. Кандидат не автор и ещё не ревьюер этого PR,
+        ревьюеры одного PR получают разных кандидатов.
+
+        Returns:
+            dict | None: deactivated - id пользователей, reassigned -
+                сколько назначений перенесено, not_reassigned - id PR,
+                где ревьюер остался неактивным; None - никого не нашли
+        """
+        if user_ids is not None:
+            target = User.id.in_([uuid.UUID(str(user_id))
+                                  for user_id in user_ids])
         else:
-            lprint.warning("User not found for update:", user.id)
+            target = User.team_id == team_id
+        result = await self.session.execute(
+            update(User)
+            .where(target)
+            .values(
+                token_generation=case(
+                    (User.is_active, User.token_generation + 1),
+                    else_=User.token_generation,
+                ),
+                is_active=False,
+            )
+            .returning(User.id, User.team_id, User.token_generation)
+        )
+        users = result.all()
+        if not users:
+            await self.session.rollback()
+            lprint.warning("Users not found for deactivation")
             return None
+        deactivated = [user.id for user in users]
+        await self.session.execute(
+            update(RefreshToken)
+            .where(
+                RefreshToken.user_id.in_(deactivated),
+                RefreshToken.revoked_at.is_(None),
+            )
+            .values(revoked_at=func.now())
+        )
 
-    async def get_user_prs_when_reviewer(self, user_id: str
-                                         ) -> list[PullRequestOut] | None:
+        assignment = ReviewerPullRequestAssignment.__table__
+        stuck = (
+            select(
+                assignment.c.pr_id, assignment.c.user_id,
+                User.team_id, PullRequest.author_id,
+                func.row_number().over(
+                    partition_by=(assignment.c.pr_id, User.team_id),
+                    order_by=assignment.c.user_id,
+                ).label("slot"),
+            )
+            .join(User, User.id == assignment.c.user_id)
+            .join(PullRequest, PullRequest.id == assignment.c.pr_id)
+            .where(
+                assignment.c.user_id.in_(deactivated),
+                assignment.c.pr_status == PRStatus.OPEN,
+            )
+            .cte("stuck")
+        )
+        stuck_prs = (
+            select(
+                stuck.c.pr_id, stuck.c.team_id, stuck.c.author_id,
+                func.row_number().over(
+                    partition_by=stuck.c.team_id, order_by=stuck.c.pr_id,
+                ).label("position"),
+            )
+            .group_by(stuck.c.pr_id, stuck.c.team_id, stuck.c.author_id)
+            .cte("stuck_prs")
+        )
+        candidates = (
+            select(
+                User.id, User.team_id,
+                (func.row_number().over(partition_by=User.team_id,
+                                        order_by=User.id) - 1).label("idx"),
+            )
+            .where(
+                User.is_active.is_(True),
+                User.team_id.in_(select(stuck_prs.c.team_id)),
+            )
+            .cte("candidates")
+        )
+        team_sizes = (
+            select(candidates.c.team_id, func.count().label("size"))
+            .group_by(candidates.c.team_id)
+            .cte("team_sizes")
+        )
+        # сдвиг по кругу: автора и прежних ревьюеров может понадобиться
+        # пропустить, ревьюеров одного PR нужно столько же разных кандидатов
+        step = select(
+            func.generate_series(0, 2 * reviewers_per_pr).label("k")
+        ).cte("step")
+        # номер кандидата считается заранее и материализуется, чтобы с
+        # candidates соединять по равенству, а не перебирать всю команду
+        # для каждого PR
+        targets = (
+            select(
+                stuck_prs.c.pr_id, stuck_prs.c.team_id, stuck_prs.c.author_id,
+                step.c.k,
+                ((stuck_prs.c.position * reviewers_per_pr + step.c.k)
+                 % team_sizes.c.size).label("idx"),
+            )
+            .join(team_sizes, team_sizes.c.team_id == stuck_prs.c.team_id)
+            .join(step, true())
+            .cte("targets")
+            .prefix_with("MATERIALIZED")
+        )
+        options = (
+            select(
+                targets.c.pr_id, targets.c.team_id,
+                candidates.c.id.label("candidate_id"),
+                func.min(targets.c.k).label("k"),
+            )
+            .join(candidates, (candidates.c.team_id == targets.c.team_id)
+                  & (candidates.c.idx == targets.c.idx))
+            .where(
+                candidates.c.id != targets.c.author_id,
+                ~exists().where(
+                    assignment.c.pr_id == targets.c.pr_id,
+                    assignment.c.user_id == candidates.c.id,
+                ),
+            )
+            .group_by(targets.c.pr_id, targets.c.team_id, candidates.c.id)
+            .cte("options")
+        )
+        picks = (
+            select(
+                options.c.pr_id, options.c.team_id, options.c.candidate_id,
+                func.row_number().over(
+                    partition_by=(options.c.pr_id, options.c.team_id),
+                    order_by=options.c.k,
+                ).label("slot"),
+            )
+            .cte("picks")
+        )
+        choice = (
+            select(stuck.c.pr_id, stuck.c.user_id, picks.c.candidate_id)
+            .join(picks, (picks.c.pr_id == stuck.c.pr_id)
+                  & (picks.c.team_id == stuck.c.team_id)
+                  & (picks.c.slot == stuck.c.slot))
+            .cte("choice")
+        )
+        moved = (
+            update(assignment)
+            .where(
+                assignment.c.pr_id == choice.c.pr_id,
+                assignment.c.user_id == choice.c.user_id,
+                # PR могли смержить, пока шёл запрос
+                assignment.c.pr_status == PRStatus.OPEN,
+            )
+            .values(user_id=choice.c.candidate_id)
+            .returning(assignment.c.pr_id, choice.c.user_id.label("old_user_id"))
+            .cte("moved")
+        )
         result = await self.session.execute(
-            select(User)
-            .where(User.id == user_id)
-            .options(
-                selectinload(User.team),
-                selectinload(User.pull_requests_as_reviewer)
-                .selectinload(PullRequest.reviewers),
+            select(stuck.c.pr_id, moved.c.pr_id.label("moved_pr_id"))
+            .outerjoin(moved, (moved.c.pr_id == stuck.c.pr_id)
+                       & (moved.c.old_user_id == stuck.c.user_id))
+        )
+        rows = result.all()
+        await self.session.commit()
+
+        reassigned = sum(row.moved_pr_id is not None for row in rows)
+        not_reassigned = sorted({str(row.pr_id) for row in rows
+                                 if row.moved_pr_id is None})
+        lprint.info("Users deactivated:", len(users), "reviews reassigned:",
+                    reassigned, "left:", len(rows) - reassigned)
+        for team in {user.team_id for user in users}:
+            await invalidation_bus.publish(TEAM_TOPIC, team)
+        for user in users:
+            await invalidation_bus.publish(
+                USER_TOKENS_TOPIC, f"{user.id}:{user.token_generation}"
             )
+        return {
+            "deactivated": [str(user_id) for user_id in deactivated],
+            "reassigned": reassigned,
+            "not_reassigned": not_reassigned,
+        }
+
+    async def replace_password_hash(self, user_id: str, old_hash: str,
+                                    new_hash: str) -> bool:
+        """Заменяет хеш, только если пароль не сменили в это время"""
+        result = await self.session.execute(
+            update(User)
+            .where(User.id == user_id, User.hashed_password == old_hash)
+            .values(hashed_password=new_hash)
+            .returning(User.id)
         )
-        user = result.scalars().first()
-        if not user:
+        replaced = result.first() is not None
+        await self.session.commit()
+        return replaced
+
+    async def get_token_generations(self) -> dict[str, int]:
+        """Номера поколений токенов пользователей, которых деактивировали"""
+        result = await self.session.execute(
+            select(User.id, User.token_generation)
+            .where(User.token_generation > 0)
+        )
+        return {str(row.id): row.token_generation for row in result.all()}
+
+    async def get_user_prs_when_reviewer(
+            self, user_id: str, status: PRStatus | None = None,
+            limit: int = REVIEW_PAGE_SIZE,
+            cursor: tuple[datetime, uuid.UUID] | None = None,
+    ) -> tuple[list[PullRequestOut], str | None] | None:
+        """Страница PR, где пользователь ревьюер, от новых к старым
+
+        Ключ страницы - (created_at, id) PR, его копия лежит в строке
+        назначения, так что выборка идёт диапазоном индекса
+        (user_id[, pr_status], pr_created_at, pr_id) и не зависит от
+        длины истории. Возвращает PR и курсор следующей страницы.
+        """
+        assignment = ReviewerPullRequestAssignment
+        query = (
+            select(PullRequest, assignment.pr_created_at)
+            .join(assignment, assignment.pr_id == PullRequest.id)
+            .where(assignment.user_id == user_id)
+            .order_by(assignment.pr_created_at.desc(), assignment.pr_id.desc())
+            .limit(limit + 1)
+            .options(selectinload(PullRequest.reviewers))
+        )
+        if status is not None:
+            query = query.where(assignment.pr_status == status)
+        if cursor is not None:
+            query = query.where(
+                tuple_(assignment.pr_created_at, assignment.pr_id)
+                < tuple_(*cursor)
+            )
+        rows = (await self.session.execute(query)).all()
+        if not rows and not await self._user_exists(user_id):
             lprint.warning("User not found for review:", user_id)
             return None
 
-        prs = []
-        for pr in user.pull_requests_as_reviewer:
-            prs.append(
-                PullRequestOut
-                .model_validate(pr, from_attributes=True)
-                .model_dump(mode="json")
-            )
-        return prs
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_pr, last_created_at = rows[-1]
+            next_cursor = encode_review_cursor(last_created_at, last_pr.id)
+        return ([PullRequestOut.model_validate(pr, from_attributes=True)
+                 for pr, _ in rows], next_cursor)
+
+    async def _user_exists(self, user_id: str) -> bool:
+        result = await self.session.execute(
+            select(exists().where(User.id == user_id))
+        )
+        return result.scalar()
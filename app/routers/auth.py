@@ -1,8 +1,15 @@
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.security import OAuth2PasswordRequestForm
 
-from app.repositories import UserRepository, get_user_repo
-from app.schemas import UserLogin, LoginUserResponse
+from app.core.security import PasswordHasherBusyError
+from app.repositories import (
+    UserRepository, get_user_repo,
+    RefreshTokenRepository, get_refresh_token_repo,
+)
+from app.schemas import (
+    UserLogin, LoginUserResponse,
+    RefreshTokenRequest, RefreshTokenResponse,
+)
 from app.services import AuthService
 
 router = APIRouter(
@@ -13,17 +20,25 @@ router = APIRouter(
 
 @router.post("/login", response_model=LoginUserResponse)
 async def login(form_data: OAuth2PasswordRequestForm = Depends(),
-                user_repo: UserRepository = Depends(get_user_repo)):
+                user_repo: UserRepository = Depends(get_user_repo),
+                refresh_repo: RefreshTokenRepository = Depends(
+                    get_refresh_token_repo
+                )):
     """Вход пользователя по логину и паролю, получение JWT токена"""
     user_in = UserLogin(
         username=form_data.username,
         password=form_data.password
     )
-    res = await AuthService.authenticate_user(
-        username=user_in.username,
-        password=user_in.password,
-        user_repo=user_repo
-    )
+    try:
+        res = await AuthService.authenticate_user(
+            username=user_in.username,
+            password=user_in.password,
+            user_repo=user_repo,
+            refresh_repo=refresh_repo,
+        )
+    except PasswordHasherBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e),
+                            headers={"Retry-After": "1"})
     if not res:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
@@ -31,7 +46,32 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(),
         "status": True,
         "message": "Login successful",
         "access_token": res["access_token"],
+        "refresh_token": res["refresh_token"],
         "token_type": "bearer",
         "user_id": res["user_id"],
         "user_role": res["user_role"],
     }
+
+
+@router.post("/refresh", response_model=RefreshTokenResponse)
+async def refresh(data: RefreshTokenRequest,
+                  refresh_repo: RefreshTokenRepository = Depends(
+                      get_refresh_token_repo
+                  )):
+    """Exchange a refresh token for a new access/refresh token pair"""
+    try:
+        tokens = await AuthService.refresh_tokens(
+            refresh_token=data.refresh_token,
+            refresh_repo=refresh_repo,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=401, detail=str(e),
+                            headers={"WWW-Authenticate": "Bearer"})
+
+    return {
+        "status": True,
+        "message": "Tokens refreshed successfully",
+        "access_token": tokens["access_token"],
+        "refresh_token": tokens["refresh_token"],
+        "token_type": "bearer",
+    }
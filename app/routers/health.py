@@ -1,4 +1,14 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+
+from app.core.config.logging import log_queue
+from app.core.security import PermissionChecker, password_hasher
+from app.core.security.token_cache import token_cache
+from app.database.database import engine, read_engine
+from app.database.invalidation import invalidation_bus
+from app.database.pool import get_pool_status, replica_pool_metrics
+from app.enums import UserRoleEnum
+from app.repositories.pull_request_batcher import pr_create_batcher
+from app.services.team_roster_cache import team_roster_cache
 
 router = APIRouter(
     tags=["health"],
@@ -13,3 +23,60 @@ async def health_check():
         "status": True,
         "message": "Service is healthy and running"
     }
+
+
+@router.get("/pool", status_code=200,
+            dependencies=[Depends(PermissionChecker([UserRoleEnum.ADMIN,]))])
+async def pool_status():
+    """Connection pool state and checkout statistics (Admin only)
+
+    replica_pool is null when no read replica is configured.
+    """
+    return {
+        "status": True,
+        "pool": get_pool_status(engine),
+        "replica_pool": get_pool_status(read_engine, replica_pool_metrics)
+        if read_engine is not None else None,
+    }
+
+
+@router.get("/caches", status_code=200,
+            dependencies=[Depends(PermissionChecker([UserRoleEnum.ADMIN,]))])
+async def caches_status():
+    """In-process cache statistics (Admin only)"""
+    return {
+        "status": True,
+        "team_roster": team_roster_cache.stats(),
+        "verified_tokens": token_cache.stats(),
+        "invalidation_bus": invalidation_bus.stats(),
+    }
+
+
+@router.get("/auth", status_code=200,
+            dependencies=[Depends(PermissionChecker([UserRoleEnum.ADMIN,]))])
+async def auth_status():
+    """Password hashing queue statistics (Admin only)"""
+    return {
+        "status": True,
+        "password_hasher": password_hasher.stats(),
+    }
+
+
+@router.get("/logging", status_code=200,
+            dependencies=[Depends(PermissionChecker([UserRoleEnum.ADMIN,]))])
+async def logging_status():
+    """Background log queue state and dropped records (Admin only)"""
+    return {
+        "status": True,
+        "log_queue": log_queue.stats(),
+    }
+
+
+@router.get("/writes", status_code=200,
+            dependencies=[Depends(PermissionChecker([UserRoleEnum.ADMIN,]))])
+async def writes_status():
+    """Group commit of new pull requests: batch sizes and latency (Admin only)"""
+    return {
+        "status": True,
+        "pr_group_commit": pr_create_batcher.stats(),
+    }
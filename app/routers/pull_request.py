@@ -1,12 +1,18 @@
+from collections import Counter
+
 from fastapi import APIRouter, Depends, HTTPException
 
 from app.core.security import get_user_info_by_token
+from app.database import pin_reads_to_primary
 from app.repositories import (
     get_pr_repo, PullRequestRepository,
+    get_user_repo, UserRepository,
     get_team_repo, TeamRepository,
-    get_user_repo, UserRepository
 )
-from app.schemas import UserTokenData, PullRequestCreate, PullRequestGetResponse
+from app.schemas import (
+    UserTokenData, PullRequestCreate, PullRequestGetResponse, ModelResponse,
+    PullRequestCreateBatch, PullRequestMergeBatch, PullRequestBatchResponse,
+)
 from app.schemas.pull_request_schemas import GetPullRequest
 from app.services import PullRequestService
 
@@ -16,13 +22,21 @@ router = APIRouter(
 )
 
 
-@router.post("/create", response_model=PullRequestGetResponse, status_code=201)
+def _batch_summary(results) -> str:
+    counts = Counter(result.status.value.lower() for result in results)
+    return "Batch processed: " + ", ".join(
+        f"{count} {status}" for status, count in counts.items()
+    )
+
+
+@router.post("/create", response_model=PullRequestGetResponse, status_code=201,
+             dependencies=[Depends(pin_reads_to_primary, scope="function")])
 async def create_pr(
     data: PullRequestCreate,
     current_user: UserTokenData = Depends(get_user_info_by_token),
     pr_repo: PullRequestRepository = Depends(get_pr_repo),
-    team_repo: TeamRepository = Depends(get_team_repo),
     user_repo: UserRepository = Depends(get_user_repo),
+    team_repo: TeamRepository = Depends(get_team_repo),
 ):
     """Create a new pull request"""
     try:
@@ -30,14 +44,14 @@ async def create_pr(
             pr_repo=pr_repo,
             author_id=current_user.id,
             name=data.name,
-            team_repo=team_repo,
             user_repo=user_repo,
+            team_repo=team_repo,
         )
-        return {
-            "status": True,
-            "message": "Pull Request created successfully",
-            "pull_request": pr
-        }
+        return ModelResponse(PullRequestGetResponse(
+            status=True,
+            message="Pull Request created successfully",
+            pull_request=pr,
+        ), status_code=201)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except NameError as e:
@@ -46,7 +60,37 @@ async def create_pr(
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
-@router.post("/merge", response_model=PullRequestGetResponse)
+@router.post("/createBatch", response_model=PullRequestBatchResponse,
+             dependencies=[Depends(pin_reads_to_primary, scope="function")])
+async def create_pr_batch(
+    data: PullRequestCreateBatch,
+    current_user: UserTokenData = Depends(get_user_info_by_token),
+    pr_repo: PullRequestRepository = Depends(get_pr_repo),
+    user_repo: UserRepository = Depends(get_user_repo),
+    team_repo: TeamRepository = Depends(get_team_repo),
+):
+    """Create pull requests in one transaction, with a result per item"""
+    try:
+        results = await PullRequestService.create_pull_requests(
+            pr_repo=pr_repo,
+            author_id=current_user.id,
+            names=data.names,
+            user_repo=user_repo,
+            team_repo=team_repo,
+        )
+        return ModelResponse(PullRequestBatchResponse(
+            status=True,
+            message=_batch_summary(results),
+            results=results,
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.post("/merge", response_model=PullRequestGetResponse,
+             dependencies=[Depends(pin_reads_to_primary, scope="function")])
 async def merge_pr(
     data: GetPullRequest,
     current_user: UserTokenData = Depends(get_user_info_by_token),
@@ -59,11 +103,11 @@ async def merge_pr(
             pr_id=data.id,
             user_id=current_user.id
         )
-        return {
-            "status": True,
-            "message": "Pull Request merged successfully",
-            "pull_request": pr
-        }
+        return ModelResponse(PullRequestGetResponse(
+            status=True,
+            message="Pull Request merged successfully",
+            pull_request=pr,
+        ))
     except NameError as e:
         raise HTTPException(status_code=403, detail=str(e))
     except ValueError as e:
@@ -72,13 +116,37 @@ async def merge_pr(
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
-@router.post("/reassign", response_model=PullRequestGetResponse)
+@router.post("/mergeBatch", response_model=PullRequestBatchResponse,
+             dependencies=[Depends(pin_reads_to_primary, scope="function")])
+async def merge_pr_batch(
+    data: PullRequestMergeBatch,
+    current_user: UserTokenData = Depends(get_user_info_by_token),
+    pr_repo: PullRequestRepository = Depends(get_pr_repo),
+):
+    """Merge pull requests in one transaction, with a result per item"""
+    try:
+        results = await PullRequestService.merge_pull_requests(
+            pr_repo=pr_repo,
+            pr_ids=data.ids,
+            user_id=current_user.id,
+        )
+        return ModelResponse(PullRequestBatchResponse(
+            status=True,
+            message=_batch_summary(results),
+            results=results,
+        ))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.post("/reassign", response_model=PullRequestGetResponse,
+             dependencies=[Depends(pin_reads_to_primary, scope="function")])
 async def reassign_pr(
     data: GetPullRequest,
     current_user: UserTokenData = Depends(get_user_info_by_token),
     pr_repo: PullRequestRepository = Depends(get_pr_repo),
-    team_repo: TeamRepository = Depends(get_team_repo),
     user_repo: UserRepository = Depends(get_user_repo),
+    team_repo: TeamRepository = Depends(get_team_repo),
 ):
     """Reassign reviewers for a pull request"""
     try:
@@ -86,14 +154,14 @@ async def reassign_pr(
             pr_repo=pr_repo,
             pr_id=data.id,
             user_id=current_user.id,
+            user_repo=user_repo,
             team_repo=team_repo,
-            user_repo=user_repo
         )
-        return {
-            "status": True,
-            "message": "Pull Request reassigned successfully",
-            "pull_request": pr
-        }
+        return ModelResponse(PullRequestGetResponse(
+            status=True,
+            message="Pull Request reassigned successfully",
+            pull_request=pr,
+        ))
     except NameError as e:
         raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
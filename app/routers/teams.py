@@ -1,9 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
 
 from app.core.security import PermissionChecker, get_user_info_by_token
+from app.database import pin_reads_to_primary
 from app.enums import UserRoleEnum
-from app.repositories import get_team_repo, TeamRepository
-from app.schemas import UserTokenData, GetTeamResponse, TeamCreate
+from app.repositories import get_team_repo, get_team_read_repo, TeamRepository
+from app.schemas import (
+    UserTokenData, GetTeamResponse, TeamCreate, ModelResponse,
+)
 from app.services.team_service import TeamService
 
 router = APIRouter(
@@ -15,30 +18,29 @@ router = APIRouter(
 @router.get("/get", response_model=GetTeamResponse)
 async def get_team(
     current_user: UserTokenData = Depends(get_user_info_by_token),
-    team_repo: TeamRepository = Depends(get_team_repo),
+    team_repo: TeamRepository = Depends(get_team_read_repo),
 ):
     try:
         team = await TeamService.get_team(
             team_id=current_user.team_id,
             team_repo=team_repo,
         )
-        return {
-            "status": True,
-            "message": f"Team '{current_user.team_id}' retrieved successfully",
-            "team": team,
-        }
+        return ModelResponse(GetTeamResponse(
+            status=True,
+            message=f"Team '{current_user.team_id}' retrieved successfully",
+            team=team,
+        ))
     except ValueError:
         raise HTTPException(status_code=404, detail="Team not found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
-@router.get("/get/{team_id}", response_model=GetTeamResponse)
-@PermissionChecker([UserRoleEnum.ADMIN,])
+@router.get("/get/{team_id}", response_model=GetTeamResponse,
+            dependencies=[Depends(PermissionChecker([UserRoleEnum.ADMIN,]))])
 async def get_team_by_id(
     team_id: str,
-    current_user: UserTokenData = Depends(get_user_info_by_token),
-    team_repo: TeamRepository = Depends(get_team_repo),
+    team_repo: TeamRepository = Depends(get_team_read_repo),
 ):
     """Get team by ID (Admin only)"""
     try:
@@ -46,22 +48,22 @@ async def get_team_by_id(
             team_id=team_id,
             team_repo=team_repo,
         )
-        return {
-            "status": True,
-            "message": f"Team '{team_id}' retrieved successfully",
-            "team": team,
-        }
+        return ModelResponse(GetTeamResponse(
+            status=True,
+            message=f"Team '{team_id}' retrieved successfully",
+            team=team,
+        ))
     except ValueError:
         raise HTTPException(status_code=404, detail="Team not found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
-@router.post("/add", response_model=GetTeamResponse, status_code=201)
-@PermissionChecker([UserRoleEnum.ADMIN,])
+@router.post("/add", response_model=GetTeamResponse, status_code=201,
+             dependencies=[Depends(PermissionChecker([UserRoleEnum.ADMIN,])),
+                           Depends(pin_reads_to_primary, scope="function")])
 async def add_team(
     data: TeamCreate,
-    current_user: UserTokenData = Depends(get_user_info_by_token),
     team_repo: TeamRepository = Depends(get_team_repo),
 ):
     """Add team (Admin only)"""
@@ -70,11 +72,11 @@ async def add_team(
             team_name=data.name,
             team_repo=team_repo,
         )
-        return {
-            "status": True,
-            "message": "Team added successfully",
-            "team": new_team,
-        }
+        return ModelResponse(GetTeamResponse(
+            status=True,
+            message="Team added successfully",
+            team=new_team,
+        ), status_code=201)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
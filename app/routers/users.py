@@ -1,11 +1,14 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 
+from app.core.config import REVIEW_PAGE_SIZE, REVIEW_PAGE_MAX_SIZE
 from app.core.security import PermissionChecker, get_user_info_by_token
-from app.enums import UserRoleEnum
-from app.repositories import UserRepository, get_user_repo
+from app.database import pin_reads_to_primary
+from app.enums import UserRoleEnum, PRStatus
+from app.repositories import UserRepository, get_user_repo, get_user_read_repo
 from app.schemas import (
     UserSetIsActive, UserSetIsActiveResponse,
-    UserTokenData, UserReviewPRsResponse
+    UsersDeactivate, UsersDeactivateResponse,
+    UserTokenData, UserReviewPRsResponse, ModelResponse,
 )
 from app.services import UserService
 
@@ -15,12 +18,12 @@ router = APIRouter(
 )
 
 
-@router.post("/setIsActive", response_model=UserSetIsActiveResponse)
-@PermissionChecker([UserRoleEnum.ADMIN,])
+@router.post("/setIsActive", response_model=UserSetIsActiveResponse,
+             dependencies=[Depends(PermissionChecker([UserRoleEnum.ADMIN,])),
+                           Depends(pin_reads_to_primary, scope="function")])
 async def set_is_active(
         data: UserSetIsActive,
         user_repo: UserRepository = Depends(get_user_repo),
-        current_user: UserTokenData = Depends(get_user_info_by_token)
 ):
     """Set user active status (Admin only)"""
     try:
@@ -30,39 +33,77 @@ async def set_is_active(
             is_active=data.is_active,
         )
 
-        return {
-            "status": True,
-            "message": f"User '{data.user_id}' active status set "
-                       f"to {data.is_active}",
-            "user": user
-        }
+        return ModelResponse(UserSetIsActiveResponse(
+            status=True,
+            message=f"User '{data.user_id}' active status set "
+                    f"to {data.is_active}",
+            user=user,
+        ))
     except ValueError:
         raise HTTPException(status_code=404, detail="User not found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
-@router.get("/getReview/{user_id}", response_model=UserReviewPRsResponse)
-@PermissionChecker([UserRoleEnum.ADMIN,])
+@router.post("/deactivate", response_model=UsersDeactivateResponse,
+             dependencies=[Depends(PermissionChecker([UserRoleEnum.ADMIN,])),
+                           Depends(pin_reads_to_primary, scope="function")])
+async def deactivate_users(
+        data: UsersDeactivate,
+        user_repo: UserRepository = Depends(get_user_repo),
+):
+    """Deactivate users or a whole team and reassign their open reviews
+    (Admin only)"""
+    try:
+        result = await UserService.deactivate_users(
+            user_repo=user_repo,
+            user_ids=data.user_ids,
+            team_id=data.team_id,
+        )
+
+        return ModelResponse(UsersDeactivateResponse(
+            status=True,
+            message=f"{len(result['deactivated'])} users deactivated, "
+                    f"{result['reassigned']} reviews reassigned",
+            deactivated_user_ids=result["deactivated"],
+            reassigned_count=result["reassigned"],
+            not_reassigned_pr_ids=result["not_reassigned"],
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.get("/getReview/{user_id}", response_model=UserReviewPRsResponse,
+            dependencies=[Depends(PermissionChecker([UserRoleEnum.ADMIN,]))])
 async def get_review_of_user(
         user_id: str,
-        current_user: UserTokenData = Depends(get_user_info_by_token),
-        user_repo: UserRepository = Depends(get_user_repo),
+        status: PRStatus | None = None,
+        limit: int = Query(REVIEW_PAGE_SIZE, ge=1, le=REVIEW_PAGE_MAX_SIZE),
+        cursor: str | None = None,
+        user_repo: UserRepository = Depends(get_user_read_repo),
 ):
-    """Get review of specified user (Admin only)"""
+    """Get a page of review of specified user (Admin only)"""
     try:
         prs = await UserService.get_user_review(
             user_repo=user_repo,
             user_id=user_id,
+            status=status,
+            limit=limit,
+            cursor=cursor,
         )
         if prs is None:
             raise HTTPException(status_code=404, detail="User not found")
-        return {
-            "status": True,
-            "message": f"Review data for user '{user_id}' retrieved successfully",
-            "user_id": prs["user_id"],
-            "reviews_in": prs["prs"],
-        }
+        return ModelResponse(UserReviewPRsResponse(
+            status=True,
+            message=f"Review data for user '{user_id}' retrieved successfully",
+            user_id=prs["user_id"],
+            reviews_in=prs["prs"],
+            next_cursor=prs["next_cursor"],
+        ))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -71,22 +112,34 @@ async def get_review_of_user(
 
 @router.get("/getReview", response_model=UserReviewPRsResponse)
 async def get_review(
+        status: PRStatus | None = None,
+        limit: int = Query(REVIEW_PAGE_SIZE, ge=1, le=REVIEW_PAGE_MAX_SIZE),
+        cursor: str | None = None,
         current_user: UserTokenData = Depends(get_user_info_by_token),
-        user_repo: UserRepository = Depends(get_user_repo),
+        user_repo: UserRepository = Depends(get_user_read_repo),
 ):
+    """Get a page of review of current user"""
     try:
         prs = await UserService.get_user_review(
             user_repo=user_repo,
             user_id=current_user.id,
+            status=status,
+            limit=limit,
+            cursor=cursor,
         )
         if prs is None:
             raise HTTPException(status_code=404, detail="User not found")
-        return {
-            "status": True,
-            "message": f"Review data for user '{current_user.id}'"
-                       f" retrieved successfully",
-            "user_id": prs["user_id"],
-            "reviews_in": prs["prs"],
-        }
+        return ModelResponse(UserReviewPRsResponse(
+            status=True,
+            message=f"Review data for user '{current_user.id}'"
+                    f" retrieved successfully",
+            user_id=prs["user_id"],
+            reviews_in=prs["prs"],
+            next_cursor=prs["next_cursor"],
+        ))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
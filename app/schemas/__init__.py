@@ -1,23 +1,32 @@
 from .simple_response import SimpleResponse
+from .model_response import ModelResponse
 from .user_schemas import (
     UserTokenData,
     UserLogin, LoginUserResponse, UserOut, UserOutWithPassword,
-    UserSetIsActive, UserSetIsActiveResponse, UserReviewPRsResponse
+    RefreshTokenRequest, RefreshTokenResponse,
+    UserSetIsActive, UserSetIsActiveResponse,
+    UsersDeactivate, UsersDeactivateResponse,
 )
 from .team_schemas import TeamCreate, TeamOut, GetTeamResponse
 from .pull_request_schemas import (
     PullRequestCreate, PullRequestOut,
-    PullRequestGetResponse
+    PullRequestGetResponse, UserReviewPRsResponse,
+    PullRequestCreateBatch, PullRequestMergeBatch,
+    PullRequestBatchResult, PullRequestBatchResponse,
 )
 
 __all__ = [
-    "SimpleResponse",
+    "SimpleResponse", "ModelResponse",
 
     "UserTokenData", "UserLogin", "LoginUserResponse",
+    "RefreshTokenRequest", "RefreshTokenResponse",
     "UserOut", "UserOutWithPassword",
     "UserSetIsActive", "UserSetIsActiveResponse", "UserReviewPRsResponse",
+    "UsersDeactivate", "UsersDeactivateResponse",
 
     "TeamCreate", "TeamOut", "GetTeamResponse",
 
     "PullRequestCreate", "PullRequestOut", "PullRequestGetResponse",
+    "PullRequestCreateBatch", "PullRequestMergeBatch",
+    "PullRequestBatchResult", "PullRequestBatchResponse",
 ]
@@ -0,0 +1,20 @@
+from typing import Any
+
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+
+class ModelResponse(Response):
+    """JSON-ответ из уже собранной модели ответа
+
+    Модель сериализуется pydantic-core (model_dump_json) за один проход.
+    FastAPI не проверяет возвращённый Response по response_model ещё раз,
+    response_model у маршрута остаётся только для схемы OpenAPI.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.model_dump_json().encode("utf-8")
+        return super().render(content)
@@ -2,7 +2,8 @@ from uuid import UUID
 
 from pydantic import Field, BaseModel, field_validator
 
-from app.enums import PRStatus
+from app.core.config import PR_BATCH_MAX_SIZE
+from app.enums import PRStatus, BatchItemStatus
 from app.schemas import UserOut, SimpleResponse
 
 
@@ -55,3 +56,68 @@ class PullRequestGetResponse(SimpleResponse):
         ...,
         description="Details of the created pull request",
     )
+
+
+class PullRequestCreateBatch(BaseModel):
+    names: list[str] = Field(
+        ...,
+        min_length=1,
+        max_length=PR_BATCH_MAX_SIZE,
+        description="Names of the pull requests to create",
+    )
+
+
+class PullRequestMergeBatch(BaseModel):
+    ids: list[str] = Field(
+        ...,
+        min_length=1,
+        max_length=PR_BATCH_MAX_SIZE,
+        description="Unique identifiers of the pull requests to merge",
+    )
+
+
+class PullRequestBatchResult(BaseModel):
+    item: str = Field(
+        ...,
+        description="Name or identifier of the pull request from the request",
+    )
+    status: BatchItemStatus = Field(
+        ...,
+        description="Result of the operation for this item",
+    )
+    pull_request: PullRequestOut | None = Field(
+        None,
+        description="Details of the pull request, if it was changed",
+    )
+    detail: str | None = Field(
+        None,
+        description="Reason of the duplicate or error",
+    )
+
+
+class PullRequestBatchResponse(SimpleResponse):
+    results: list[PullRequestBatchResult] = Field(
+        ...,
+        description="Results in the order of the request items",
+    )
+
+
+class UserReviewPRsResponse(SimpleResponse):
+    user_id: UUID | str = Field(
+        ...,
+        description="Unique identifier of the user"
+    )
+    reviews_in: list[PullRequestOut] = Field(
+        ...,
+        description="List of pull requests assigned to the user for review"
+    )
+    next_cursor: str | None = Field(
+        None,
+        description="Cursor of the next page, null on the last page"
+    )
+
+    @field_validator("user_id")
+    @classmethod
+    def _validate_user_id_is_uuid(cls, v: str) -> str:
+        v = UUID(str(v))
+        return str(v)
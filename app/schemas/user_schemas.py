@@ -1,6 +1,6 @@
 from uuid import UUID
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 from app.enums import UserRoleEnum
 from app.schemas import SimpleResponse
@@ -64,6 +64,7 @@ class UserOut(UserTokenData):
 
 class UserOutWithPassword(UserOut):
     hashed_password: str
+    token_generation: int = 0
 
 
 class LoginUserResponse(SimpleResponse):
@@ -71,6 +72,10 @@ class LoginUserResponse(SimpleResponse):
         ...,
         description="JWT access token"
     )
+    refresh_token: str = Field(
+        ...,
+        description="Single-use JWT refresh token for /auth/refresh"
+    )
     token_type: str = Field(
         ...,
         description="Type of the token, typically 'bearer'"
@@ -91,6 +96,28 @@ class LoginUserResponse(SimpleResponse):
         return str(v)
 
 
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str = Field(
+        ...,
+        description="Refresh token received from /auth/login or /auth/refresh"
+    )
+
+
+class RefreshTokenResponse(SimpleResponse):
+    access_token: str = Field(
+        ...,
+        description="New short-lived JWT access token"
+    )
+    refresh_token: str = Field(
+        ...,
+        description="New refresh token, the presented one is no longer valid"
+    )
+    token_type: str = Field(
+        ...,
+        description="Type of the token, typically 'bearer'"
+    )
+
+
 class UserSetIsActive(BaseModel):
     user_id: UUID | str = Field(
         ...,
@@ -115,18 +142,49 @@ class UserSetIsActiveResponse(SimpleResponse):
     )
 
 
-class UserReviewPRsResponse(SimpleResponse):
-    user_id: UUID | str = Field(
-        ...,
-        description="Unique identifier of the user"
+class UsersDeactivate(BaseModel):
+    user_ids: list[UUID | str] | None = Field(
+        None,
+        min_length=1,
+        description="Unique identifiers of the users to be deactivated"
     )
-    reviews_in: list[dict] = Field(
-        ...,
-        description="List of pull requests assigned to the user for review"
+    team_id: UUID | str | None = Field(
+        None,
+        description="Unique identifier of the team whose members "
+                    "are all deactivated"
     )
 
-    @field_validator("user_id")
+    @field_validator("user_ids")
     @classmethod
-    def _validate_user_id_is_uuid(cls, v: str) -> str:
-        v = UUID(str(v))
-        return str(v)
+    def _validate_user_ids_are_uuid(cls, v: list[str] | None
+                                    ) -> list[str] | None:
+        if v is None:
+            return v
+        return list(dict.fromkeys(str(UUID(str(user_id))) for user_id in v))
+
+    @field_validator("team_id")
+    @classmethod
+    def _validate_team_id_is_uuid(cls, v: str | None) -> str | None:
+        return None if v is None else str(UUID(str(v)))
+
+    @model_validator(mode="after")
+    def _validate_one_target(self):
+        if (self.user_ids is None) == (self.team_id is None):
+            raise ValueError("Exactly one of user_ids and team_id is required")
+        return self
+
+
+class UsersDeactivateResponse(SimpleResponse):
+    deactivated_user_ids: list[str] = Field(
+        ...,
+        description="Users that are inactive now"
+    )
+    reassigned_count: int = Field(
+        ...,
+        description="Open review assignments moved to active teammates"
+    )
+    not_reassigned_pr_ids: list[str] = Field(
+        ...,
+        description="Open pull requests left with an inactive reviewer, "
+                    "because no eligible teammate was found"
+    )
@@ -1,38 +1,136 @@
 from app.core.config import lprint
-from app.core.security import PasswordUtils, create_jwt_token
+from app.core.security import (
+    PasswordHasherBusyError, PasswordUtils, create_jwt_token, password_hasher,
+    create_refresh_token, decode_refresh_token, token_revocation,
+)
+from app.database.database import async_session_maker
+from app.database.invalidation import USER_TOKENS_TOPIC, invalidation_bus
+from app.repositories import RefreshTokenRepository
 from app.repositories.user_repository import UserRepository
 from app.schemas import UserTokenData, UserOutWithPassword
 
 
+async def load_token_generations() -> dict[str, int]:
+    """Номера поколений токенов из БД для реестра отозванных токенов"""
+    async with async_session_maker() as session:
+        return await UserRepository(session).get_token_generations()
+
+
+token_revocation.loader = load_token_generations
+invalidation_bus.subscribe(USER_TOKENS_TOPIC, token_revocation.on_invalidation)
+
+
 class AuthService:
     @classmethod
     async def authenticate_user(cls,
                                 username: str, password: str,
-                                user_repo: UserRepository) -> dict | None:
+                                user_repo: UserRepository,
+                                refresh_repo: RefreshTokenRepository
+                                ) -> dict | None:
         try:
             user = await user_repo.get_user_by_username(username)
             if not user:
                 lprint.info(f"Authenticate: user not found by "
                             f"username={username}")
                 return None
-            if not PasswordUtils.verify_password(
+            if not user.is_active:
+                lprint.info(f"Authenticate: user username={username} "
+                            f"is deactivated")
+                return None
+            if not await password_hasher.verify(
                     password=password,
                     stored_hash=user.hashed_password):
                 lprint.info(f"Authenticate: invalid password for user"
                             f" username={username}")
                 return None
             lprint.debug("User authenticated:", username)
+            if PasswordUtils.needs_rehash(user.hashed_password):
+                await cls._rehash_password(user, password, user_repo)
             token = await cls._create_access_token(user)
-            return {"user_id": str(user.id), **token, "user_role": user.role}
+            refresh = await cls._issue_refresh_token(
+                UserTokenData.model_validate(user.model_dump(mode="json")),
+                refresh_repo=refresh_repo,
+                generation=user.token_generation,
+            )
+            return {"user_id": str(user.id), **token, **refresh,
+                    "user_role": user.role}
+        except PasswordHasherBusyError:
+            raise
         except Exception as e:
             lprint.error(f"Authenticate error for username={username}: {e}")
             return None
 
+    @classmethod
+    async def refresh_tokens(cls, refresh_token: str,
+                             refresh_repo: RefreshTokenRepository
+                             ) -> dict[str, str]:
+        """Новая пара токенов по refresh-токену, без bcrypt и чтения user
+
+        Предъявленный токен гасится. Повторное предъявление уже
+        использованного токена отзывает всю цепочку. ValueError - токен
+        не годится.
+        """
+        payload = decode_refresh_token(refresh_token)
+        user = UserTokenData.model_validate(payload)
+        generation = payload.get("gen", 0)
+        if token_revocation.is_revoked(user.id, generation):
+            raise ValueError("Refresh token has been revoked")
+        new_refresh, new_payload = create_refresh_token(
+            user, family_id=payload["family"], generation=generation
+        )
+        rotated = await refresh_repo.rotate_refresh_token(
+            jti=payload["jti"],
+            new_jti=new_payload["jti"],
+            expires_at=new_payload["exp"],
+        )
+        if not rotated:
+            await refresh_repo.revoke_family_if_reused(jti=payload["jti"])
+            raise ValueError("Refresh token is no longer valid")
+        return {
+            "access_token": create_jwt_token(data=user, generation=generation),
+            "refresh_token": new_refresh,
+        }
+
+    @classmethod
+    async def _rehash_password(cls, user: UserOutWithPassword, password: str,
+                               user_repo: UserRepository):
+        """Пересчитывает хеш с текущей стоимостью, пока пароль известен
+
+        Ошибка не мешает входу: хеш пересчитается при следующем.
+        """
+        try:
+            new_hash, _ = await password_hasher.hash(password)
+            if await user_repo.replace_password_hash(
+                    user_id=str(user.id),
+                    old_hash=user.hashed_password,
+                    new_hash=new_hash):
+                lprint.info(f"Password rehashed for user {user.id}: cost "
+                            f"{PasswordUtils.get_rounds(user.hashed_password)}"
+                            f" -> {PasswordUtils.rounds}")
+        except PasswordHasherBusyError:
+            lprint.info(f"Password rehash postponed for user {user.id}")
+        except Exception as e:
+            lprint.error(f"Password rehash failed for user {user.id}: {e}")
+
     @classmethod
     async def _create_access_token(cls, user: UserOutWithPassword
                                    ) -> dict[str, str]:
         payload = UserTokenData.model_validate(user.model_dump(mode="json"))
         lprint.debug("Payload: ", payload)
-        access = create_jwt_token(data=payload)
+        access = create_jwt_token(data=payload,
+                                  generation=user.token_generation)
 
         return {"access_token": access}
+
+    @classmethod
+    async def _issue_refresh_token(cls, user: UserTokenData,
+                                   refresh_repo: RefreshTokenRepository,
+                                   generation: int = 0) -> dict[str, str]:
+        refresh, payload = create_refresh_token(user, generation=generation)
+        await refresh_repo.add_refresh_token(
+            jti=payload["jti"],
+            family_id=payload["family"],
+            user_id=str(user.id),
+            expires_at=payload["exp"],
+        )
+        return {"refresh_token": refresh}
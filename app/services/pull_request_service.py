@@ -1,12 +1,30 @@
-from random import shuffle as rnd_shuffle
+import uuid
+
+from pydantic import ValidationError
 
 from app.core.config import COUNT_REVIEWERS_FOR_PR
+from app.enums import BatchItemStatus
 from app.repositories import TeamRepository, UserRepository
 from app.repositories.pull_request_repository import PullRequestRepository
-from app.schemas import PullRequestOut
+from app.schemas import (
+    PullRequestCreate, PullRequestOut, PullRequestBatchResult,
+)
+from app.services.reviewer_load_tracker import reviewer_load_tracker
+from app.services.reviewer_strategies import (
+    ReviewerStrategy, get_reviewer_strategy,
+)
+
+
+def _canonical_id(pr_id: str) -> str | None:
+    try:
+        return str(uuid.UUID(pr_id))
+    except ValueError:
+        return None
 
 
 class PullRequestService:
+    reviewer_strategy: ReviewerStrategy = get_reviewer_strategy()
+
     @classmethod
     async def get_pull_request_by_id(cls, pr_repo: PullRequestRepository, pr_id: str
                                      ) -> PullRequestOut:
@@ -16,73 +34,121 @@ class PullRequestService:
         return pr
 
     @classmethod
-    async def _get_pull_request_by_name_and_author(
-        cls,
-        pr_repo: PullRequestRepository,
-        name: str,
-        author_id: str
-    ) -> PullRequestOut | None:
-        pr = await pr_repo.get_pull_request_by_name_and_author(
-            name=name,
-            author_id=author_id
-        )
-        if not pr:
-            return None
-        return pr
-
-    @classmethod
-    async def _get_reviewers(cls, user_id: str, team_repo: TeamRepository,
+    async def _get_reviewers(cls, user_id: str,
                              user_repo: UserRepository,
+                             team_repo: TeamRepository,
                              exclude_reviewers: list[str] | None,
-                             need_count_reviewers: int = COUNT_REVIEWERS_FOR_PR
+                             need_count_reviewers: int = COUNT_REVIEWERS_FOR_PR,
+                             reservation: str | None = None
                              ) -> list[str]:
-        if exclude_reviewers is None:
-            exclude_reviewers = []
-        user = await user_repo.get_user_by_id(user_id=user_id)
-        if not user:
-            raise ValueError("User not found")
-
-        team = await team_repo.get_team_by_id(team_id=user.team_id)
-        if not team:
-            raise ValueError("Team not found")
-
-        reviewers = set()
-        team_members = team.members
-        rnd_shuffle(team_members)
-
-        for member in team_members:
-            if (member.is_active and member.id != user_id and
-                    member.id not in exclude_reviewers):
-                reviewers.add(member.id)
-                if len(reviewers) >= need_count_reviewers:
-                    break
-
-        return list(reviewers)
-
+        return await cls.reviewer_strategy.choose(
+            user_id=user_id,
+            need_count=need_count_reviewers,
+            exclude_ids=exclude_reviewers,
+            user_repo=user_repo,
+            team_repo=team_repo,
+            reservation=reservation,
+        )
 
     @classmethod
     async def create_pull_request(cls, name: str, author_id: str,
                                   pr_repo: PullRequestRepository,
-                                  team_repo: TeamRepository,
-                                  user_repo: UserRepository) -> PullRequestOut:
-        if await cls._get_pull_request_by_name_and_author(
-                pr_repo=pr_repo, name=name, author_id=author_id):
-            raise NameError("Pull Request with the same name already "
-                            "exists for this author")
-
+                                  user_repo: UserRepository,
+                                  team_repo: TeamRepository) -> PullRequestOut:
+        # выбранные учитываются в нагрузке до записи PR, иначе
+        # параллельные запросы увидят одну и ту же нагрузку
+        reservation = f"pending:{uuid.uuid4()}"
         reviewers = await cls._get_reviewers(user_id=author_id,
-                                             team_repo=team_repo,
                                              user_repo=user_repo,
-                                             exclude_reviewers=None)
-
-        pr = await pr_repo.create_pull_request(name=name,
-                                               author_id=author_id,
-                                               reviewers=reviewers)
-        if not pr:
-            raise Exception("Failed to create Pull Request")
-
+                                             team_repo=team_repo,
+                                             exclude_reviewers=None,
+                                             reservation=reservation)
+        try:
+            pr = await pr_repo.create_pull_request(name=name,
+                                                   author_id=author_id,
+                                                   reviewers=reviewers)
+            if not pr:
+                raise Exception("Failed to create Pull Request")
+        except BaseException:
+            # и при ошибке, и при отмене запроса
+            reviewer_load_tracker.release(reservation, reviewers)
+            raise
+
+        reviewer_load_tracker.confirm(
+            reservation, reviewers,
+            str(pr.id), [reviewer.id for reviewer in pr.reviewers],
+        )
         return pr
 
+    @classmethod
+    async def create_pull_requests(cls, names: list[str], author_id: str,
+                                   pr_repo: PullRequestRepository,
+                                   user_repo: UserRepository,
+                                   team_repo: TeamRepository
+                                   ) -> list[PullRequestBatchResult]:
+        """Создаёт пачку PR автора, результат - по каждому имени
+
+        Ревьюеры выбираются для всей пачки сразу, PR пишутся одной
+        транзакцией. Ошибка в одном имени не мешает остальным.
+        """
+        results: list[PullRequestBatchResult | None] = [None] * len(names)
+        positions: dict[str, int] = {}
+        for position, name in enumerate(names):
+            try:
+                PullRequestCreate(name=name)
+            except ValidationError as e:
+                results[position] = PullRequestBatchResult(
+                    item=name, status=BatchItemStatus.ERROR,
+                    detail=e.errors()[0]["msg"],
+                )
+                continue
+            if name in positions:
+                results[position] = PullRequestBatchResult(
+                    item=name, status=BatchItemStatus.DUPLICATE,
+                    detail="Duplicate name in the batch",
+                )
+                continue
+            positions[name] = position
+
+        if positions:
+            reservation = f"pending:{uuid.uuid4()}"
+            reviewers = await cls.reviewer_strategy.choose_batch(
+                user_id=author_id,
+                count=len(positions),
+                need_count=COUNT_REVIEWERS_FOR_PR,
+                user_repo=user_repo,
+                team_repo=team_repo,
+                reservation=reservation,
+            )
+            keys = [f"{reservation}:{index}" for index in range(len(positions))]
+            try:
+                created = await pr_repo.create_pull_requests(
+                    author_id=author_id, items=list(zip(positions, reviewers)),
+                )
+            except BaseException:
+                for key, chosen in zip(keys, reviewers):
+                    reviewer_load_tracker.release(key, chosen)
+                raise
+            for (name, position), key, chosen in zip(positions.items(), keys,
+                                                     reviewers):
+                pr = created.get(name)
+                if pr is None:
+                    reviewer_load_tracker.release(key, chosen)
+                    results[position] = PullRequestBatchResult(
+                        item=name, status=BatchItemStatus.DUPLICATE,
+                        detail="Pull Request with the same name already "
+                               "exists for this author",
+                    )
+                    continue
+                reviewer_load_tracker.confirm(
+                    key, chosen,
+                    str(pr.id), [reviewer.id for reviewer in pr.reviewers],
+                )
+                results[position] = PullRequestBatchResult(
+                    item=name, status=BatchItemStatus.CREATED, pull_request=pr,
+                )
+        return results
+
     @classmethod
     async def merge_pull_request(cls, pr_repo: PullRequestRepository,
                                  pr_id: str, user_id: str) -> PullRequestOut:
@@ -90,28 +156,62 @@ class PullRequestService:
         if not pr:
             raise ValueError("Pull Request not found")
 
+        reviewer_load_tracker.release(
+            str(pr.id), [reviewer.id for reviewer in pr.reviewers]
+        )
         return pr
 
+    @classmethod
+    async def merge_pull_requests(cls, pr_repo: PullRequestRepository,
+                                  pr_ids: list[str], user_id: str
+                                  ) -> list[PullRequestBatchResult]:
+        """Мержит пачку PR одним запросом, результат - по каждому id"""
+        keys = [_canonical_id(pr_id) for pr_id in pr_ids]
+        valid_ids = [key for key in keys if key is not None]
+        merged, errors = {}, {}
+        if valid_ids:
+            merged, errors = await pr_repo.merge_pull_requests(
+                pr_ids=valid_ids, user_id=user_id,
+            )
+        for pr in merged.values():
+            reviewer_load_tracker.release(
+                str(pr.id), [reviewer.id for reviewer in pr.reviewers]
+            )
+
+        results = []
+        for pr_id, key in zip(pr_ids, keys):
+            if key in merged:
+                results.append(PullRequestBatchResult(
+                    item=pr_id, status=BatchItemStatus.MERGED,
+                    pull_request=merged[key],
+                ))
+            else:
+                results.append(PullRequestBatchResult(
+                    item=pr_id, status=BatchItemStatus.ERROR,
+                    detail=errors.get(key, "Invalid Pull Request id"),
+                ))
+        return results
+
     @classmethod
     async def reassign_pull_request(cls, pr_id: str, user_id: str,
                                     pr_repo: PullRequestRepository,
-                                    team_repo: TeamRepository,
-                                    user_repo: UserRepository) -> PullRequestOut:
-        pr_have = await pr_repo.get_pull_request_by_id(pr_id=pr_id)
-        if not pr_have:
-            raise ValueError("Pull Request not found")
-        already_reviewers = [reviewer.id for reviewer in pr_have.reviewers]
-        already_reviewers.append(pr_have.author_id)
-        available_members = await cls._get_reviewers(
+                                    user_repo: UserRepository,
+                                    team_repo: TeamRepository) -> PullRequestOut:
+        # Текущие ревьюеры и автор отсеиваются в БД при замене, поэтому
+        # кандидатов берётся с запасом на каждого из них; стратегия
+        # узнаёт только о том, кто в итоге назначен
+        candidates = await cls.reviewer_strategy.choose_replacements(
             user_id=user_id,
-            team_repo=team_repo,
+            need_count=COUNT_REVIEWERS_FOR_PR + 1,
             user_repo=user_repo,
-            exclude_reviewers=already_reviewers,
-            need_count_reviewers=1
+            team_repo=team_repo,
+        )
+        pr, new_reviewer_id = await pr_repo.reassign_pull_request(
+            pr_id=pr_id, user_id=user_id, candidate_ids=candidates,
+        )
+        cls.reviewer_strategy.replaced(new_reviewer_id)
+        reviewer_load_tracker.release(str(pr.id), [user_id])
+        reviewer_load_tracker.assign(
+            str(pr.id), [reviewer.id for reviewer in pr.reviewers]
         )
-        if not available_members:
-            raise NameError("No available team members to assign as reviewers")
-        pr = await pr_repo.reassign_pull_request(pr_id=pr_id,
-                                                 user_id=user_id,
-                                                 change_to_user_id=available_members[0])
         return pr
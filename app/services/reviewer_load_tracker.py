@@ -0,0 +1,202 @@
+import bisect
+import heapq
+import time
+
+from app.core.config import REVIEWER_LOAD_TTL_SECONDS
+from app.database.invalidation import TEAM_TOPIC, invalidation_bus
+
+
+class TeamReviewLoad:
+    """Открытые ревью участников одной команды
+
+    Для каждого активного участника хранится множество id его открытых PR,
+    поэтому повторные уведомления об одном и том же PR ничего не ломают.
+    Куча (кол-во открытых ревью, id) обновляется лениво: устаревшие записи
+    отбрасываются при извлечении. Очередь round-robin продолжается
+    с участника, следующего за last_picked.
+    """
+
+    def __init__(self, open_reviews: dict[str, set[str]],
+                 last_picked: str | None = None):
+        self.open_reviews = {user_id: set(prs)
+                             for user_id, prs in open_reviews.items()}
+        self.loaded_at = time.monotonic()
+        self._heap = [(len(prs), user_id)
+                      for user_id, prs in self.open_reviews.items()]
+        heapq.heapify(self._heap)
+        self._rr_order = sorted(self.open_reviews)
+        self.last_picked = last_picked
+
+    def load_of(self, user_id: str) -> int:
+        return len(self.open_reviews.get(user_id, ()))
+
+    def assign(self, pr_id: str, user_id: str):
+        reviews = self.open_reviews.get(user_id)
+        if reviews is not None and pr_id not in reviews:
+            reviews.add(pr_id)
+            self._push(user_id)
+
+    def release(self, pr_id: str, user_id: str):
+        reviews = self.open_reviews.get(user_id)
+        if reviews is not None and pr_id in reviews:
+            reviews.discard(pr_id)
+            self._push(user_id)
+
+    def least_loaded(self, need_count: int, exclude: set[str],
+                     max_open_reviews: int = 0) -> list[str]:
+        """Участники с наименьшим числом открытых ревью"""
+        chosen, skipped = [], []
+        seen = set()
+        while self._heap and len(chosen) < need_count:
+            count, user_id = heapq.heappop(self._heap)
+            if self.load_of(user_id) != count or user_id not in self.open_reviews:
+                continue  # устаревшая запись
+            if user_id in seen:
+                # после assign и release в куче две одинаковые актуальные
+                # записи; одна уже извлечена и вернётся в кучу
+                continue
+            seen.add(user_id)
+            if max_open_reviews and count >= max_open_reviews:
+                skipped.append((count, user_id))
+                break  # дальше в куче только не менее загруженные
+            if user_id in exclude:
+                skipped.append((count, user_id))
+                continue
+            chosen.append(user_id)
+            skipped.append((count, user_id))
+        for entry in skipped:
+            heapq.heappush(self._heap, entry)
+        return chosen
+
+    def round_robin(self, need_count: int, exclude: set[str],
+                    max_open_reviews: int = 0, advance: bool = True
+                    ) -> list[str]:
+        """Участники по кругу, начиная со следующего после последнего выбранного
+
+        advance=False - только посмотреть очередь, не сдвигая её.
+        """
+        chosen = []
+        total = len(self._rr_order)
+        start = self._rr_start()
+        for step in range(total):
+            if len(chosen) >= need_count:
+                break
+            position = (start + step) % total
+            user_id = self._rr_order[position]
+            if user_id in exclude:
+                continue
+            if max_open_reviews and self.load_of(user_id) >= max_open_reviews:
+                continue
+            chosen.append(user_id)
+            if advance:
+                self.last_picked = user_id
+        return chosen
+
+    def advance_round_robin(self, user_id: str):
+        """Сдвигает очередь за user_id, как если бы его выбрал round_robin"""
+        if user_id in self.open_reviews:
+            self.last_picked = user_id
+
+    def _rr_start(self) -> int:
+        if self.last_picked is None or not self._rr_order:
+            return 0
+        # last_picked мог уже уйти из команды: позиция по порядку id
+        position = bisect.bisect_right(self._rr_order, self.last_picked)
+        return position % len(self._rr_order)
+
+    def _push(self, user_id: str):
+        heapq.heappush(self._heap, (self.load_of(user_id), user_id))
+        if len(self._heap) > 4 * len(self.open_reviews) + 16:
+            self._heap = [(len(prs), uid)
+                          for uid, prs in self.open_reviews.items()]
+            heapq.heapify(self._heap)
+
+
+class ReviewerLoadTracker:
+    """Нагрузка ревьюеров по командам, поддерживаемая в памяти процесса
+
+    Команда загружается из БД при первом обращении и перечитывается
+    не чаще, чем раз в REVIEWER_LOAD_TTL_SECONDS, а между загрузками
+    обновляется по событиям назначения и снятия ревьюеров. Выбранные,
+    но ещё не записанные ревьюеры учитываются под временным ключом,
+    который после записи PR меняется на id PR (confirm).
+
+    Трекер у каждого процесса свой: по шине invalidation_bus приходят
+    только изменения составов команд, изменения нагрузки не публикуются.
+    Назначения из других процессов видны после перечитывания, поэтому
+    при нескольких воркерах REVIEWER_MAX_OPEN_REVIEWS может быть превышен
+    в пределах REVIEWER_LOAD_TTL_SECONDS. Позиция очереди round-robin
+    переживает перечитывание команды.
+    """
+
+    def __init__(self, ttl_seconds: int = REVIEWER_LOAD_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._teams: dict[str, TeamReviewLoad] = {}
+        self._member_team: dict[str, str] = {}
+        self._last_picked: dict[str, str] = {}
+
+    def get(self, team_id: str) -> TeamReviewLoad | None:
+        team_load = self._teams.get(team_id)
+        if team_load is None:
+            return None
+        if time.monotonic() - team_load.loaded_at > self.ttl_seconds:
+            self.invalidate_team(team_id)
+            return None
+        return team_load
+
+    def load(self, team_id: str, open_reviews: dict[str, set[str]]
+             ) -> TeamReviewLoad:
+        self.invalidate_team(team_id)
+        team_load = TeamReviewLoad(open_reviews,
+                                   self._last_picked.get(team_id))
+        self._teams[team_id] = team_load
+        for user_id in team_load.open_reviews:
+            self._member_team[user_id] = team_id
+        return team_load
+
+    def assign(self, pr_id: str, user_ids: list[str]):
+        for user_id in user_ids:
+            team_load = self.team_of(user_id)
+            if team_load:
+                team_load.assign(pr_id, user_id)
+
+    def release(self, pr_id: str, user_ids: list[str]):
+        for user_id in user_ids:
+            team_load = self.team_of(user_id)
+            if team_load:
+                team_load.release(pr_id, user_id)
+
+    def confirm(self, reservation: str, reserved_ids: list[str],
+                pr_id: str, user_ids: list[str]):
+        """Переносит нагрузку с временного ключа reservation на PR pr_id"""
+        self.release(reservation, reserved_ids)
+        self.assign(pr_id, user_ids)
+
+    def invalidate_team(self, team_id: str | None):
+        team_load = self._teams.pop(team_id, None)
+        if team_load:
+            if team_load.last_picked is not None:
+                self._last_picked[team_id] = team_load.last_picked
+            for user_id in team_load.open_reviews:
+                self._member_team.pop(user_id, None)
+
+    def invalidate_user(self, user_id: str):
+        self.invalidate_team(self._member_team.get(user_id))
+
+    def on_invalidation(self, team_id: str | None):
+        """Обработчик шины: None - сбросить все команды"""
+        if team_id is None:
+            self.clear()
+        else:
+            self.invalidate_team(team_id)
+
+    def clear(self):
+        for team_id in list(self._teams):
+            self.invalidate_team(team_id)
+
+    def team_of(self, user_id: str) -> TeamReviewLoad | None:
+        return self._teams.get(self._member_team.get(user_id))
+
+
+reviewer_load_tracker = ReviewerLoadTracker()
+invalidation_bus.subscribe(TEAM_TOPIC, reviewer_load_tracker.on_invalidation)
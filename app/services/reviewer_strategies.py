@@ -0,0 +1,267 @@
+from abc import ABC, abstractmethod
+from random import sample
+
+from app.core.config import (
+    REVIEWER_ASSIGNMENT_STRATEGY, REVIEWER_MAX_OPEN_REVIEWS,
+)
+from app.repositories import TeamRepository, UserRepository
+from app.services.reviewer_load_tracker import (
+    ReviewerLoadTracker, TeamReviewLoad, reviewer_load_tracker,
+)
+from app.services.team_roster_cache import (
+    TeamRoster, TeamRosterCache, team_roster_cache,
+)
+
+
+class ReviewerStrategy(ABC):
+    """Стратегия выбора ревьюеров из команды пользователя"""
+
+    name: str
+
+    def __init__(self, max_open_reviews: int = REVIEWER_MAX_OPEN_REVIEWS,
+                 roster_cache: TeamRosterCache = team_roster_cache):
+        self.max_open_reviews = max_open_reviews
+        self.roster_cache = roster_cache
+
+    @abstractmethod
+    async def choose(self, user_id: str, need_count: int,
+                     exclude_ids: list[str] | None,
+                     user_repo: UserRepository,
+                     team_repo: TeamRepository,
+                     reservation: str | None = None) -> list[str]:
+        """Выбирает до need_count ревьюеров из команды user_id
+
+        Сам user_id и exclude_ids не выбираются. Бросает ValueError,
+        если пользователь или его команда не найдены. Стратегии с
+        трекером нагрузки сразу учитывают выбранных под ключом
+        reservation, снимает его вызывающий (confirm или release).
+        """
+
+    async def choose_batch(self, user_id: str, count: int, need_count: int,
+                           user_repo: UserRepository,
+                           team_repo: TeamRepository,
+                           reservation: str | None = None
+                           ) -> list[list[str]]:
+        """Ревьюеры для count новых PR автора user_id
+
+        Выбор для следующего PR учитывает уже сделанные для пачки.
+        Выбор для i-го PR резервируется под ключом f"{reservation}:{i}".
+        По умолчанию - count вызовов choose.
+        """
+        return [
+            await self.choose(user_id=user_id, need_count=need_count,
+                              exclude_ids=None, user_repo=user_repo,
+                              team_repo=team_repo,
+                              reservation=None if reservation is None
+                              else f"{reservation}:{position}")
+            for position in range(count)
+        ]
+
+    async def choose_replacements(self, user_id: str, need_count: int,
+                                  user_repo: UserRepository,
+                                  team_repo: TeamRepository) -> list[str]:
+        """Кандидаты на замену ревьюера user_id в порядке предпочтения
+
+        Назначен будет только один из них, поэтому выбор не должен
+        сдвигать состояние стратегии - назначенного сообщает replaced.
+        """
+        return await self.choose(user_id=user_id, need_count=need_count,
+                                 exclude_ids=None, user_repo=user_repo,
+                                 team_repo=team_repo)
+
+    def replaced(self, reviewer_id: str):
+        """Ревьюер reviewer_id назначен заменой"""
+
+    async def _get_roster(self, user_id: str, user_repo: UserRepository,
+                          team_repo: TeamRepository) -> TeamRoster:
+        """Состав команды пользователя, по возможности без обращения к БД"""
+        team_id = self.roster_cache.team_of(user_id)
+        if team_id is None:
+            team_id = await user_repo.get_user_team_id(user_id=user_id)
+        roster = await self.roster_cache.get_or_load(team_id, team_repo)
+        if roster is None:
+            raise ValueError("Team not found")
+        return roster
+
+
+class RandomReviewerStrategy(ReviewerStrategy):
+    """Случайные активные участники команды
+
+    Без ограничения нагрузки выбор идёт из кэша составов команд, с
+    ограничением - выборкой на стороне БД, где видно число открытых ревью.
+    Трекер нагрузки не используется, reservation игнорируется.
+    """
+
+    name = "random"
+
+    async def choose(self, user_id: str, need_count: int,
+                     exclude_ids: list[str] | None,
+                     user_repo: UserRepository,
+                     team_repo: TeamRepository,
+                     reservation: str | None = None) -> list[str]:
+        if not self.max_open_reviews:
+            roster = await self._get_roster(user_id, user_repo, team_repo)
+            exclude = {str(excluded) for excluded in exclude_ids or []}
+            exclude.add(str(user_id))
+            candidates = [member_id for member_id in roster.active_member_ids
+                          if member_id not in exclude]
+            return sample(candidates, min(need_count, len(candidates)))
+        return await user_repo.sample_reviewer_ids(
+            author_id=user_id,
+            need_count=need_count,
+            exclude_ids=exclude_ids,
+            max_open_reviews=self.max_open_reviews,
+        )
+
+    async def choose_batch(self, user_id: str, count: int, need_count: int,
+                           user_repo: UserRepository,
+                           team_repo: TeamRepository,
+                           reservation: str | None = None
+                           ) -> list[list[str]]:
+        """Состав команды читается один раз, при ограничении нагрузки -
+        ещё один запрос за открытыми ревью команды"""
+        roster = await self._get_roster(user_id, user_repo, team_repo)
+        candidates = [member_id for member_id in roster.active_member_ids
+                      if member_id != str(user_id)]
+        if not self.max_open_reviews:
+            return [sample(candidates, min(need_count, len(candidates)))
+                    for _ in range(count)]
+
+        open_reviews = await user_repo.get_team_open_reviews(
+            str(roster.team.id)
+        )
+        load = {member_id: len(open_reviews.get(member_id, ()))
+                for member_id in candidates}
+        batch = []
+        for _ in range(count):
+            free = [member_id for member_id in candidates
+                    if load[member_id] < self.max_open_reviews]
+            chosen = sample(free, min(need_count, len(free)))
+            for member_id in chosen:
+                load[member_id] += 1
+            batch.append(chosen)
+        return batch
+
+
+class _TrackedReviewerStrategy(ReviewerStrategy):
+    """Стратегии, выбирающие по нагрузке из ReviewerLoadTracker"""
+
+    def __init__(self, max_open_reviews: int = REVIEWER_MAX_OPEN_REVIEWS,
+                 roster_cache: TeamRosterCache = team_roster_cache,
+                 tracker: ReviewerLoadTracker = reviewer_load_tracker):
+        super().__init__(max_open_reviews, roster_cache)
+        self.tracker = tracker
+
+    async def choose(self, user_id: str, need_count: int,
+                     exclude_ids: list[str] | None,
+                     user_repo: UserRepository,
+                     team_repo: TeamRepository,
+                     reservation: str | None = None) -> list[str]:
+        team_load = await self._get_team_load(user_id, user_repo, team_repo)
+        exclude = {str(excluded) for excluded in exclude_ids or []}
+        exclude.add(str(user_id))
+        chosen = self._pick(team_load, need_count, exclude)
+        if reservation is not None:
+            # между выбором и резервом нет await: параллельный запрос
+            # увидит эту нагрузку, пока PR пишется в БД
+            for member_id in chosen:
+                team_load.assign(reservation, member_id)
+        return chosen
+
+    async def choose_replacements(self, user_id: str, need_count: int,
+                                  user_repo: UserRepository,
+                                  team_repo: TeamRepository) -> list[str]:
+        team_load = await self._get_team_load(user_id, user_repo, team_repo)
+        return self._pick(team_load, need_count, {str(user_id)},
+                          advance=False)
+
+    async def choose_batch(self, user_id: str, count: int, need_count: int,
+                           user_repo: UserRepository,
+                           team_repo: TeamRepository,
+                           reservation: str | None = None
+                           ) -> list[list[str]]:
+        team_load = await self._get_team_load(user_id, user_repo, team_repo)
+        exclude = {str(user_id)}
+        batch = []
+        # пока PR не созданы, выбор учитывается под временными ключами,
+        # чтобы следующие PR пачки видели нагрузку; без reservation
+        # ключи снимаются здесь же, между assign и release нет await
+        prefix = reservation if reservation is not None else "batch"
+        for position in range(count):
+            chosen = self._pick(team_load, need_count, exclude)
+            for member_id in chosen:
+                team_load.assign(f"{prefix}:{position}", member_id)
+            batch.append(chosen)
+        if reservation is None:
+            for position, chosen in enumerate(batch):
+                for member_id in chosen:
+                    team_load.release(f"{prefix}:{position}", member_id)
+        return batch
+
+    async def _get_team_load(self, user_id: str, user_repo: UserRepository,
+                             team_repo: TeamRepository) -> TeamReviewLoad:
+        roster = await self._get_roster(user_id, user_repo, team_repo)
+        team_id = str(roster.team.id)
+        team_load = self.tracker.get(team_id)
+        if team_load is None:
+            open_reviews = await user_repo.get_team_open_reviews(team_id)
+            # пока читали, команду мог загрузить параллельный запрос и
+            # зарезервировать в ней ревьюеров - её не затираем
+            team_load = self.tracker.get(team_id)
+            if team_load is None:
+                team_load = self.tracker.load(team_id, open_reviews)
+        return team_load
+
+    @abstractmethod
+    def _pick(self, team_load: TeamReviewLoad, need_count: int,
+              exclude: set[str], advance: bool = True) -> list[str]:
+        pass
+
+
+class RoundRobinReviewerStrategy(_TrackedReviewerStrategy):
+    """Участники команды по очереди"""
+
+    name = "round_robin"
+
+    def _pick(self, team_load: TeamReviewLoad, need_count: int,
+              exclude: set[str], advance: bool = True) -> list[str]:
+        return team_load.round_robin(need_count, exclude,
+                                     self.max_open_reviews, advance)
+
+    def replaced(self, reviewer_id: str):
+        team_load = self.tracker.team_of(reviewer_id)
+        if team_load:
+            team_load.advance_round_robin(reviewer_id)
+
+
+class LeastOpenReviewsStrategy(_TrackedReviewerStrategy):
+    """Участники команды с наименьшим числом открытых ревью"""
+
+    name = "least_open_reviews"
+
+    def _pick(self, team_load: TeamReviewLoad, need_count: int,
+              exclude: set[str], advance: bool = True) -> list[str]:
+        return team_load.least_loaded(need_count, exclude,
+                                      self.max_open_reviews)
+
+
+REVIEWER_STRATEGIES: dict[str, type[ReviewerStrategy]] = {
+    strategy.name: strategy
+    for strategy in (
+        RandomReviewerStrategy,
+        RoundRobinReviewerStrategy,
+        LeastOpenReviewsStrategy,
+    )
+}
+
+
+def get_reviewer_strategy(name: str = REVIEWER_ASSIGNMENT_STRATEGY
+                          ) -> ReviewerStrategy:
+    """Создаёт стратегию выбора ревьюеров по имени из конфигурации"""
+    try:
+        return REVIEWER_STRATEGIES[name]()
+    except KeyError:
+        raise RuntimeError(
+            f"Unknown reviewer assignment strategy '{name}', "
+            f"expected one of: {', '.join(REVIEWER_STRATEGIES)}"
+        )
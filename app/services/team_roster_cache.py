@@ -0,0 +1,140 @@
+import itertools
+import time
+from collections import OrderedDict
+
+from app.core.config import (
+    TEAM_ROSTER_CACHE_SIZE, TEAM_ROSTER_CACHE_TTL_SECONDS,
+)
+from app.database.invalidation import TEAM_TOPIC, invalidation_bus
+from app.repositories import TeamRepository
+from app.schemas import TeamOut
+
+
+class TeamRoster:
+    """Снимок команды: данные для /team/get и активные участники"""
+
+    def __init__(self, team: TeamOut, version: int):
+        self.team = team
+        self.version = version
+        self.member_ids = tuple(str(member.id) for member in team.members)
+        self.active_member_ids = tuple(
+            str(member.id) for member in team.members if member.is_active
+        )
+        self.member_count = len(self.member_ids)
+        self.loaded_at = time.monotonic()
+
+
+class TeamRosterCache:
+    """LRU+TTL кэш составов команд в памяти процесса
+
+    Записи сбрасываются по шине invalidation_bus, в которую репозитории
+    публикуют изменения составов после commit. Загрузка, начавшаяся
+    до сброса, в кэш уже не попадает. Заполняется кэш только чтениями
+    из основной БД: отстающая реплика вернула бы в него старый состав.
+    Каждая загрузка получает новый номер версии, по нему видно, что
+    состав перечитан.
+    """
+
+    def __init__(self, max_size: int = TEAM_ROSTER_CACHE_SIZE,
+                 ttl_seconds: float = TEAM_ROSTER_CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._rosters: OrderedDict[str, TeamRoster] = OrderedDict()
+        self._member_team: dict[str, str] = {}
+        self._versions = itertools.count(1)
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, team_id: str) -> TeamRoster | None:
+        team_id = str(team_id)
+        roster = self._rosters.get(team_id)
+        if roster is not None and (time.monotonic() - roster.loaded_at
+                                   > self.ttl_seconds):
+            self._drop(team_id)
+            self.evictions += 1
+            roster = None
+        if roster is None:
+            self.misses += 1
+            return None
+        self._rosters.move_to_end(team_id)
+        self.hits += 1
+        return roster
+
+    async def get_or_load(self, team_id: str, team_repo: TeamRepository,
+                          store: bool = True) -> TeamRoster | None:
+        """Состав команды из кэша или из БД, None - команды нет
+
+        store=False - прочитанное из БД только отдаётся, в кэш не
+        попадает (чтение с реплики, которая может отставать).
+        """
+        roster = self.get(team_id)
+        if roster is not None:
+            return roster
+        epoch = self._epoch
+        team = await team_repo.get_team_by_id(team_id=team_id)
+        if team is None:
+            return None
+        if not store or epoch != self._epoch:
+            # читали с реплики или состав поменялся: отдаём, не кэшируя
+            return TeamRoster(team, next(self._versions))
+        return self.put(team)
+
+    def put(self, team: TeamOut) -> TeamRoster:
+        team_id = str(team.id)
+        self._drop(team_id)
+        roster = TeamRoster(team, next(self._versions))
+        self._rosters[team_id] = roster
+        for member_id in roster.member_ids:
+            self._member_team[member_id] = team_id
+        while len(self._rosters) > self.max_size:
+            self._drop(next(iter(self._rosters)))
+            self.evictions += 1
+        return roster
+
+    def team_of(self, user_id: str) -> str | None:
+        """Команда пользователя, если она сейчас в кэше"""
+        return self._member_team.get(str(user_id))
+
+    def invalidate(self, team_id: str | None):
+        self._epoch += 1
+        self.invalidations += 1
+        if team_id is not None:
+            self._drop(str(team_id))
+
+    def on_invalidation(self, team_id: str | None):
+        """Обработчик шины: None - сбросить весь кэш"""
+        if team_id is None:
+            self.clear()
+        else:
+            self.invalidate(team_id)
+
+    def clear(self):
+        self._epoch += 1
+        self._rosters.clear()
+        self._member_team.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._rosters),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def _drop(self, team_id: str):
+        roster = self._rosters.pop(team_id, None)
+        if roster is not None:
+            for member_id in roster.member_ids:
+                if self._member_team.get(member_id) == team_id:
+                    del self._member_team[member_id]
+
+
+team_roster_cache = TeamRosterCache()
+invalidation_bus.subscribe(TEAM_TOPIC, team_roster_cache.on_invalidation)
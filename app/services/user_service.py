@@ -1,4 +1,6 @@
-from app.repositories import UserRepository
+from app.core.config import REVIEW_PAGE_SIZE
+from app.enums import PRStatus
+from app.repositories import UserRepository, decode_review_cursor
 from app.schemas import UserOut
 
 
@@ -10,24 +12,48 @@ class UserService:
         user_id: str,
         is_active: bool
     ) -> UserOut:
-        user = await user_repo.get_user_by_id(user_id=user_id)
-        if not user:
-            raise ValueError("User not found")
-
-        user.is_active = is_active
-        updated_user = await user_repo.update_user(user=user)
+        updated_user = await user_repo.set_user_is_active(
+            user_id=user_id,
+            is_active=is_active,
+        )
         if not updated_user:
-            raise Exception("Failed to update user active status")
+            raise ValueError("User not found")
 
         return updated_user
 
+    @classmethod
+    async def deactivate_users(
+        cls,
+        user_repo: UserRepository,
+        user_ids: list[str] | None = None,
+        team_id: str | None = None,
+    ) -> dict:
+        result = await user_repo.deactivate_users(
+            user_ids=user_ids,
+            team_id=team_id,
+        )
+        if result is None:
+            raise ValueError("Users not found")
+
+        return result
+
     @classmethod
     async def get_user_review(
         cls,
         user_repo: UserRepository,
-        user_id: str
+        user_id: str,
+        status: PRStatus | None = None,
+        limit: int = REVIEW_PAGE_SIZE,
+        cursor: str | None = None,
     ) -> dict | None:
-        user_prs = await user_repo.get_user_prs_when_reviewer(user_id=user_id)
-        if user_prs is None:
+        """Страница ревью пользователя, ValueError - если курсор битый"""
+        page = await user_repo.get_user_prs_when_reviewer(
+            user_id=user_id,
+            status=status,
+            limit=limit,
+            cursor=decode_review_cursor(cursor) if cursor else None,
+        )
+        if page is None:
             return None
-        return {"user_id": user_id, "prs": user_prs}
+        user_prs, next_cursor = page
+        return {"user_id": user_id, "prs": user_prs, "next_cursor": next_cursor}
@@ -0,0 +1,67 @@
+"""Поток одновременных /pullRequest/create: своя транзакция на каждый
+PR против групповой записи (PR_GROUP_COMMIT_ENABLED)
+
+Запуск: python -m benchmarks.bench_group_commit
+Использует тестовую БД из .env (test_db_*), схема создаётся и удаляется.
+CONCURRENCY клиентов создают PR без пауз; каждый запрос, как в
+приложении, открывает свою сессию и вызывает
+PullRequestRepository.create_pull_request.
+"""
+import asyncio
+import time
+
+from app.repositories import PullRequestRepository, pull_request_repository
+from app.repositories.pull_request_batcher import PullRequestCreateBatcher
+from benchmarks.common import bench_session_maker, seed_team, run
+
+TOTAL = 3_000
+CONCURRENCY = 64
+
+
+async def load(session_maker, author_id, reviewers, prefix: str) -> float:
+    """Созданных PR в секунду"""
+    names = iter(range(TOTAL))
+
+    async def client():
+        for i in names:
+            async with session_maker() as session:
+                await PullRequestRepository(session).create_pull_request(
+                    name=f"{prefix}-{i}", author_id=author_id,
+                    reviewers=reviewers,
+                )
+
+    started = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(CONCURRENCY)])
+    return TOTAL / (time.perf_counter() - started)
+
+
+async def main():
+    async with bench_session_maker() as session_maker:
+        async with session_maker() as session:
+            author_id, *reviewers = await seed_team(session, 3)
+        reviewers = [str(reviewer) for reviewer in reviewers]
+
+        batcher = PullRequestCreateBatcher(enabled=False)
+        pull_request_repository.pr_create_batcher = batcher
+        await load(session_maker, author_id, reviewers, "warmup")
+        results = {"per request": await load(session_maker, author_id,
+                                             reviewers, "single")}
+        batcher.enabled = True
+        await load(session_maker, author_id, reviewers, "warmup-group")
+        batcher.reset_stats()
+        results["group commit"] = await load(session_maker, author_id,
+                                             reviewers, "group")
+        stats = batcher.stats()
+
+    print(f"{TOTAL} PRs, {CONCURRENCY} concurrent clients")
+    print(f"{'path':>14} {'PR/s':>9}")
+    for name, rate in results.items():
+        print(f"{name:>14} {rate:>9.0f}")
+    print(f"group commit: {stats['batches']} batches, "
+          f"avg size {stats['batch_avg_size']}, max {stats['batch_max_size']}, "
+          f"wait avg {stats['wait_avg_ms']} ms, "
+          f"commit avg {stats['commit_avg_ms']} ms")
+
+
+if __name__ == "__main__":
+    run(main)
@@ -0,0 +1,92 @@
+"""Форматирование записи лога: прежний %-шаблон "json" против JsonFormatter
+
+Запуск: python -m benchmarks.bench_log_format
+БД не нужна. Кроме скорости печатается доля строк, которые читаются
+как JSON: в сообщениях есть кавычки и переводы строк.
+"""
+import json
+import logging
+import time
+import uuid
+
+from app.core.config.logging import (
+    JsonFormatter, MoscowTimeFormatter, RequestContextFilter,
+    request_log_context,
+)
+
+REPEAT = 100_000
+TEMPLATE = ('{"timestamp": "%(asctime)s", '
+            '"logger": "%(name)s", '
+            '"level": "%(levelname)s", '
+            '"function": "%(funcName)s", '
+            '"line": %(lineno)d, '
+            '"message": "%(message)s"}')
+MESSAGES = (
+    "Team found by ID: {}",
+    'Team already exists: "{}"',
+    "Authenticate error for username={}:\nconnection reset",
+)
+
+
+def make_records() -> list[logging.LogRecord]:
+    records = []
+    for i in range(REPEAT):
+        message = MESSAGES[i % len(MESSAGES)].format(uuid.uuid4())
+        record = logging.LogRecord("APP_LOGGER", logging.INFO,
+                                   "/app/repositories/team_repository.py",
+                                   37, "%s", (message,), None,
+                                   func="get_team_by_id")
+        records.append(record)
+    return records
+
+
+def valid_share(lines: list[str]) -> float:
+    valid = 0
+    for line in lines:
+        try:
+            json.loads(line)
+            valid += 1
+        except ValueError:
+            pass
+    return valid / len(lines)
+
+
+def bench(formatter: logging.Formatter, records: list[logging.LogRecord],
+          context_filter: logging.Filter | None = None
+          ) -> tuple[float, float]:
+    started = time.perf_counter()
+    lines = []
+    for record in records:
+        if context_filter is not None:
+            context_filter.filter(record)
+        lines.append(formatter.format(record))
+    elapsed = time.perf_counter() - started
+    return len(records) / elapsed, valid_share(lines)
+
+
+def main():
+    datefmt = "%Y-%m-%d %H:%M:%S"
+    results = {
+        "template": bench(MoscowTimeFormatter(TEMPLATE, datefmt),
+                          make_records()),
+        "json": bench(JsonFormatter(datefmt=datefmt), make_records()),
+    }
+    # то же внутри запроса: поля контекста в каждой записи
+    token = request_log_context.set({
+        "request_id": uuid.uuid4().hex, "method": "GET", "path": "/team/get",
+        "scope": {}, "started": time.perf_counter(),
+        "user_id": str(uuid.uuid4()),
+    })
+    try:
+        results["json+ctx"] = bench(JsonFormatter(datefmt=datefmt),
+                                    make_records(), RequestContextFilter())
+    finally:
+        request_log_context.reset(token)
+
+    print(f"{'formatter':>10} {'records/s':>12} {'valid JSON':>11}")
+    for name, (rate, valid) in results.items():
+        print(f"{name:>10} {rate:>12,.0f} {valid:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Стоимость вызова lprint: прежнее форматирование до проверки уровня
+против ленивого фасада
+
+Запуск: python -m benchmarks.bench_logging
+БД не нужна. Записи пишутся в память через тот же форматтер, что и в
+приложении, так что включённый уровень включает и форматирование записи.
+"""
+import datetime
+import inspect
+import io
+import logging
+import time
+import uuid
+
+from app.core.config.logging import MoscowTimeFormatter
+from app.core.config.lprint import lprint
+
+REPEAT = 200_000
+FORMAT = ("%(name)s - %(levelname)s - "
+          "[%(asctime)s] %(filename)s:%(funcName)s - %(message)s")
+
+
+def bench_logger() -> logging.Logger:
+    logger = logging.getLogger("BENCH_LOGGER")
+    logger.propagate = False
+    handler = logging.StreamHandler(io.StringIO())
+    handler.setFormatter(MoscowTimeFormatter(FORMAT, "%Y-%m-%d %H:%M:%S"))
+    logger.handlers = [handler]
+    return logger
+
+
+class lazy_lprint(lprint):
+    logger = bench_logger()
+
+
+class eager_lprint:
+    """Прежний lprint: время, стек и строка считаются до проверки уровня"""
+
+    logger = lazy_lprint.logger
+
+    @classmethod
+    def _log(cls, level, text, *args):
+        moscow_time = (datetime.datetime.now(datetime.timezone.utc)
+                       + datetime.timedelta(hours=3))
+        time_str = moscow_time.strftime("%Y-%m-%d %H:%M:%S")
+        frame = inspect.currentframe().f_back.f_back
+        caller = (f"{frame.f_code.co_filename.split(chr(92))[-1]}"
+                  f":{frame.f_code.co_name}")
+        message = f"[{time_str}] {caller} - {text}"
+        if args:
+            message += " " + " ".join(map(str, args))
+        getattr(cls.logger, level)(message)
+
+    @classmethod
+    def debug(cls, text, *args):
+        cls._log("debug", text, *args)
+
+
+def per_call_us(log, user_id) -> float:
+    started = time.perf_counter()
+    for _ in range(REPEAT):
+        log.debug("User found by ID:", user_id)
+    return (time.perf_counter() - started) / REPEAT * 1_000_000
+
+
+def main():
+    user_id = uuid.uuid4()
+    print(f"{'level':>10} {'eager us/call':>14} {'lazy us/call':>13}")
+    for name, level in (("disabled", logging.INFO), ("enabled", logging.DEBUG)):
+        lazy_lprint.logger.setLevel(level)
+        eager_us = per_call_us(eager_lprint, user_id)
+        lazy_us = per_call_us(lazy_lprint, user_id)
+        print(f"{name:>10} {eager_us:>14.3f} {lazy_us:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
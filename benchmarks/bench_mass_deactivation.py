@@ -0,0 +1,75 @@
+"""Массовая деактивация: команда из 500 человек с 20 000 открытых PR,
+деактивируется часть команды и вся команда
+
+Запуск: python -m benchmarks.bench_mass_deactivation
+Использует тестовую БД из .env (test_db_*), схема создаётся и удаляется.
+Замеряется UserRepository.deactivate_users целиком: пользователи,
+refresh-токены и переназначение открытых ревью в одной транзакции.
+"""
+import random
+import time
+import uuid
+
+from sqlalchemy import insert, select
+
+from app.database import PullRequest, ReviewerPullRequestAssignment, User
+from app.repositories import UserRepository
+from benchmarks.common import bench_session_maker, seed_team, run
+
+TEAM_SIZE = 500
+PR_COUNT = 20_000
+REVIEWERS_PER_PR = 2
+LEAVING = 50
+
+
+async def seed_reviews(session, user_ids: list[uuid.UUID]):
+    rng = random.Random(42)
+    prs, assignments = [], []
+    for i in range(PR_COUNT):
+        pr_id = uuid.uuid4()
+        author_id, *reviewers = rng.sample(user_ids, REVIEWERS_PER_PR + 1)
+        prs.append({"id": pr_id, "name": f"pr-{i}", "author_id": author_id})
+        assignments += [{"pr_id": pr_id, "user_id": reviewer}
+                        for reviewer in reviewers]
+    for start in range(0, PR_COUNT, 5000):
+        await session.execute(insert(PullRequest), prs[start:start + 5000])
+    for start in range(0, len(assignments), 5000):
+        await session.execute(insert(ReviewerPullRequestAssignment),
+                              assignments[start:start + 5000])
+    await session.commit()
+
+
+async def main():
+    async with bench_session_maker() as session_maker:
+        async with session_maker() as session:
+            user_ids = await seed_team(session, TEAM_SIZE)
+            await seed_reviews(session, user_ids)
+            team_id = await session.scalar(
+                select(User.team_id).where(User.id == user_ids[0])
+            )
+
+        results = {}
+        async with session_maker() as session:
+            started = time.perf_counter()
+            result = await UserRepository(session).deactivate_users(
+                user_ids=[str(user_id) for user_id in user_ids[:LEAVING]],
+            )
+            results[f"{LEAVING} users"] = (time.perf_counter() - started,
+                                           result)
+        async with session_maker() as session:
+            started = time.perf_counter()
+            result = await UserRepository(session).deactivate_users(
+                team_id=str(team_id),
+            )
+            results["whole team"] = (time.perf_counter() - started, result)
+
+    print(f"team of {TEAM_SIZE}, {PR_COUNT} open PRs, "
+          f"{REVIEWERS_PER_PR} reviewers each")
+    print(f"{'deactivated':>12} {'ms':>8} {'reassigned':>11} {'left':>6}")
+    for name, (elapsed, result) in results.items():
+        print(f"{name:>12} {elapsed * 1000:>8.1f} {result['reassigned']:>11} "
+              f"{len(result['not_reassigned']):>6}")
+
+
+if __name__ == "__main__":
+    run(main)
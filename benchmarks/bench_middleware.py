@@ -0,0 +1,90 @@
+"""Накладные расходы DocsAuthMiddleware на обычный запрос:
+прежняя версия на BaseHTTPMiddleware против чистого ASGI
+
+Запуск: python -m benchmarks.bench_middleware
+БД не нужна. Приложение с одним пустым маршрутом вызывается напрямую
+через ASGI, без HTTP-сервера и клиента.
+"""
+import base64
+
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.config.config import DOCS_USERNAME, DOCS_PASSWORD
+from app.middleware import DocsAuthMiddleware
+from benchmarks.common import timeit, run
+
+REPEAT = 5_000
+
+
+class BaseHTTPDocsAuthMiddleware(BaseHTTPMiddleware):
+    """Прежняя DocsAuthMiddleware"""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.protected_paths = ["/docs", "/redoc", "/openapi.json"]
+
+    async def dispatch(self, request: Request, call_next):
+        if any(request.url.path.startswith(path)
+               for path in self.protected_paths):
+            authorization = request.headers.get("Authorization", "")
+            try:
+                username, password = base64.b64decode(
+                    authorization.split(" ")[1]
+                ).decode("utf-8").split(":", 1)
+            except (ValueError, IndexError, UnicodeDecodeError):
+                return Response("Unauthorized", status_code=401)
+            if username == DOCS_USERNAME and password == DOCS_PASSWORD:
+                return await call_next(request)
+            return Response("Unauthorized", status_code=401)
+        return await call_next(request)
+
+
+def make_app(middleware=None) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"status": True}
+
+    if middleware is not None:
+        app.add_middleware(middleware)
+    return app
+
+
+async def call(app: FastAPI):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": "/ping", "raw_path": b"/ping",
+        "query_string": b"", "root_path": "", "headers": [],
+        "client": ("127.0.0.1", 1), "server": ("test", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def main():
+    apps = {
+        "none": make_app(),
+        "basehttp": make_app(BaseHTTPDocsAuthMiddleware),
+        "asgi": make_app(DocsAuthMiddleware),
+    }
+    results = {}
+    for name, app in apps.items():
+        results[name] = await timeit(lambda app=app: call(app), REPEAT)
+
+    print(f"{'middleware':>10} {'us/request':>11} {'overhead us':>12}")
+    for name, ms in results.items():
+        print(f"{name:>10} {ms * 1000:>11.1f} "
+              f"{(ms - results['none']) * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    run(main)
@@ -0,0 +1,90 @@
+"""Пачка PR от CI-бота: N вызовов /pullRequest/create и /merge
+против одного /pullRequest/createBatch и /mergeBatch
+
+Запуск: python -m benchmarks.bench_pr_batch
+Использует тестовую БД из .env (test_db_*), схема создаётся и удаляется.
+Запросы идут через ASGI без HTTP-сервера, время - настенное, вместе с БД.
+"""
+import time
+
+from httpx import ASGITransport, AsyncClient
+
+from app.core.security import create_jwt_token
+from app.database.database import get_async_session, read_session_router
+from app.enums import UserRoleEnum
+from app.schemas import UserTokenData
+from benchmarks.common import bench_session_maker, seed_team, run
+from main import app
+
+BATCH_SIZE = 200
+
+
+def headers_for(user_id) -> dict:
+    token = create_jwt_token(UserTokenData(
+        id=str(user_id), role=UserRoleEnum.USER,
+    ))
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def one_by_one(client, author, reviewer, prefix: str) -> tuple[float, float]:
+    started = time.perf_counter()
+    pr_ids = []
+    for i in range(BATCH_SIZE):
+        response = await client.post("/pullRequest/create",
+                                     json={"name": f"{prefix}-{i}"},
+                                     headers=author)
+        pr_ids.append(response.json()["pull_request"]["id"])
+    created = time.perf_counter()
+    for pr_id in pr_ids:
+        response = await client.post("/pullRequest/merge", json={"id": pr_id},
+                                     headers=reviewer)
+        assert response.status_code == 200
+    return created - started, time.perf_counter() - created
+
+
+async def batched(client, author, reviewer, prefix: str) -> tuple[float, float]:
+    started = time.perf_counter()
+    response = await client.post(
+        "/pullRequest/createBatch", headers=author,
+        json={"names": [f"{prefix}-{i}" for i in range(BATCH_SIZE)]},
+    )
+    pr_ids = [result["pull_request"]["id"]
+              for result in response.json()["results"]]
+    created = time.perf_counter()
+    response = await client.post("/pullRequest/mergeBatch",
+                                 json={"ids": pr_ids}, headers=reviewer)
+    assert all(result["status"] == "MERGED"
+               for result in response.json()["results"])
+    return created - started, time.perf_counter() - created
+
+
+async def main():
+    async with bench_session_maker() as session_maker:
+        async with session_maker() as session:
+            author_id, reviewer_id, _ = await seed_team(session, 3)
+
+        async def override_get_async_session():
+            async with session_maker() as session:
+                yield session
+
+        app.dependency_overrides[get_async_session] = override_get_async_session
+        read_session_router.primary = session_maker
+        read_session_router.replica = session_maker
+        author, reviewer = headers_for(author_id), headers_for(reviewer_id)
+        async with AsyncClient(transport=ASGITransport(app=app),
+                               base_url="http://bench") as client:
+            await batched(client, author, reviewer, "warmup")
+            results = {
+                "one by one": await one_by_one(client, author, reviewer, "single"),
+                "batch": await batched(client, author, reviewer, "batch"),
+            }
+        app.dependency_overrides.clear()
+
+    print(f"{BATCH_SIZE} PRs, ms for the whole burst")
+    print(f"{'path':>12} {'create':>9} {'merge':>9}")
+    for name, (create_s, merge_s) in results.items():
+        print(f"{name:>12} {create_s * 1000:>9.1f} {merge_s * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    run(main)
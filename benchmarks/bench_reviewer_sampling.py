@@ -0,0 +1,58 @@
+"""Выбор ревьюеров: загрузка всей команды против выборки в БД
+
+Запуск: python -m benchmarks.bench_reviewer_sampling
+Использует тестовую БД из .env (test_db_*), схема создаётся и удаляется.
+"""
+from random import shuffle as rnd_shuffle
+
+from app.core.config import COUNT_REVIEWERS_FOR_PR
+from app.repositories import TeamRepository, UserRepository
+from benchmarks.common import bench_session_maker, seed_team, timeit, run
+
+TEAM_SIZES = (10, 100, 1_000, 10_000, 100_000)
+
+
+async def legacy_get_reviewers(user_repo: UserRepository,
+                               team_repo: TeamRepository,
+                               user_id: str) -> list[str]:
+    """Прежний путь: пользователь + вся команда + shuffle в Python"""
+    user = await user_repo.get_user_by_id(user_id=user_id)
+    team = await team_repo.get_team_by_id(team_id=user.team_id)
+    team_members = team.members
+    rnd_shuffle(team_members)
+    reviewers = []
+    for member in team_members:
+        if member.is_active and member.id != user_id:
+            reviewers.append(member.id)
+            if len(reviewers) >= COUNT_REVIEWERS_FOR_PR:
+                break
+    return reviewers
+
+
+async def main():
+    async with bench_session_maker() as session_maker:
+        print(f"{'team size':>10} {'legacy, ms':>12} {'sampled, ms':>12}")
+        for size in TEAM_SIZES:
+            async with session_maker() as session:
+                author_id = str((await seed_team(session, size))[0])
+                user_repo = UserRepository(session)
+                team_repo = TeamRepository(session)
+                repeat = max(3, 2000 // size)
+
+                async def legacy():
+                    session.expunge_all()
+                    await legacy_get_reviewers(user_repo, team_repo, author_id)
+
+                async def sampled():
+                    await user_repo.sample_reviewer_ids(
+                        author_id=author_id,
+                        need_count=COUNT_REVIEWERS_FOR_PR,
+                    )
+
+                legacy_ms = await timeit(legacy, repeat)
+                sampled_ms = await timeit(sampled, repeat)
+            print(f"{size:>10} {legacy_ms:>12.2f} {sampled_ms:>12.2f}")
+
+
+if __name__ == "__main__":
+    run(main)
@@ -0,0 +1,41 @@
+"""Проверка JWT на запрос: полный jwt.decode против кэша проверенных токенов
+
+Запуск: python -m benchmarks.bench_token_auth
+БД не нужна, замеряется только зависимость get_user_info_by_token.
+"""
+import uuid
+
+from app.core.security import create_jwt_token, get_user_info_by_token
+from app.core.security.token_cache import token_cache
+from app.enums import UserRoleEnum
+from app.schemas import UserTokenData
+from benchmarks.common import timeit, run
+
+REPEAT = 20_000
+
+
+async def main():
+    token = create_jwt_token(UserTokenData(
+        id=str(uuid.uuid4()), role=UserRoleEnum.USER, team_id=str(uuid.uuid4()),
+    ))
+
+    async def uncached():
+        token_cache.clear()
+        get_user_info_by_token(token)
+
+    async def cached():
+        get_user_info_by_token(token)
+
+    async def baseline():
+        token_cache.clear()
+
+    baseline_ms = await timeit(baseline, REPEAT)
+    uncached_ms = await timeit(uncached, REPEAT) - baseline_ms
+    cached_ms = await timeit(cached, REPEAT)
+    print(f"{'path':>10} {'us/request':>12}")
+    print(f"{'decode':>10} {uncached_ms * 1000:>12.2f}")
+    print(f"{'cached':>10} {cached_ms * 1000:>12.2f}")
+
+
+if __name__ == "__main__":
+    run(main)
@@ -0,0 +1,134 @@
+"""Ответ /users/getReview для ревьюера с 1000 PR: прежняя сериализация
+(валидация, dump в dict, повторная валидация response_model, json.dumps)
+против одной валидации и model_dump_json
+
+Запуск: python -m benchmarks.bench_user_review
+Использует тестовую БД из .env (test_db_*), схема создаётся и удаляется.
+Сериализация замеряется на одних и тех же загруженных объектах ORM,
+эндпоинт целиком - через ASGI, в процессорном времени процесса:
+страница максимального размера и страница по умолчанию.
+"""
+import json
+import time
+import uuid
+
+from fastapi.encoders import jsonable_encoder
+from httpx import ASGITransport, AsyncClient
+from pydantic import Field, TypeAdapter
+from sqlalchemy import insert, select
+from sqlalchemy.orm import selectinload
+
+from app.core.config import REVIEW_PAGE_SIZE, REVIEW_PAGE_MAX_SIZE
+from app.core.security import create_jwt_token
+from app.database import PullRequest, ReviewerPullRequestAssignment, User
+from app.database.database import read_session_router
+from app.enums import UserRoleEnum
+from app.schemas import (
+    PullRequestOut, SimpleResponse, UserReviewPRsResponse, UserTokenData,
+)
+from benchmarks.common import bench_session_maker, seed_team, run
+from main import app
+
+PR_COUNT = 1_000
+REPEAT = 20
+
+
+class LegacyUserReviewPRsResponse(SimpleResponse):
+    """Прежняя схема ответа: PR как произвольные dict"""
+    user_id: str
+    reviews_in: list[dict] = Field(...)
+
+
+legacy_adapter = TypeAdapter(LegacyUserReviewPRsResponse)
+
+
+def legacy_serialize(user_id: str, prs) -> bytes:
+    reviews = [PullRequestOut.model_validate(pr, from_attributes=True)
+               .model_dump(mode="json") for pr in prs]
+    content = {"status": True, "message": "ok", "user_id": user_id,
+               "reviews_in": reviews}
+    # что делал FastAPI с dict при response_model
+    value = legacy_adapter.validate_python(content)
+    data = jsonable_encoder(legacy_adapter.dump_python(value, mode="json"))
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def single_pass_serialize(user_id: str, prs) -> bytes:
+    reviews = [PullRequestOut.model_validate(pr, from_attributes=True)
+               for pr in prs]
+    return UserReviewPRsResponse(
+        status=True, message="ok", user_id=user_id, reviews_in=reviews,
+    ).model_dump_json().encode()
+
+
+def cpu_ms(func, repeat: int = REPEAT) -> float:
+    func()
+    started = time.process_time()
+    for _ in range(repeat):
+        func()
+    return (time.process_time() - started) / repeat * 1000
+
+
+async def seed_reviews(session, reviewer_id: uuid.UUID,
+                       author_id: uuid.UUID):
+    pr_ids = [uuid.uuid4() for _ in range(PR_COUNT)]
+    await session.execute(insert(PullRequest), [
+        {"id": pr_id, "name": f"pr-{pr_id.hex[:8]}", "author_id": author_id}
+        for pr_id in pr_ids
+    ])
+    await session.execute(insert(ReviewerPullRequestAssignment), [
+        {"pr_id": pr_id, "user_id": reviewer_id} for pr_id in pr_ids
+    ])
+    await session.commit()
+
+
+async def main():
+    async with bench_session_maker() as session_maker:
+        async with session_maker() as session:
+            author_id, reviewer_id = await seed_team(session, 2)
+            await seed_reviews(session, reviewer_id, author_id)
+            user = (await session.execute(
+                select(User)
+                .where(User.id == reviewer_id)
+                .options(selectinload(User.pull_requests_as_reviewer)
+                         .selectinload(PullRequest.reviewers))
+            )).scalars().one()
+            prs = user.pull_requests_as_reviewer
+            user_id = str(reviewer_id)
+            assert ({**json.loads(legacy_serialize(user_id, prs)),
+                     "next_cursor": None}
+                    == json.loads(single_pass_serialize(user_id, prs)))
+            legacy_ms = cpu_ms(lambda: legacy_serialize(user_id, prs))
+            single_ms = cpu_ms(lambda: single_pass_serialize(user_id, prs))
+
+        read_session_router.primary = session_maker
+        read_session_router.replica = session_maker
+        token = create_jwt_token(UserTokenData(
+            id=user_id, role=UserRoleEnum.USER,
+        ))
+        async with AsyncClient(transport=ASGITransport(app=app),
+                               base_url="http://bench") as client:
+            headers = {"Authorization": f"Bearer {token}"}
+            endpoint_ms = {}
+            for limit in (REVIEW_PAGE_MAX_SIZE, REVIEW_PAGE_SIZE):
+                params = {"limit": limit}
+                response = await client.get("/users/getReview", params=params,
+                                            headers=headers)
+                assert len(response.json()["reviews_in"]) == limit
+                started = time.process_time()
+                for _ in range(REPEAT):
+                    await client.get("/users/getReview", params=params,
+                                     headers=headers)
+                endpoint_ms[limit] = ((time.process_time() - started)
+                                      / REPEAT * 1000)
+
+    print(f"{PR_COUNT} PRs, CPU ms per response")
+    print(f"{'legacy serialization':>24} {legacy_ms:>8.2f}")
+    print(f"{'single pass':>24} {single_ms:>8.2f}")
+    print(f"{'saved':>24} {legacy_ms - single_ms:>8.2f}")
+    for limit, ms in endpoint_ms.items():
+        print(f"{f'endpoint, {limit} per page':>24} {ms:>8.2f}")
+
+
+if __name__ == "__main__":
+    run(main)
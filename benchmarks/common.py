@@ -0,0 +1,66 @@
+import asyncio
+import time
+import uuid
+from contextlib import asynccontextmanager
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import (
+    create_async_engine, async_sessionmaker, AsyncSession
+)
+
+from app.core.config.config import TEST_ASYNC_DATABASE_URL
+from app.database import Base, Team, User
+
+
+@asynccontextmanager
+async def bench_session_maker():
+    """Поднимает схему в тестовой БД и удаляет её после замеров"""
+    engine = create_async_engine(TEST_ASYNC_DATABASE_URL, echo=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        yield async_sessionmaker(engine, class_=AsyncSession,
+                                 expire_on_commit=False)
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+
+
+async def seed_team(session: AsyncSession, size: int,
+                    name: str | None = None) -> list[uuid.UUID]:
+    """Создаёт команду из size активных пользователей, возвращает их id"""
+    team_id = uuid.uuid4()
+    await session.execute(
+        insert(Team).values(id=team_id, name=name or f"team-{team_id.hex[:8]}")
+    )
+    user_ids = [uuid.uuid4() for _ in range(size)]
+    for start in range(0, size, 5000):
+        await session.execute(
+            insert(User),
+            [
+                {
+                    "id": user_id,
+                    "username": f"user-{user_id.hex}",
+                    "hashed_password": "x",
+                    "team_id": team_id,
+                }
+                for user_id in user_ids[start:start + 5000]
+            ],
+        )
+    await session.commit()
+    return user_ids
+
+
+async def timeit(func, repeat: int) -> float:
+    """Среднее время одного вызова корутины func в миллисекундах"""
+    await func()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def run(main):
+    asyncio.run(main())
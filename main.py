@@ -1,9 +1,13 @@
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.core.config.logging import setup_logging
-from app.middleware import DocsAuthMiddleware
+from app.core.config.logging import log_queue, setup_logging
+from app.core.security import password_hasher, token_revocation
+from app.database.invalidation import invalidation_bus
+from app.middleware import DocsAuthMiddleware, RequestContextMiddleware
 from app.routers import auth_router, users_router, teams_router, pull_request_router, health_router
 
 
@@ -11,10 +15,25 @@ from app.routers import auth_router, users_router, teams_router, pull_request_ro
 setup_logging()
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # стоимость bcrypt под PASSWORD_HASH_TARGET_MS на этой машине
+    await password_hasher.calibrate()
+    # шина сброса кэшей между воркерами
+    await invalidation_bus.start()
+    # номера поколений токенов деактивированных пользователей
+    await token_revocation.reload()
+    yield
+    await invalidation_bus.stop()
+    # дописать логи из очереди до выхода процесса
+    log_queue.stop()
+
+
 app = FastAPI(
     title="Сервис назначения ревьюеров для Pull Request’ов",
     description="FastAPI приложение для PR",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 
@@ -28,6 +47,8 @@ app.add_middleware(
 
 # кастомные middleware
 app.add_middleware(DocsAuthMiddleware)
+# снаружи остальных: request id есть у всех записей запроса
+app.add_middleware(RequestContextMiddleware)
 
 # routers
 app.include_router(auth_router, prefix="/auth")
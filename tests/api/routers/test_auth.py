@@ -1,7 +1,20 @@
+import asyncio
+import sys
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+import jwt
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import select
 
-from app.core.security import PasswordUtils
+from app.core.config.config import ALGORITHM, SECRET_KEY
+from app.core.security import PasswordUtils, token_cache, token_revocation
+from app.core.security.password_hasher import PasswordHasher
+from app.core.security.token_cache import VerifiedTokenCache
+from app.services import auth_service as auth_service_module
 from app.database import User
 from app.enums import UserRoleEnum
 
@@ -71,3 +84,308 @@ async def test_user_login_missing_fields(client: AsyncClient):
     }
     response = await client.post("/auth/login", data=login_data)
     assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_verified_token_cache(client: AsyncClient, db_session):
+    user = User(
+        username="testuser",
+        hashed_password=PasswordUtils.hash_password("password")[0],
+        role=UserRoleEnum.USER,
+    )
+    db_session.add(user)
+    await db_session.commit()
+    response = await client.post(
+        "/auth/login", data={"username": "testuser", "password": "password"},
+    )
+    token = response.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    token_cache.clear()
+    hits = token_cache.hits
+    for _ in range(3):
+        response = await client.get("/users/getReview", headers=headers)
+        assert response.status_code == 200
+    assert token_cache.hits - hits == 2
+
+    token_cache.invalidate_user(str(user.id))
+    assert token_cache.get(token) is None
+
+
+@pytest.mark.asyncio
+async def test_token_cache_bypassed_while_generations_reload(
+        client: AsyncClient, db_session, monkeypatch):
+    db_session.add(User(
+        username="testuser",
+        hashed_password=PasswordUtils.hash_password("password")[0],
+        role=UserRoleEnum.USER,
+    ))
+    await db_session.commit()
+    response = await client.post(
+        "/auth/login", data={"username": "testuser", "password": "password"},
+    )
+    token = response.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    reload_task = asyncio.get_running_loop().create_future()
+    monkeypatch.setattr(token_revocation, "_reload_task", reload_task)
+    token_cache.clear()
+    hits = token_cache.hits
+    for _ in range(2):
+        response = await client.get("/users/getReview", headers=headers)
+        assert response.status_code == 200
+    assert token_cache.hits == hits
+    assert token_cache.stats()["size"] == 0
+
+    reload_task.set_result(None)
+    response = await client.get("/users/getReview", headers=headers)
+    assert token_cache.stats()["size"] == 1
+
+
+def travel(monkeypatch, seconds: float):
+    """Сдвигает часы кэша токенов и проверки exp в PyJWT"""
+    now = time.time() + seconds
+
+    class ShiftedDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.fromtimestamp(now, tz)
+
+    monkeypatch.setattr(sys.modules[VerifiedTokenCache.__module__], "time",
+                        SimpleNamespace(time=lambda: now))
+    monkeypatch.setattr(jwt.api_jwt, "datetime", ShiftedDatetime)
+
+
+@pytest.mark.asyncio
+async def test_verified_token_cache_respects_exp(client: AsyncClient, db_session,
+                                                 monkeypatch):
+    user = User(
+        username="testuser",
+        hashed_password="x",
+        role=UserRoleEnum.USER,
+    )
+    db_session.add(user)
+    await db_session.commit()
+    token = jwt.encode(
+        {"id": str(user.id), "role": UserRoleEnum.USER.value, "team_id": None,
+         "exp": datetime.now(UTC) + timedelta(seconds=2)},
+        SECRET_KEY, algorithm=ALGORITHM,
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await client.get("/users/getReview", headers=headers)
+    assert response.status_code == 200
+    assert token_cache.get(token) is not None
+
+    travel(monkeypatch, 3)
+    response = await client.get("/users/getReview", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token has expired"
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_password_with_current_cost(client: AsyncClient,
+                                                         db_session,
+                                                         monkeypatch):
+    old_hash = PasswordUtils.hash_password("password", rounds=4)[0]
+    db_session.add(User(username="testuser", hashed_password=old_hash,
+                        role=UserRoleEnum.USER))
+    await db_session.commit()
+    monkeypatch.setattr(PasswordUtils, "rounds", 5)
+
+    response = await client.post(
+        "/auth/login", data={"username": "testuser", "password": "password"},
+    )
+    assert response.status_code == 200
+    new_hash = await db_session.scalar(
+        select(User.hashed_password).where(User.username == "testuser")
+    )
+    assert new_hash != old_hash
+    assert PasswordUtils.get_rounds(new_hash) == 5
+    assert PasswordUtils.verify_password("password", new_hash)
+
+    # хеш уже с текущей стоимостью - повторный вход его не трогает
+    response = await client.post(
+        "/auth/login", data={"username": "testuser", "password": "password"},
+    )
+    assert response.status_code == 200
+    assert await db_session.scalar(
+        select(User.hashed_password).where(User.username == "testuser")
+    ) == new_hash
+
+
+@pytest.mark.asyncio
+async def test_bcrypt_calibration(monkeypatch):
+    monkeypatch.setattr(PasswordUtils, "rounds", PasswordUtils.rounds)
+    hasher = PasswordHasher(concurrency=1)
+
+    calibration = await hasher.calibrate(target_ms=20, apply=True)
+    assert calibration["rounds"] >= 4
+    assert PasswordUtils.rounds == calibration["rounds"]
+    assert hasher.stats()["calibration"] == calibration
+    # следующая стоимость уже не уложилась бы в цель
+    assert calibration["hash_ms"] * 2 > 20 or calibration["rounds"] == 16
+
+    with pytest.raises(RuntimeError):
+        await hasher.calibrate(target_ms=0, apply=True)
+
+
+async def add_slow_user(db_session, username: str, password: str) -> float:
+    """Пользователь с дорогим хешем, возвращает время одной проверки"""
+    hashed = PasswordUtils.hash_password(password, rounds=10)[0]
+    db_session.add(User(username=username, hashed_password=hashed,
+                        role=UserRoleEnum.USER))
+    await db_session.commit()
+    started = time.perf_counter()
+    PasswordUtils.verify_password(password, hashed)
+    return time.perf_counter() - started
+
+
+@pytest.mark.asyncio
+async def test_health_check_responds_during_login_storm(client: AsyncClient,
+                                                        db_session,
+                                                        monkeypatch):
+    db_session.add(User(
+        username="testuser",
+        hashed_password=PasswordUtils.hash_password("password")[0],
+        role=UserRoleEnum.USER,
+    ))
+    await db_session.commit()
+
+    # проверки пароля стоят, пока их не отпустят: если bcrypt занял бы
+    # event loop, health check не смог бы ответить
+    gate = threading.Event()
+    threads = []
+    verify_password = PasswordUtils.verify_password
+
+    def gated_verify(password, stored_hash):
+        threads.append(threading.current_thread())
+        gate.wait(timeout=2)
+        return verify_password(password, stored_hash)
+
+    monkeypatch.setattr(PasswordUtils, "verify_password",
+                        staticmethod(gated_verify))
+
+    storm = asyncio.ensure_future(asyncio.gather(*[
+        client.post("/auth/login",
+                    data={"username": "testuser", "password": "password"})
+        for _ in range(16)
+    ]))
+    try:
+        for _ in range(500):
+            if threads:
+                break
+            await asyncio.sleep(0.01)
+        assert threads, "password verification never started"
+
+        response = await client.get("/health/check")
+        assert response.status_code == 200
+        assert not storm.done()
+    finally:
+        gate.set()
+    responses = await storm
+
+    assert all(response.status_code == 200 for response in responses)
+    assert len(threads) == 16
+    assert threading.main_thread() not in threads
+    assert all(thread.name.startswith("bcrypt") for thread in threads)
+
+
+@pytest.mark.asyncio
+async def test_login_rejected_when_hash_queue_full(client: AsyncClient,
+                                                   db_session, monkeypatch):
+    await add_slow_user(db_session, "testuser", "password")
+    hasher = PasswordHasher(concurrency=1, queue_limit=1)
+    monkeypatch.setattr(auth_service_module, "password_hasher", hasher)
+
+    responses = await asyncio.gather(*[
+        client.post("/auth/login",
+                    data={"username": "testuser", "password": "password"})
+        for _ in range(6)
+    ])
+    statuses = sorted(response.status_code for response in responses)
+    assert statuses == [200, 200, 503, 503, 503, 503]
+    rejected = next(r for r in responses if r.status_code == 503)
+    assert rejected.headers["Retry-After"] == "1"
+    assert hasher.stats()["rejected"] == 4
+
+
+async def login_tokens(client: AsyncClient, db_session) -> dict:
+    db_session.add(User(
+        username="testuser",
+        hashed_password=PasswordUtils.hash_password("password")[0],
+        role=UserRoleEnum.USER,
+    ))
+    await db_session.commit()
+    response = await client.post(
+        "/auth/login", data={"username": "testuser", "password": "password"},
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_refresh_rotates_tokens(client: AsyncClient, db_session,
+                                      monkeypatch):
+    tokens = await login_tokens(client, db_session)
+
+    class NoBcrypt:
+        async def verify(self, *args, **kwargs):
+            raise AssertionError("refresh must not check the password")
+
+    monkeypatch.setattr(auth_service_module, "password_hasher", NoBcrypt())
+    response = await client.post(
+        "/auth/refresh", json={"refresh_token": tokens["refresh_token"]},
+    )
+    assert response.status_code == 200
+    refreshed = response.json()
+    assert refreshed["refresh_token"] != tokens["refresh_token"]
+
+    response = await client.get(
+        "/users/getReview",
+        headers={"Authorization": f"Bearer {refreshed['access_token']}"},
+    )
+    assert response.status_code == 200
+    assert response.json()["user_id"] == tokens["user_id"]
+
+    # второй refresh тем же токеном - 401
+    response = await client.post(
+        "/auth/refresh", json={"refresh_token": tokens["refresh_token"]},
+    )
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Refresh token is no longer valid"
+
+
+@pytest.mark.asyncio
+async def test_refresh_reuse_revokes_family(client: AsyncClient, db_session):
+    tokens = await login_tokens(client, db_session)
+    response = await client.post(
+        "/auth/refresh", json={"refresh_token": tokens["refresh_token"]},
+    )
+    stolen_chain_token = response.json()["refresh_token"]
+
+    # старый токен предъявлен повторно - цепочка отозвана целиком
+    response = await client.post(
+        "/auth/refresh", json={"refresh_token": tokens["refresh_token"]},
+    )
+    assert response.status_code == 401
+    response = await client.post(
+        "/auth/refresh", json={"refresh_token": stolen_chain_token},
+    )
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_token_types_are_not_interchangeable(client: AsyncClient,
+                                                   db_session):
+    tokens = await login_tokens(client, db_session)
+
+    response = await client.post(
+        "/auth/refresh", json={"refresh_token": tokens["access_token"]},
+    )
+    assert response.status_code == 401
+    response = await client.get(
+        "/users/getReview",
+        headers={"Authorization": f"Bearer {tokens['refresh_token']}"},
+    )
+    assert response.status_code == 401
@@ -1,5 +1,21 @@
+import asyncio
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config.config import TEST_ASYNC_DATABASE_URL
+from app.core.security import PasswordUtils
+from app.database import User
+from app.database.database import create_pooled_engine
+from app.database.pool import (
+    InstrumentedAsyncQueuePool, PoolMetrics, get_pool_status, instrument_engine,
+    pool_metrics, replica_pool_metrics,
+)
+from app.enums import UserRoleEnum
+from app.routers import health
 
 
 @pytest.mark.asyncio
@@ -10,3 +26,106 @@ async def test_health_check(client: AsyncClient):
         "status": True,
         "message": "Service is healthy and running"
     }
+
+
+async def get_headers(client: AsyncClient, db_session, role: UserRoleEnum) -> dict:
+    db_session.add(User(
+        username=role.value,
+        hashed_password=PasswordUtils.hash_password("pass")[0],
+        role=role,
+    ))
+    await db_session.commit()
+    response = await client.post(
+        "/auth/login", data={"username": role.value, "password": "pass"},
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.mark.asyncio
+async def test_pool_status(client: AsyncClient, db_session):
+    headers = await get_headers(client, db_session, UserRoleEnum.ADMIN)
+    response = await client.get("/health/pool", headers=headers)
+    assert response.status_code == 200
+    pool = response.json()["pool"]
+    assert {"size", "checked_out", "overflow", "checkouts", "timeouts",
+            "wait_avg_ms", "wait_max_ms"} <= set(pool)
+
+
+@pytest.mark.asyncio
+async def test_replica_pool_status(client: AsyncClient, db_session, monkeypatch):
+    headers = await get_headers(client, db_session, UserRoleEnum.ADMIN)
+    response = await client.get("/health/pool", headers=headers)
+    assert response.json()["replica_pool"] is None
+
+    read_engine = create_pooled_engine(TEST_ASYNC_DATABASE_URL,
+                                       replica_pool_metrics)
+    monkeypatch.setattr(health, "read_engine", read_engine)
+    try:
+        primary = pool_metrics.snapshot()["checkouts"]
+        replica = replica_pool_metrics.snapshot()["checkouts"]
+        async with read_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        # выдача соединения реплики считается только в её счётчиках
+        assert pool_metrics.snapshot()["checkouts"] == primary
+        assert replica_pool_metrics.snapshot()["checkouts"] == replica + 1
+
+        response = await client.get("/health/pool", headers=headers)
+        replica_pool = response.json()["replica_pool"]
+        assert replica_pool["checkouts"] == replica + 1
+        assert replica_pool["checked_out"] == 0
+    finally:
+        await read_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_pool_status_not_admin(client: AsyncClient, db_session):
+    headers = await get_headers(client, db_session, UserRoleEnum.USER)
+    response = await client.get("/health/pool", headers=headers)
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics_count_waits_and_timeouts():
+    metrics = PoolMetrics()
+
+    class Pool(InstrumentedAsyncQueuePool):
+        pass
+
+    Pool.metrics = metrics
+    engine = create_async_engine(TEST_ASYNC_DATABASE_URL, poolclass=Pool,
+                                 pool_size=1, max_overflow=0, pool_timeout=0.2)
+    instrument_engine(engine, metrics)
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            assert get_pool_status(engine, metrics)["checked_out"] == 1
+            with pytest.raises(PoolTimeoutError):
+                async with engine.connect():
+                    pass
+
+            async def release_later():
+                await asyncio.sleep(0.05)
+                await conn.close()
+
+            waiter = asyncio.create_task(release_later())
+            async with engine.connect() as second:
+                await second.execute(text("SELECT 1"))
+            await waiter
+
+        status = get_pool_status(engine, metrics)
+        assert status["timeouts"] == 1
+        assert status["checkouts"] == 2
+        assert status["connects"] == 1
+        assert status["checked_out"] == 0
+        assert status["wait_max_ms"] >= 150
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_logging_status(client: AsyncClient, db_session):
+    headers = await get_headers(client, db_session, UserRoleEnum.ADMIN)
+    response = await client.get("/health/logging", headers=headers)
+    assert response.status_code == 200
+    assert {"enabled", "policy", "queue_size", "dropped",
+            "handlers"} <= set(response.json()["log_queue"])
@@ -0,0 +1,801 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+
+from app.core.security import PasswordUtils
+from app.database import User, Team
+from app.enums import UserRoleEnum
+from app.repositories import pull_request_repository
+from app.repositories.pull_request_batcher import PullRequestCreateBatcher
+from app.services import PullRequestService
+from app.services.reviewer_load_tracker import reviewer_load_tracker
+from app.services.reviewer_strategies import (
+    LeastOpenReviewsStrategy, RandomReviewerStrategy, RoundRobinReviewerStrategy,
+)
+
+
+async def add_team(db_session, name: str) -> Team:
+    team = Team(name=name)
+    db_session.add(team)
+    await db_session.commit()
+    return team
+
+
+async def add_user(db_session, username: str, password: str,
+                   team: Team | None = None, is_active: bool = True,
+                   role: UserRoleEnum = UserRoleEnum.USER) -> User:
+    user = User(
+        username=username,
+        hashed_password=PasswordUtils.hash_password(password)[0],
+        role=role,
+        is_active=is_active,
+        team_id=team.id if team else None,
+    )
+    db_session.add(user)
+    await db_session.commit()
+    return user
+
+
+async def get_headers(client: AsyncClient, username: str, password: str) -> dict:
+    response = await client.post(
+        "/auth/login",
+        data={"username": username, "password": password},
+    )
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.mark.asyncio
+async def test_create_pr_assigns_active_teammates(client: AsyncClient, db_session):
+    team = await add_team(db_session, "backend")
+    author = await add_user(db_session, "author", "pass", team)
+    reviewer1 = await add_user(db_session, "reviewer1", "pass", team)
+    reviewer2 = await add_user(db_session, "reviewer2", "pass", team)
+    await add_user(db_session, "inactive", "pass", team, is_active=False)
+    other_team = await add_team(db_session, "frontend")
+    await add_user(db_session, "stranger", "pass", other_team)
+
+    headers = await get_headers(client, "author", "pass")
+    response = await client.post("/pullRequest/create",
+                                 json={"name": "feature"}, headers=headers)
+    assert response.status_code == 201
+    pr = response.json()["pull_request"]
+    assert pr["author_id"] == str(author.id)
+    assert pr["status"] == "OPEN"
+    assert {reviewer["id"] for reviewer in pr["reviewers"]} == {
+        str(reviewer1.id), str(reviewer2.id)
+    }
+
+
+@pytest.mark.asyncio
+async def test_create_pr_small_team(client: AsyncClient, db_session):
+    team = await add_team(db_session, "backend")
+    await add_user(db_session, "author", "pass", team)
+
+    headers = await get_headers(client, "author", "pass")
+    response = await client.post("/pullRequest/create",
+                                 json={"name": "feature"}, headers=headers)
+    assert response.status_code == 201
+    assert response.json()["pull_request"]["reviewers"] == []
+
+
+@pytest.mark.asyncio
+async def test_create_pr_without_team(client: AsyncClient, db_session):
+    await add_user(db_session, "author", "pass")
+
+    headers = await get_headers(client, "author", "pass")
+    response = await client.post("/pullRequest/create",
+                                 json={"name": "feature"}, headers=headers)
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Team not found"
+
+
+@pytest.mark.asyncio
+async def test_create_pr_duplicate_name(client: AsyncClient, db_session):
+    team = await add_team(db_session, "backend")
+    await add_user(db_session, "author", "pass", team)
+
+    headers = await get_headers(client, "author", "pass")
+    response = await client.post("/pullRequest/create",
+                                 json={"name": "feature"}, headers=headers)
+    assert response.status_code == 201
+    response = await client.post("/pullRequest/create",
+                                 json={"name": "feature"}, headers=headers)
+    assert response.status_code == 409
+    assert response.json()["detail"] == (
+        "Pull Request with the same name already exists for this author"
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_pr_concurrent_duplicates(client: AsyncClient, db_session):
+    team = await add_team(db_session, "backend")
+    await add_user(db_session, "author", "pass", team)
+    await add_user(db_session, "reviewer", "pass", team)
+
+    headers = await get_headers(client, "author", "pass")
+    responses = await asyncio.gather(*[
+        client.post("/pullRequest/create", json={"name": "feature"},
+                    headers=headers)
+        for _ in range(5)
+    ])
+    assert sorted(r.status_code for r in responses) == [201, 409, 409, 409, 409]
+
+
+@pytest.mark.asyncio
+async def test_reassign_pr(client: AsyncClient, db_session):
+    team = await add_team(db_session, "backend")
+    await add_user(db_session, "author", "pass", team)
+    teammates = [
+        await add_user(db_session, f"reviewer{i}", "pass", team)
+        for i in range(3)
+    ]
+
+    author_headers = await get_headers(client, "author", "pass")
+    response = await client.post("/pullRequest/create",
+                                 json={"name": "feature"}, headers=author_headers)
+    pr = response.json()["pull_request"]
+    leaving = pr["reviewers"][0]
+
+    headers = await get_headers(client, leaving["username"], "pass")
+    response = await client.post("/pullRequest/reassign",
+                                 json={"id": pr["id"]}, headers=headers)
+    assert response.status_code == 200
+    new_ids = {r["id"] for r in response.json()["pull_request"]["reviewers"]}
+    assert leaving["id"] not in new_ids
+    assert new_ids == {str(user.id) for user in teammates} - {leaving["id"]}
+
+    response = await client.post("/pullRequest/reassign",
+                                 json={"id": pr["id"]}, headers=headers)
+    assert response.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_reassign_advances_round_robin_by_one(client: AsyncClient,
+                                                    db_session, monkeypatch):
+    monkeypatch.setattr(PullRequestService, "reviewer_strategy",
+                        RoundRobinReviewerStrategy())
+    team = await add_team(db_session, "backend")
+    author = await add_user(db_session, "author", "pass", team)
+    for i in range(6):
+        await add_user(db_session, f"reviewer{i}", "pass", team)
+    order = sorted(str(user_id) for user_id in (await db_session.execute(
+        text("SELECT id FROM \"user\"")
+    )).scalars())
+
+    def next_after(user_id: str, count: int) -> set[str]:
+        """Следующие по кругу после user_id, кроме автора"""
+        start = order.index(user_id)
+        following = order[start + 1:] + order[:start + 1]
+        return set([member for member in following
+                    if member != str(author.id)][:count])
+
+    author_headers = await get_headers(client, "author", "pass")
+    response = await client.post("/pullRequest/create",
+                                 json={"name": "feature-1"},
+                                 headers=author_headers)
+    pr = response.json()["pull_request"]
+    before = {reviewer["id"] for reviewer in pr["reviewers"]}
+    leaving = pr["reviewers"][0]
+
+    headers = await get_headers(client, leaving["username"], "pass")
+    response = await client.post("/pullRequest/reassign",
+                                 json={"id": pr["id"]}, headers=headers)
+    assert response.status_code == 200
+    after = {r["id"] for r in response.json()["pull_request"]["reviewers"]}
+    (new_reviewer,) = after - before
+
+    # очередь сдвинута только за назначенного, а не за всех кандидатов
+    response = await client.post("/pullRequest/create",
+                                 json={"name": "feature-2"},
+                                 headers=author_headers)
+    reviewers = {r["id"] for r in response.json()["pull_request"]["reviewers"]}
+    assert reviewers == next_after(new_reviewer, 2)
+
+
+@pytest.mark.asyncio
+async def test_merge_pr(client: AsyncClient, db_session):
+    team = await add_team(db_session, "backend")
+    await add_user(db_session, "author", "pass", team)
+    await add_user(db_session, "reviewer", "pass", team)
+
+    author_headers = await get_headers(client, "author", "pass")
+    response = await client.post("/pullRequest/create",
+                                 json={"name": "feature"}, headers=author_headers)
+    pr = response.json()["pull_request"]
+
+    response = await client.post("/pullRequest/merge",
+                                 json={"id": pr["id"]}, headers=author_headers)
+    assert response.status_code == 403
+
+    headers = await get_headers(client, "reviewer", "pass")
+    response = await client.post("/pullRequest/merge",
+                                 json={"id": pr["id"]}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["pull_request"]["status"] == "MERGED"
+
+    response = await client.post("/pullRequest/reassign",
+                                 json={"id": pr["id"]}, headers=headers)
+    assert response.status_code == 409
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strategy", [
+    LeastOpenReviewsStrategy, RoundRobinReviewerStrategy,
+])
+async def test_create_pr_balances_reviewers(client: AsyncClient, db_session,
+                                            monkeypatch, strategy):
+    monkeypatch.setattr(PullRequestService, "reviewer_strategy", strategy())
+    team = await add_team(db_session, "backend")
+    await add_user(db_session, "author", "pass", team)
+    teammates = [
+        await add_user(db_session, f"reviewer{i}", "pass", team)
+        for i in range(4)
+    ]
+
+    headers = await get_headers(client, "author", "pass")
+    load = {str(user.id): 0 for user in teammates}
+    for i in range(6):
+        response = await client.post("/pullRequest/create",
+                                     json={"name": f"feature-{i}"},
+                                     headers=headers)
+        assert response.status_code == 201
+        for reviewer in response.json()["pull_request"]["reviewers"]:
+            load[reviewer["id"]] += 1
+    assert sorted(load.values()) == [3, 3, 3, 3]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strategy", [
+    RandomReviewerStrategy, LeastOpenReviewsStrategy, RoundRobinReviewerStrategy,
+])
+async def test_create_pr_respects_capacity(client: AsyncClient, db_session,
+                                           monkeypatch, strategy):
+    monkeypatch.setattr(PullRequestService, "reviewer_strategy",
+                        strategy(max_open_reviews=1))
+    team = await add_team(db_session, "backend")
+    await add_user(db_session, "author", "pass", team)
+    for i in range(3):
+        await add_user(db_session, f"reviewer{i}", "pass", team)
+
+    headers = await get_headers(client, "author", "pass")
+    counts = []
+    for i in range(3):
+        response = await client.post("/pullRequest/create",
+                                     json={"name": f"feature-{i}"},
+                                     headers=headers)
+        assert response.status_code == 201
+        counts.append(len(response.json()["pull_request"]["reviewers"]))
+    assert counts == [2, 1, 0]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strategy", [
+    LeastOpenReviewsStrategy, RoundRobinReviewerStrategy,
+])
+async def test_concurrent_creates_respect_capacity(client: AsyncClient,
+                                                   db_session, monkeypatch,
+                                                   strategy):
+    monkeypatch.setattr(PullRequestService, "reviewer_strategy",
+                        strategy(max_open_reviews=1))
+    team = await add_team(db_session, "backend")
+    await add_user(db_session, "author", "pass", team)
+    for i in range(4):
+        await add_user(db_session, f"reviewer{i}", "pass", team)
+
+    headers = await get_headers(client, "author", "pass")
+    response = await client.post("/pullRequest/create",
+                                 json={"name": "feature-0"}, headers=headers)
+    assert len(response.json()["pull_request"]["reviewers"]) == 2
+
+    responses = await asyncio.gather(*[
+        client.post("/pullRequest/create", json={"name": f"feature-{i}"},
+                    headers=headers)
+        for i in range(1, 4)
+    ])
+    assert all(response.status_code == 201 for response in responses)
+    loads = (await db_session.execute(text(
+        "SELECT count(*) FROM reviewer_pull_request_assignment "
+        "GROUP BY user_id"
+    ))).scalars().all()
+    assert sorted(loads) == [1, 1, 1, 1]
+
+
+@pytest.mark.asyncio
+async def test_round_robin_survives_tracker_reload(client: AsyncClient,
+                                                   db_session, monkeypatch):
+    monkeypatch.setattr(PullRequestService, "reviewer_strategy",
+                        RoundRobinReviewerStrategy())
+    # нагрузка команды перечитывается из БД перед каждым выбором
+    monkeypatch.setattr(reviewer_load_tracker, "ttl_seconds", -1)
+    team = await add_team(db_session, "backend")
+    await add_user(db_session, "author", "pass", team)
+    for i in range(4):
+        await add_user(db_session, f"reviewer{i}", "pass", team)
+
+    headers = await get_headers(client, "author", "pass")
+    picked = []
+    for i in range(2):
+        response = await client.post("/pullRequest/create",
+                                     json={"name": f"feature-{i}"},
+                                     headers=headers)
+        picked.extend(r["id"] for r in response.json()["pull_request"]["reviewers"])
+    assert len(set(picked)) == 4
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strategy", [
+    RandomReviewerStrategy, LeastOpenReviewsStrategy, RoundRobinReviewerStrategy,
+])
+async def test_merge_frees_capacity(client: AsyncClient, db_session,
+                                    monkeypatch, strategy):
+    monkeypatch.setattr(PullRequestService, "reviewer_strategy",
+                        strategy(max_open_reviews=1))
+    team = await add_team(db_session, "backend")
+    await add_user(db_session, "author", "pass", team)
+    for i in range(2):
+        await add_user(db_session, f"reviewer{i}", "pass", team)
+
+    headers = await get_headers(client, "author", "pass")
+    response = await client.post("/pullRequest/create",
+                                 json={"name": "feature-1"}, headers=headers)
+    pr = response.json()["pull_request"]
+    assert len(pr["reviewers"]) == 2
+    response = await client.post("/pullRequest/create",
+                                 json={"name": "feature-2"}, headers=headers)
+    assert response.json()["pull_request"]["reviewers"] == []
+
+    reviewer_headers = await get_headers(client, "reviewer0", "pass")
+    response = await client.post("/pullRequest/merge", json={"id": pr["id"]},
+                                 headers=reviewer_headers)
+    assert response.status_code == 200
+
+    response = await client.post("/pullRequest/create",
+                                 json={"name": "feature-3"}, headers=headers)
+    assert len(response.json()["pull_request"]["reviewers"]) == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strategy", [
+    LeastOpenReviewsStrategy, RoundRobinReviewerStrategy,
+])
+async def test_create_pr_after_merge_picks_distinct_reviewers(
+        client: AsyncClient, db_session, monkeypatch, strategy):
+    monkeypatch.setattr(PullRequestService, "reviewer_strategy", strategy())
+    team = await add_team(db_session, "backend")
+    await add_user(db_session, "author", "pass", team)
+    for i in range(3):
+        await add_user(db_session, f"reviewer{i}", "pass", team)
+
+    headers = await get_headers(client, "author", "pass")
+    for i in range(3):
+        response = await client.post("/pullRequest/create",
+                                     json={"name": f"feature-{i}"},
+                                     headers=headers)
+        pr = response.json()["pull_request"]
+        reviewer = pr["reviewers"][0]["username"]
+        response = await client.post(
+            "/pullRequest/merge", json={"id": pr["id"]},
+            headers=await get_headers(client, reviewer, "pass"),
+        )
+        assert response.status_code == 200
+
+    for i in range(3, 6):
+        response = await client.post("/pullRequest/create",
+                                     json={"name": f"feature-{i}"},
+                                     headers=headers)
+        assert response.status_code == 201
+        reviewer_ids = [reviewer["id"] for reviewer
+                        in response.json()["pull_request"]["reviewers"]]
+        assert len(reviewer_ids) == 2
+        assert len(set(reviewer_ids)) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_merge_and_reassign(client: AsyncClient, db_session):
+    team = await add_team(db_session, "backend")
+    await add_user(db_session, "author", "pass", team)
+    members = [
+        await add_user(db_session, f"reviewer{i}", "pass", team)
+        for i in range(6)
+    ]
+    headers = {
+        str(member.id): await get_headers(client, member.username, "pass")
+        for member in members
+    }
+
+    author_headers = await get_headers(client, "author", "pass")
+    for round_number in range(5):
+        response = await client.post("/pullRequest/create",
+                                     json={"name": f"feature-{round_number}"},
+                                     headers=author_headers)
+        pr_id = response.json()["pull_request"]["id"]
+
+        requests = []
+        for member_headers in headers.values():
+            for _ in range(3):
+                requests.append(client.post("/pullRequest/reassign",
+                                            json={"id": pr_id},
+                                            headers=member_headers))
+            requests.append(client.post("/pullRequest/merge",
+                                        json={"id": pr_id},
+                                        headers=member_headers))
+        responses = await asyncio.gather(*requests)
+
+        merges = [r for r in responses if r.url.path.endswith("/merge")]
+        reassigns = [r for r in responses if r.url.path.endswith("/reassign")]
+        assert {r.status_code for r in merges} <= {200, 403}
+        assert {r.status_code for r in reassigns} <= {200, 409}
+
+        response = await client.post("/pullRequest/merge", json={"id": pr_id},
+                                     headers=author_headers)
+        assert response.status_code == 403
+        # итоговое состояние: ровно два разных ревьюера, автор не среди них
+        state = await db_session.execute(
+            text("SELECT user_id FROM reviewer_pull_request_assignment "
+                 "WHERE pr_id = :pr_id"),
+            {"pr_id": pr_id},
+        )
+        reviewer_ids = {str(row.user_id) for row in state}
+        assert len(reviewer_ids) == 2
+        assert reviewer_ids <= set(headers)
+        # после успешного merge PR больше нельзя переназначить
+        if any(r.status_code == 200 for r in merges):
+            response = await client.post("/pullRequest/reassign",
+                                         json={"id": pr_id},
+                                         headers=next(iter(headers.values())))
+            assert response.status_code == 409
+            assert all(r.json()["pull_request"]["status"] == "MERGED"
+                       for r in merges if r.status_code == 200)
+
+
+@pytest.mark.asyncio
+async def test_create_pr_after_deactivation(client: AsyncClient, db_session):
+    team = await add_team(db_session, "backend")
+    await add_user(db_session, "author", "pass", team)
+    leaving = await add_user(db_session, "leaving", "pass", team)
+    staying = await add_user(db_session, "staying", "pass", team)
+    await add_user(db_session, "admin", "pass", role=UserRoleEnum.ADMIN)
+
+    headers = await get_headers(client, "author", "pass")
+    response = await client.post("/pullRequest/create",
+                                 json={"name": "feature-1"}, headers=headers)
+    assert len(response.json()["pull_request"]["reviewers"]) == 2
+
+    admin_headers = await get_headers(client, "admin", "pass")
+    response = await client.post("/users/setIsActive", headers=admin_headers,
+                                 json={"user_id": str(leaving.id),
+                                       "is_active": False})
+    assert response.status_code == 200
+
+    response = await client.post("/pullRequest/create",
+                                 json={"name": "feature-2"}, headers=headers)
+    reviewers = response.json()["pull_request"]["reviewers"]
+    assert [reviewer["id"] for reviewer in reviewers] == [str(staying.id)]
+
+
+@pytest.mark.asyncio
+async def test_create_pr_batch(client: AsyncClient, db_session):
+    team = await add_team(db_session, "backend")
+    await add_user(db_session, "author", "pass", team)
+    teammates = [
+        await add_user(db_session, f"reviewer{i}", "pass", team)
+        for i in range(3)
+    ]
+
+    headers = await get_headers(client, "author", "pass")
+    response = await client.post("/pullRequest/create",
+                                 json={"name": "feature"}, headers=headers)
+    assert response.status_code == 201
+
+    names = ["feature-1", "feature-2", "feature-1", "x", "feature"]
+    response = await client.post("/pullRequest/createBatch",
+                                 json={"names": names}, headers=headers)
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["item"] for r in results] == names
+    assert [r["status"] for r in results] == [
+        "CREATED", "CREATED", "DUPLICATE", "ERROR", "DUPLICATE",
+    ]
+    team_ids = {str(user.id) for user in teammates}
+    for result in results[:2]:
+        reviewers = {r["id"] for r in result["pull_request"]["reviewers"]}
+        assert len(reviewers) == 2 and reviewers <= team_ids
+    assert all(r["pull_request"] is None for r in results[2:])
+
+    # PR из пачки - обычные PR: их видно в ревью и их можно смержить
+    reviewer_id = results[0]["pull_request"]["reviewers"][0]["id"]
+    reviewer = next(user for user in teammates if str(user.id) == reviewer_id)
+    reviewer_headers = await get_headers(client, reviewer.username, "pass")
+    response = await client.get("/users/getReview", headers=reviewer_headers)
+    assert results[0]["pull_request"]["id"] in {
+        pr["id"] for pr in response.json()["reviews_in"]
+    }
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strategy", [
+    LeastOpenReviewsStrategy, RoundRobinReviewerStrategy,
+])
+async def test_consecutive_pr_batches_pick_distinct_reviewers(
+        client: AsyncClient, db_session, monkeypatch, strategy):
+    monkeypatch.setattr(PullRequestService, "reviewer_strategy", strategy())
+    team = await add_team(db_session, "backend")
+    await add_user(db_session, "author", "pass", team)
+    for i in range(3):
+        await add_user(db_session, f"reviewer{i}", "pass", team)
+
+    headers = await get_headers(client, "author", "pass")
+    for batch in range(3):
+        response = await client.post(
+            "/pullRequest/createBatch", headers=headers,
+            json={"names": [f"feature-{batch}-{i}" for i in range(2)]},
+        )
+        assert response.status_code == 200
+        for result in response.json()["results"]:
+            assert result["status"] == "CREATED"
+            reviewer_ids = [reviewer["id"] for reviewer
+                            in result["pull_request"]["reviewers"]]
+            assert len(reviewer_ids) == 2
+            assert len(set(reviewer_ids)) == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strategy", [
+    LeastOpenReviewsStrategy, RoundRobinReviewerStrategy,
+])
+async def test_create_pr_batch_balances_reviewers(client: AsyncClient,
+                                                  db_session, monkeypatch,
+                                                  strategy):
+    monkeypatch.setattr(PullRequestService, "reviewer_strategy", strategy())
+    team = await add_team(db_session, "backend")
+    await add_user(db_session, "author", "pass", team)
+    teammates = [
+        await add_user(db_session, f"reviewer{i}", "pass", team)
+        for i in range(4)
+    ]
+
+    headers = await get_headers(client, "author", "pass")
+    response = await client.post(
+        "/pullRequest/createBatch", headers=headers,
+        json={"names": [f"feature-{i}" for i in range(6)]},
+    )
+    assert response.status_code == 200
+    load = {str(user.id): 0 for user in teammates}
+    for result in response.json()["results"]:
+        for reviewer in result["pull_request"]["reviewers"]:
+            load[reviewer["id"]] += 1
+    assert sorted(load.values()) == [3, 3, 3, 3]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strategy", [
+    RandomReviewerStrategy, LeastOpenReviewsStrategy, RoundRobinReviewerStrategy,
+])
+async def test_create_pr_batch_respects_capacity(client: AsyncClient,
+                                                 db_session, monkeypatch,
+                                                 strategy):
+    monkeypatch.setattr(PullRequestService, "reviewer_strategy",
+                        strategy(max_open_reviews=1))
+    team = await add_team(db_session, "backend")
+    await add_user(db_session, "author", "pass", team)
+    for i in range(3):
+        await add_user(db_session, f"reviewer{i}", "pass", team)
+
+    headers = await get_headers(client, "author", "pass")
+    response = await client.post(
+        "/pullRequest/createBatch", headers=headers,
+        json={"names": [f"feature-{i}" for i in range(3)]},
+    )
+    counts = [len(result["pull_request"]["reviewers"])
+              for result in response.json()["results"]]
+    assert counts == [2, 1, 0]
+
+
+@pytest.mark.asyncio
+async def test_create_pr_batch_limits(client: AsyncClient, db_session):
+    await add_user(db_session, "author", "pass")
+
+    headers = await get_headers(client, "author", "pass")
+    response = await client.post("/pullRequest/createBatch",
+                                 json={"names": []}, headers=headers)
+    assert response.status_code == 422
+    response = await client.post("/pullRequest/createBatch",
+                                 json={"names": ["feature"]}, headers=headers)
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Team not found"
+
+
+@pytest.mark.asyncio
+async def test_merge_pr_batch(client: AsyncClient, db_session):
+    team = await add_team(db_session, "backend")
+    await add_user(db_session, "author", "pass", team)
+    await add_user(db_session, "reviewer", "pass", team)
+    other_team = await add_team(db_session, "frontend")
+    await add_user(db_session, "stranger", "pass", other_team)
+    await add_user(db_session, "stranger-reviewer", "pass", other_team)
+
+    headers = await get_headers(client, "author", "pass")
+    response = await client.post(
+        "/pullRequest/createBatch", headers=headers,
+        json={"names": [f"feature-{i}" for i in range(3)]},
+    )
+    pr_ids = [r["pull_request"]["id"] for r in response.json()["results"]]
+    stranger_headers = await get_headers(client, "stranger", "pass")
+    response = await client.post("/pullRequest/create", json={"name": "other"},
+                                 headers=stranger_headers)
+    foreign_id = response.json()["pull_request"]["id"]
+
+    reviewer_headers = await get_headers(client, "reviewer", "pass")
+    response = await client.post("/pullRequest/merge", json={"id": pr_ids[0]},
+                                 headers=reviewer_headers)
+    assert response.status_code == 200
+
+    missing_id = "00000000-0000-0000-0000-000000000000"
+    items = pr_ids + [foreign_id, missing_id, "not-an-id"]
+    response = await client.post("/pullRequest/mergeBatch",
+                                 json={"ids": items}, headers=reviewer_headers)
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["item"] for r in results] == items
+    assert [r["status"] for r in results] == [
+        "MERGED", "MERGED", "MERGED", "ERROR", "ERROR", "ERROR",
+    ]
+    assert all(r["pull_request"]["status"] == "MERGED" for r in results[:3])
+    assert [r["detail"] for r in results[3:]] == [
+        "User is not a reviewer of this Pull Request",
+        "Pull Request not found",
+        "Invalid Pull Request id",
+    ]
+
+    # смерженные пачкой PR видны в ревью с фильтром по статусу
+    response = await client.get("/users/getReview", headers=reviewer_headers,
+                                params={"status": "OPEN"})
+    assert response.json()["reviews_in"] == []
+
+
+@pytest.fixture
+def group_commit(monkeypatch):
+    batcher = PullRequestCreateBatcher(enabled=True, max_wait_ms=50,
+                                       max_items=8)
+    monkeypatch.setattr(pull_request_repository, "pr_create_batcher", batcher)
+    return batcher
+
+
+@pytest.mark.asyncio
+async def test_create_pr_group_commit(client: AsyncClient, db_session,
+                                      group_commit):
+    team = await add_team(db_session, "backend")
+    await add_user(db_session, "author", "pass", team)
+    await add_user(db_session, "reviewer", "pass", team)
+
+    headers = await get_headers(client, "author", "pass")
+    responses = await asyncio.gather(*[
+        client.post("/pullRequest/create", json={"name": f"feature-{i}"},
+                    headers=headers)
+        for i in range(20)
+    ])
+    assert [r.status_code for r in responses] == [201] * 20
+    prs = [r.json()["pull_request"] for r in responses]
+    assert [pr["name"] for pr in prs] == [f"feature-{i}" for i in range(20)]
+    assert all(len(pr["reviewers"]) == 1 for pr in prs)
+
+    stats = group_commit.stats()
+    assert stats["items"] == 20
+    assert stats["failed_batches"] == 0
+    assert stats["batch_max_size"] <= 8
+    assert stats["batches"] < 20
+
+
+@pytest.mark.asyncio
+async def test_create_pr_group_commit_duplicates(client: AsyncClient,
+                                                 db_session, group_commit):
+    team = await add_team(db_session, "backend")
+    await add_user(db_session, "author", "pass", team)
+    await add_user(db_session, "reviewer", "pass", team)
+
+    headers = await get_headers(client, "author", "pass")
+    response = await client.post("/pullRequest/create",
+                                 json={"name": "existing"}, headers=headers)
+    assert response.status_code == 201
+    # одинаковые имена в одной пачке и имя, занятое прошлой пачкой
+    responses = await asyncio.gather(*[
+        client.post("/pullRequest/create", json={"name": name},
+                    headers=headers)
+        for name in ["feature", "feature", "feature", "existing", "other"]
+    ])
+    codes = [r.status_code for r in responses]
+    assert sorted(codes[:3]) == [201, 409, 409]
+    assert codes[3:] == [409, 201]
+    assert responses[3].json()["detail"] == (
+        "Pull Request with the same name already exists for this author"
+    )
+
+
+@pytest.mark.asyncio
+async def test_group_commit_failure_reaches_every_caller():
+    batcher = PullRequestCreateBatcher(enabled=True, max_wait_ms=50,
+                                       max_items=3)
+
+    class FailingRepo:
+        class session:
+            @staticmethod
+            async def rollback():
+                pass
+
+        async def insert_pull_requests(self, items):
+            raise RuntimeError("database is down")
+
+    author_id = "00000000-0000-0000-0000-000000000001"
+    results = await asyncio.gather(*[
+        batcher.submit(FailingRepo(), author_id=author_id, name=f"pr-{i}",
+                       reviewers=[])
+        for i in range(3)
+    ], return_exceptions=True)
+    assert [str(result) for result in results] == ["database is down"] * 3
+    assert batcher.stats()["failed_batches"] == 1
+
+
+class FakeBatchRepo:
+    """Пишет пачки в список; PR с именем "bad" роняет всю пачку"""
+
+    class session:
+        @staticmethod
+        async def rollback():
+            pass
+
+    def __init__(self):
+        self.written = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def insert_pull_requests(self, items):
+        await self.release.wait()
+        if any(name == "bad" for _, name, _ in items):
+            raise RuntimeError("bad row")
+        self.written.extend(name for _, name, _ in items)
+        return {(author_id, name): name for author_id, name, _ in items}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("during_write", [False, True])
+async def test_group_commit_leader_cancel_spares_followers(during_write):
+    batcher = PullRequestCreateBatcher(enabled=True, max_wait_ms=50,
+                                       max_items=8)
+    repo = FakeBatchRepo()
+    author_id = "00000000-0000-0000-0000-000000000001"
+    tasks = [
+        asyncio.create_task(batcher.submit(repo, author_id=author_id,
+                                           name=f"pr-{i}", reviewers=[]))
+        for i in range(3)
+    ]
+    await asyncio.sleep(0)
+    if during_write:
+        repo.release.clear()
+        await asyncio.sleep(0.1)  # окно закрылось, запись ждёт release
+    tasks[0].cancel()
+    repo.release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert isinstance(results[0], asyncio.CancelledError)
+    assert results[1:] == ["pr-1", "pr-2"]
+    expected = ["pr-0", "pr-1", "pr-2"] if during_write else ["pr-1", "pr-2"]
+    assert repo.written == expected
+
+
+@pytest.mark.asyncio
+async def test_group_commit_bad_row_fails_only_its_caller():
+    batcher = PullRequestCreateBatcher(enabled=True, max_wait_ms=50,
+                                       max_items=3)
+    repo = FakeBatchRepo()
+    author_id = "00000000-0000-0000-0000-000000000001"
+    results = await asyncio.gather(*[
+        batcher.submit(repo, author_id=author_id, name=name, reviewers=[])
+        for name in ["pr-1", "bad", "pr-2"]
+    ], return_exceptions=True)
+    assert results[0] == "pr-1" and results[2] == "pr-2"
+    assert str(results[1]) == "bad row"
+    assert repo.written == ["pr-1", "pr-2"]
+    assert batcher.stats()["failed_batches"] == 1
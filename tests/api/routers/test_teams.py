@@ -0,0 +1,241 @@
+import asyncio
+import uuid
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.security import PasswordUtils
+from app.database import User
+from app.database.database import read_session_router
+from app.enums import UserRoleEnum
+from app.repositories import TeamRepository
+from app.schemas import TeamOut
+from app.services import PullRequestService
+from app.services.reviewer_strategies import RandomReviewerStrategy
+from app.services.team_roster_cache import TeamRosterCache
+
+
+async def add_admin(db_session) -> User:
+    admin = User(
+        username="admin",
+        hashed_password=PasswordUtils.hash_password("admin")[0],
+        role=UserRoleEnum.ADMIN,
+    )
+    db_session.add(admin)
+    await db_session.commit()
+    return admin
+
+
+async def get_admin_headers(client: AsyncClient) -> dict:
+    response = await client.post(
+        "/auth/login",
+        data={"username": "admin", "password": "admin"},
+    )
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.mark.asyncio
+async def test_add_team(client: AsyncClient, db_session):
+    await add_admin(db_session)
+    headers = await get_admin_headers(client)
+
+    response = await client.post("/team/add", json={"name": "backend"},
+                                 headers=headers)
+    assert response.status_code == 201
+    team = response.json()["team"]
+    assert team["name"] == "backend"
+    assert team["members"] == []
+
+    response = await client.get(f"/team/get/{team['id']}", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["team"]["name"] == "backend"
+
+
+@pytest.mark.asyncio
+async def test_add_team_duplicate(client: AsyncClient, db_session):
+    await add_admin(db_session)
+    headers = await get_admin_headers(client)
+
+    response = await client.post("/team/add", json={"name": "backend"},
+                                 headers=headers)
+    assert response.status_code == 201
+    response = await client.post("/team/add", json={"name": "backend"},
+                                 headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Team with this name already exists"
+
+
+@pytest.mark.asyncio
+async def test_add_team_concurrent_duplicates(client: AsyncClient, db_session):
+    await add_admin(db_session)
+    headers = await get_admin_headers(client)
+
+    responses = await asyncio.gather(*[
+        client.post("/team/add", json={"name": "backend"}, headers=headers)
+        for _ in range(5)
+    ])
+    assert sorted(r.status_code for r in responses) == [201, 400, 400, 400, 400]
+
+
+@pytest.mark.asyncio
+async def test_get_team_read_routing(client: AsyncClient, db_session,
+                                     monkeypatch):
+    used = []
+    for name in ("primary", "replica"):
+        session_maker = getattr(read_session_router, name)
+
+        def tracked(session_maker=session_maker, name=name):
+            used.append(name)
+            return session_maker()
+
+        monkeypatch.setattr(read_session_router, name, tracked)
+
+    await add_admin(db_session)
+    headers = await get_admin_headers(client)
+    response = await client.post("/team/add", json={"name": "backend"},
+                                 headers=headers)
+    team_id = response.json()["team"]["id"]
+
+    # сразу после записи читаем из основной БД
+    response = await client.get(f"/team/get/{team_id}", headers=headers)
+    assert response.status_code == 200
+    assert used == ["primary"]
+
+    # окно read-your-writes прошло - чтение уходит в реплику
+    monkeypatch.setattr(read_session_router, "_pinned_until", {})
+    response = await client.get(f"/team/get/{team_id}", headers=headers)
+    assert response.status_code == 200
+    assert used == ["primary", "replica"]
+
+    response = await client.get(f"/team/get/{team_id}",
+                                headers={**headers, "X-Consistency": "strong"})
+    assert response.status_code == 200
+    assert used == ["primary", "replica", "primary"]
+
+
+@pytest.mark.asyncio
+async def test_only_successful_write_pins_reads(client: AsyncClient, db_session):
+    admin = await add_admin(db_session)
+    headers = await get_admin_headers(client)
+    response = await client.post("/team/add", json={"name": "backend"},
+                                 headers=headers)
+    assert response.status_code == 201
+    assert read_session_router.is_pinned(admin.id)
+
+    read_session_router._pinned_until.clear()
+    response = await client.post("/team/add", json={"name": "backend"},
+                                 headers=headers)
+    assert response.status_code == 400
+    # ничего не записано - чтения остаются на реплике
+    assert not read_session_router.is_pinned(admin.id)
+
+
+@pytest.mark.asyncio
+async def test_get_team_roster_cache(client: AsyncClient, db_session):
+    await add_admin(db_session)
+    headers = await get_admin_headers(client)
+    response = await client.post("/team/add", json={"name": "backend"},
+                                 headers=headers)
+    team = response.json()["team"]
+    member = User(
+        username="member",
+        hashed_password=PasswordUtils.hash_password("member")[0],
+        role=UserRoleEnum.USER,
+        team_id=team["id"],
+    )
+    db_session.add(member)
+    await db_session.commit()
+
+    response = await client.get("/health/caches", headers=headers)
+    before = response.json()["team_roster"]
+
+    # первое чтение загружает состав, второе берёт его из кэша
+    for _ in range(2):
+        response = await client.get(f"/team/get/{team['id']}", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["team"]["members"][0]["is_active"] is True
+
+    response = await client.get("/health/caches", headers=headers)
+    after = response.json()["team_roster"]
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 1
+
+    # смена активности сбрасывает закэшированный состав
+    response = await client.post("/users/setIsActive", headers=headers,
+                                 json={"user_id": str(member.id),
+                                       "is_active": False})
+    assert response.status_code == 200
+    response = await client.get(f"/team/get/{team['id']}", headers=headers)
+    assert response.json()["team"]["members"][0]["is_active"] is False
+
+
+@pytest.mark.asyncio
+async def test_stale_replica_read_does_not_refill_roster_cache(
+        client: AsyncClient, db_session, monkeypatch):
+    monkeypatch.setattr(PullRequestService, "reviewer_strategy",
+                        RandomReviewerStrategy(max_open_reviews=0))
+    await add_admin(db_session)
+    headers = await get_admin_headers(client)
+    response = await client.post("/team/add", json={"name": "backend"},
+                                 headers=headers)
+    team_id = response.json()["team"]["id"]
+    members = {}
+    for username in ("author", "reviewer", "leaving"):
+        members[username] = User(
+            username=username,
+            hashed_password=PasswordUtils.hash_password("pass")[0],
+            role=UserRoleEnum.USER,
+            team_id=team_id,
+        )
+        db_session.add(members[username])
+    await db_session.commit()
+    # так команду ещё видит отстающая реплика
+    stale = await TeamRepository(db_session).get_team_by_id(team_id)
+
+    response = await client.post("/users/setIsActive", headers=headers,
+                                 json={"user_id": str(members["leaving"].id),
+                                       "is_active": False})
+    assert response.status_code == 200
+
+    get_team_by_id = TeamRepository.get_team_by_id
+
+    async def lagging_replica(self, team_id):
+        if self.session.info.get("replica"):
+            return stale
+        return await get_team_by_id(self, team_id)
+
+    monkeypatch.setattr(TeamRepository, "get_team_by_id", lagging_replica)
+
+    response = await client.post(
+        "/auth/login", data={"username": "author", "password": "pass"},
+    )
+    author_headers = {
+        "Authorization": f"Bearer {response.json()['access_token']}"
+    }
+    response = await client.get("/team/get", headers=author_headers)
+    assert response.status_code == 200
+    assert all(member["is_active"]
+               for member in response.json()["team"]["members"])
+
+    for i in range(3):
+        response = await client.post("/pullRequest/create",
+                                     json={"name": f"feature-{i}"},
+                                     headers=author_headers)
+        assert response.status_code == 201
+        reviewer_ids = {reviewer["id"] for reviewer
+                        in response.json()["pull_request"]["reviewers"]}
+        assert reviewer_ids == {str(members["reviewer"].id)}
+
+
+def test_team_roster_cache_evicts_least_recently_used():
+    cache = TeamRosterCache(max_size=2, ttl_seconds=60)
+    teams = [TeamOut(id=str(uuid.uuid4()), name=f"team-{i}", members=[])
+             for i in range(3)]
+    versions = [cache.put(team).version for team in teams[:2]]
+    assert versions[0] < versions[1]
+    assert cache.get(teams[0].id) is not None
+    cache.put(teams[2])
+    assert cache.get(teams[1].id) is None
+    assert cache.get(teams[0].id) is not None
+    assert cache.stats()["evictions"] == 1
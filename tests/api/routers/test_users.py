@@ -1,10 +1,16 @@
+import asyncio
 import uuid
 
 import pytest
 from httpx import AsyncClient
 
 from app.core.security import PasswordUtils
-from app.database import User
+from app.core.security.token_cache import VerifiedTokenCache
+from app.core.security.token_revocation import TokenRevocationRegistry
+from app.database import User, Team
+from app.database.database import get_async_session, read_session_router
+from main import app
+from app.repositories import UserRepository, PullRequestRepository
 from app.enums import UserRoleEnum
 
 
@@ -74,6 +80,82 @@ async def test_set_is_active_user_not_found(client: AsyncClient, db_session):
     assert json_response["detail"] == "User not found"
 
 
+@pytest.mark.asyncio
+async def test_deactivation_revokes_tokens(client: AsyncClient, db_session):
+    await add_user(db_session, "admin", "admin", UserRoleEnum.ADMIN)
+    user = await add_user(db_session, "testuser", "testpass", UserRoleEnum.USER)
+    admin_token = await get_access_token(client, "admin", "admin")
+    admin_headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await client.post(
+        "/auth/login", data={"username": "testuser", "password": "testpass"},
+    )
+    tokens = response.json()
+    user_headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    # токен успел попасть в кэш проверенных токенов
+    response = await client.get("/users/getReview", headers=user_headers)
+    assert response.status_code == 200
+
+    set_active_data = {"user_id": str(user.id), "is_active": False}
+    response = await client.post("/users/setIsActive", json=set_active_data,
+                                 headers=admin_headers)
+    assert response.status_code == 200
+
+    response = await client.get("/users/getReview", headers=user_headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token has been revoked"
+    response = await client.post(
+        "/auth/refresh", json={"refresh_token": tokens["refresh_token"]},
+    )
+    assert response.status_code == 401
+    response = await client.post(
+        "/auth/login", data={"username": "testuser", "password": "testpass"},
+    )
+    assert response.status_code == 401
+
+    # после повторной активации старые токены так и остаются отозванными
+    set_active_data["is_active"] = True
+    response = await client.post("/users/setIsActive", json=set_active_data,
+                                 headers=admin_headers)
+    assert response.status_code == 200
+    response = await client.get("/users/getReview", headers=user_headers)
+    assert response.status_code == 401
+    new_token = await get_access_token(client, "testuser", "testpass")
+    response = await client.get(
+        "/users/getReview", headers={"Authorization": f"Bearer {new_token}"},
+    )
+    assert response.status_code == 200
+
+    # реестр восстанавливается из БД, например при старте воркера
+    registry = TokenRevocationRegistry(VerifiedTokenCache())
+    registry.load(await UserRepository(db_session).get_token_generations())
+    assert registry.is_revoked(str(user.id), 0)
+    assert not registry.is_revoked(str(user.id), 1)
+
+
+@pytest.mark.asyncio
+async def test_token_generations_reload_keeps_concurrent_revoke():
+    registry = TokenRevocationRegistry(VerifiedTokenCache())
+    read, finish = asyncio.Event(), asyncio.Event()
+
+    async def loader():
+        # снимок из БД прочитан до отзыва
+        read.set()
+        await finish.wait()
+        return {"user": 1}
+
+    registry.loader = loader
+    registry.on_invalidation(None)
+    await read.wait()
+    registry.on_invalidation("user:2")
+    assert registry.reloading
+
+    finish.set()
+    await registry._reload_task
+    assert not registry.reloading
+    assert registry.is_revoked("user", 1)
+    assert not registry.is_revoked("user", 2)
+
+
 @pytest.mark.asyncio
 async def test_set_is_active_not_admin(client: AsyncClient, db_session):
     await add_user(db_session, "testuser1", "testpass", UserRoleEnum.USER)
@@ -134,3 +216,253 @@ async def test_get_review(client: AsyncClient, db_session):
     assert json_response["status"] is True
     assert isinstance(json_response["reviews_in"], list)
     assert json_response["user_id"] == str(user.id)
+
+
+@pytest.mark.asyncio
+async def test_get_review_pages(client: AsyncClient, db_session):
+    team = Team(name="backend")
+    db_session.add(team)
+    await db_session.commit()
+    await add_user(db_session, "author", "pass", UserRoleEnum.USER)
+    reviewer = await add_user(db_session, "reviewer", "pass", UserRoleEnum.USER)
+    await add_user(db_session, "admin", "admin", UserRoleEnum.ADMIN)
+    await db_session.execute(
+        User.__table__.update()
+        .where(User.username.in_(["author", "reviewer"]))
+        .values(team_id=team.id)
+    )
+    await db_session.commit()
+
+    author_headers = {"Authorization": "Bearer "
+                      + await get_access_token(client, "author", "pass")}
+    headers = {"Authorization": "Bearer "
+               + await get_access_token(client, "reviewer", "pass")}
+    created = []
+    for i in range(5):
+        response = await client.post("/pullRequest/create",
+                                     json={"name": f"feature-{i}"},
+                                     headers=author_headers)
+        assert response.status_code == 201
+        created.append(response.json()["pull_request"]["id"])
+    for pr_id in created[:2]:
+        response = await client.post("/pullRequest/merge", json={"id": pr_id},
+                                     headers=headers)
+        assert response.status_code == 200
+
+    # страницы от новых PR к старым, без повторов и пропусков
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = await client.get("/users/getReview", params=params,
+                                    headers=headers)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["reviews_in"]) <= 2
+        seen += [pr["id"] for pr in page["reviews_in"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == created[::-1]
+
+    response = await client.get("/users/getReview", headers=headers,
+                                params={"status": "MERGED"})
+    merged = response.json()["reviews_in"]
+    assert [pr["id"] for pr in merged] == created[1::-1]
+    assert all(pr["status"] == "MERGED" for pr in merged)
+    assert all(pr["reviewers"] for pr in merged)
+
+    admin_headers = {"Authorization": "Bearer "
+                     + await get_access_token(client, "admin", "admin")}
+    response = await client.get(f"/users/getReview/{reviewer.id}",
+                                params={"status": "OPEN", "limit": 2},
+                                headers=admin_headers)
+    page = response.json()
+    assert [pr["id"] for pr in page["reviews_in"]] == created[:1:-1][:2]
+    response = await client.get(f"/users/getReview/{reviewer.id}",
+                                params={"status": "OPEN",
+                                        "cursor": page["next_cursor"]},
+                                headers=admin_headers)
+    page = response.json()
+    assert [pr["id"] for pr in page["reviews_in"]] == created[2:3]
+    assert page["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("params, status_code", [
+    ({"cursor": "not-a-cursor"}, 400),
+    ({"limit": 0}, 422),
+    ({"status": "CLOSED"}, 422),
+])
+async def test_get_review_bad_params(client: AsyncClient, db_session,
+                                     params, status_code):
+    await add_user(db_session, "testuser", "testpass", UserRoleEnum.USER)
+    access_token = await get_access_token(client, "testuser", "testpass")
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    response = await client.get("/users/getReview", params=params,
+                                headers=headers)
+    assert response.status_code == status_code
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("method, path, body", [
+    ("post", "/users/setIsActive", {"user_id": str(uuid.uuid4()),
+                                    "is_active": False}),
+    ("get", f"/users/getReview/{uuid.uuid4()}", None),
+    ("get", f"/team/get/{uuid.uuid4()}", None),
+    ("post", "/team/add", {"name": "backend"}),
+])
+async def test_forbidden_request_opens_no_session(client: AsyncClient,
+                                                  db_session, monkeypatch,
+                                                  method, path, body):
+    await add_user(db_session, "testuser", "testpass", UserRoleEnum.USER)
+    access_token = await get_access_token(client, "testuser", "testpass")
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    opened = []
+
+    def counting(session_maker):
+        def open_session():
+            opened.append(session_maker)
+            return session_maker()
+        return open_session
+
+    write_session = app.dependency_overrides[get_async_session]
+
+    async def counting_write_session():
+        opened.append(get_async_session)
+        async for session in write_session():
+            yield session
+
+    app.dependency_overrides[get_async_session] = counting_write_session
+    monkeypatch.setattr(read_session_router, "primary",
+                        counting(read_session_router.primary))
+    monkeypatch.setattr(read_session_router, "replica",
+                        counting(read_session_router.replica))
+
+    kwargs = {"json": body} if body is not None else {}
+    response = await getattr(client, method)(path, headers=headers, **kwargs)
+    assert response.status_code == 403
+    # роль проверена до того, как репозиториям понадобилась сессия
+    assert opened == []
+
+
+async def add_team_with_members(db_session, name: str, usernames: list[str]
+                                ) -> tuple[Team, list[User]]:
+    team = Team(name=name)
+    db_session.add(team)
+    await db_session.commit()
+    members = []
+    for username in usernames:
+        user = await add_user(db_session, username, "pass", UserRoleEnum.USER)
+        user.team_id = team.id
+        members.append(user)
+    await db_session.commit()
+    return team, members
+
+
+@pytest.mark.asyncio
+async def test_deactivate_users_reassigns_open_reviews(client: AsyncClient,
+                                                       db_session):
+    await add_user(db_session, "admin", "admin", UserRoleEnum.ADMIN)
+    _, members = await add_team_with_members(
+        db_session, "backend", ["author"] + [f"reviewer{i}" for i in range(5)],
+    )
+    author, *reviewers = members
+    author_headers = {"Authorization": "Bearer "
+                      + await get_access_token(client, "author", "pass")}
+    response = await client.post(
+        "/pullRequest/createBatch", headers=author_headers,
+        json={"names": [f"feature-{i}" for i in range(8)]},
+    )
+    prs = [result["pull_request"] for result in response.json()["results"]]
+    leaving = {str(user.id) for user in reviewers[:2]}
+    # смерженный PR остаётся за прежними ревьюерами
+    merged = next(pr for pr in prs
+                  if leaving & {r["id"] for r in pr["reviewers"]})
+    merger = next(user for user in reviewers
+                  if str(user.id) == merged["reviewers"][0]["id"])
+    merger_headers = {"Authorization": "Bearer "
+                      + await get_access_token(client, merger.username, "pass")}
+    response = await client.post("/pullRequest/merge", json={"id": merged["id"]},
+                                 headers=merger_headers)
+    assert response.status_code == 200
+    stuck = sum(len(leaving & {r["id"] for r in pr["reviewers"]})
+                for pr in prs if pr["id"] != merged["id"])
+
+    admin_headers = {"Authorization": "Bearer "
+                     + await get_access_token(client, "admin", "admin")}
+    response = await client.post("/users/deactivate", headers=admin_headers,
+                                 json={"user_ids": sorted(leaving)})
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert set(result["deactivated_user_ids"]) == leaving
+    assert result["reassigned_count"] == stuck
+    assert result["not_reassigned_pr_ids"] == []
+
+    active = {str(user.id) for user in reviewers} - leaving
+    for pr in prs:
+        pr_now = await PullRequestRepository(db_session).get_pull_request_by_id(
+            pr["id"]
+        )
+        ids = [reviewer.id for reviewer in pr_now.reviewers]
+        assert len(ids) == len(set(ids)) == 2
+        if pr["id"] == merged["id"]:
+            assert set(ids) == {r["id"] for r in merged["reviewers"]}
+        else:
+            assert set(ids) <= active
+
+    response = await client.post("/auth/login",
+                                 data={"username": "reviewer0", "password": "pass"})
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_deactivate_users_reports_stuck_reviews(client: AsyncClient,
+                                                      db_session):
+    await add_user(db_session, "admin", "admin", UserRoleEnum.ADMIN)
+    team, members = await add_team_with_members(
+        db_session, "backend", ["author", "reviewer0", "reviewer1"],
+    )
+    author_headers = {"Authorization": "Bearer "
+                      + await get_access_token(client, "author", "pass")}
+    response = await client.post("/pullRequest/create", json={"name": "feature"},
+                                 headers=author_headers)
+    pr = response.json()["pull_request"]
+    assert len(pr["reviewers"]) == 2
+
+    admin_headers = {"Authorization": "Bearer "
+                     + await get_access_token(client, "admin", "admin")}
+    # единственный оставшийся участник - автор, переназначить некому
+    response = await client.post("/users/deactivate", headers=admin_headers,
+                                 json={"user_ids": [str(members[1].id)]})
+    assert response.status_code == 200
+    assert response.json()["reassigned_count"] == 0
+    assert response.json()["not_reassigned_pr_ids"] == [pr["id"]]
+
+    response = await client.post("/users/deactivate", headers=admin_headers,
+                                 json={"team_id": str(team.id)})
+    assert response.status_code == 200
+    result = response.json()
+    assert set(result["deactivated_user_ids"]) == {str(user.id)
+                                                   for user in members}
+    assert result["not_reassigned_pr_ids"] == [pr["id"]]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("body, status_code", [
+    ({"user_ids": [str(uuid.uuid4())]}, 404),
+    ({"team_id": str(uuid.uuid4())}, 404),
+    ({}, 422),
+    ({"user_ids": [str(uuid.uuid4())], "team_id": str(uuid.uuid4())}, 422),
+    ({"user_ids": []}, 422),
+])
+async def test_deactivate_users_bad_request(client: AsyncClient, db_session,
+                                            body, status_code):
+    await add_user(db_session, "admin", "admin", UserRoleEnum.ADMIN)
+    access_token = await get_access_token(client, "admin", "admin")
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    response = await client.post("/users/deactivate", json=body,
+                                 headers=headers)
+    assert response.status_code == status_code
@@ -0,0 +1,40 @@
+import base64
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config.config import DOCS_USERNAME, DOCS_PASSWORD
+
+
+def basic_auth(username: str, password: str) -> dict:
+    credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
+    return {"Authorization": f"Basic {credentials}"}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("headers", [
+    {},
+    {"Authorization": "Bearer token"},
+    {"Authorization": "Basic not-base64!"},
+    basic_auth(DOCS_USERNAME, "wrong"),
+    basic_auth("wrong", DOCS_PASSWORD),
+])
+async def test_docs_require_credentials(client: AsyncClient, headers: dict):
+    for path in ("/docs", "/redoc", "/openapi.json"):
+        response = await client.get(path, headers=headers)
+        assert response.status_code == 401
+        assert response.headers["WWW-Authenticate"] == 'Basic realm="Swagger UI"'
+
+
+@pytest.mark.asyncio
+async def test_docs_with_credentials(client: AsyncClient):
+    headers = basic_auth(DOCS_USERNAME, DOCS_PASSWORD)
+    response = await client.get("/openapi.json", headers=headers)
+    assert response.status_code == 200
+    assert "paths" in response.json()
+
+
+@pytest.mark.asyncio
+async def test_other_paths_pass_through(client: AsyncClient):
+    response = await client.get("/health/check")
+    assert response.status_code == 200
@@ -1,10 +1,15 @@
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 
-from app.core.config.config import TEST_ASYNC_DATABASE_URL
+from app.core.config.config import (
+    TEST_ASYNC_DATABASE_URL, TEST_REPLICA_ASYNC_DATABASE_URL,
+    TEST_REPLICA_DB_USER_NAME, TEST_REPLICA_DB_PASSWORD,
+)
 from main import app
-from app.database.database import Base, get_async_session
+from app.core.security import token_revocation
+from app.database.database import Base, get_async_session, read_session_router
 
 
 @pytest_asyncio.fixture(scope="function")
@@ -17,6 +22,16 @@ async def test_engine():
         await engine.dispose()
 
 
+@pytest_asyncio.fixture(scope="function")
+async def test_replica_engine():
+    """Движок "реплики": та же тестовая БД, но под ролью только для чтения"""
+    engine = create_async_engine(TEST_REPLICA_ASYNC_DATABASE_URL, echo=False)
+    try:
+        yield engine
+    finally:
+        await engine.dispose()
+
+
 @pytest_asyncio.fixture(scope="function")
 def TestSessionLocal(test_engine):
     """Создаём sessionmaker в том же цикле (не async)."""
@@ -27,12 +42,38 @@ def TestSessionLocal(test_engine):
     )
 
 
+@pytest_asyncio.fixture(scope="function")
+def TestReadSessionLocal(test_replica_engine):
+    return async_sessionmaker(
+        bind=test_replica_engine,
+        class_=AsyncSession,
+        expire_on_commit=False
+    )
+
+
 @pytest_asyncio.fixture(scope="function")
 async def db_session(test_engine, TestSessionLocal):
     """Создаёт таблицы перед тестом и удаляет после"""
     # Создаём все таблицы
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        # роль "реплики" видит таблицы, но не может в них писать
+        await conn.execute(text(
+            f"DO $$ BEGIN "
+            f"IF NOT EXISTS (SELECT FROM pg_roles "
+            f"WHERE rolname = '{TEST_REPLICA_DB_USER_NAME}') THEN "
+            f"CREATE ROLE {TEST_REPLICA_DB_USER_NAME} LOGIN "
+            f"PASSWORD '{TEST_REPLICA_DB_PASSWORD}'; "
+            f"END IF; END $$"
+        ))
+        await conn.execute(text(
+            f"ALTER ROLE {TEST_REPLICA_DB_USER_NAME} "
+            f"SET default_transaction_read_only = on"
+        ))
+        await conn.execute(text(
+            f"GRANT SELECT ON ALL TABLES IN SCHEMA public "
+            f"TO {TEST_REPLICA_DB_USER_NAME}"
+        ))
 
     # Возвращаем сессию для теста
     async with TestSessionLocal() as session:
@@ -44,13 +85,19 @@ async def db_session(test_engine, TestSessionLocal):
 
 
 @pytest_asyncio.fixture
-async def client(db_session, TestSessionLocal):
+async def client(db_session, TestSessionLocal, TestReadSessionLocal,
+                 monkeypatch):
     """HTTP-клиент с подменой БД"""
     async def override_get_async_session():
         async with TestSessionLocal() as session:
             yield session
 
     app.dependency_overrides[get_async_session] = override_get_async_session
+    # читающие эндпоинты идут в "реплику", пишущие - в основную роль
+    monkeypatch.setattr(read_session_router, "primary", TestSessionLocal)
+    monkeypatch.setattr(read_session_router, "replica", TestReadSessionLocal)
+    monkeypatch.setattr(read_session_router, "_pinned_until", {})
+    monkeypatch.setattr(token_revocation, "_generations", {})
     try:
         async with AsyncClient(
                 base_url="http://test",
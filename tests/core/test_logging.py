@@ -0,0 +1,180 @@
+import io
+import json
+import logging
+import threading
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config.logging import (
+    JsonFormatter, LogQueue, RequestContextFilter, SamplingFilter,
+)
+from app.core.config.lprint import lprint
+from app.core.security import PasswordUtils
+from app.database import Team, User
+from app.enums import UserRoleEnum
+
+
+class GatedHandler(logging.Handler):
+    """Обработчик, который пишет, только когда его отпустят"""
+
+    def __init__(self):
+        super().__init__()
+        self.gate = threading.Event()
+        self.messages = []
+
+    def emit(self, record):
+        self.gate.wait()
+        self.messages.append(record.getMessage())
+
+
+def queued_logger(name: str, log_queue: LogQueue) -> tuple[logging.Logger,
+                                                           GatedHandler]:
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = GatedHandler()
+    logger.handlers = [handler]
+    log_queue.install([logger])
+    return logger, handler
+
+
+def test_log_queue_drops_when_full():
+    log_queue = LogQueue(maxsize=2, policy="drop")
+    logger, handler = queued_logger("test_log_queue_drop", log_queue)
+
+    writer = threading.Thread(
+        target=lambda: [logger.info("record %s", i) for i in range(20)]
+    )
+    writer.start()
+    writer.join(timeout=5)
+    # обработчик стоит, но логирующий поток не ждал его
+    assert not writer.is_alive()
+    assert handler.messages == []
+    dropped = log_queue.stats()["dropped"]
+    assert dropped > 0
+
+    handler.gate.set()
+    log_queue.stop()
+    # всё, что попало в очередь, дописано при остановке
+    assert len(handler.messages) + dropped == 20
+    assert logger.handlers == [handler]
+
+
+def test_log_queue_blocks_when_full():
+    log_queue = LogQueue(maxsize=1, policy="block")
+    logger, handler = queued_logger("test_log_queue_block", log_queue)
+
+    writer = threading.Thread(
+        target=lambda: [logger.info("record %s", i) for i in range(5)]
+    )
+    writer.start()
+    writer.join(timeout=0.2)
+    assert writer.is_alive()
+
+    handler.gate.set()
+    writer.join(timeout=5)
+    log_queue.stop()
+    assert handler.messages == [f"record {i}" for i in range(5)]
+
+
+def test_log_queue_keeps_exception_for_json_formatter():
+    log_queue = LogQueue(maxsize=10, policy="block")
+    logger = logging.getLogger("test_log_queue_exception")
+    logger.propagate = False
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter(datefmt="%Y-%m-%d %H:%M:%S"))
+    logger.handlers = [handler]
+    log_queue.install([logger])
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        logger.exception("failed %s", "request", stack_info=True)
+    log_queue.stop()
+
+    entry = json.loads(stream.getvalue())
+    # traceback в своём поле, а не вклеен в сообщение
+    assert entry["message"] == "failed request"
+    assert entry["exception"].startswith("Traceback")
+    assert "ZeroDivisionError" in entry["exception"]
+    assert "Stack (most recent call last)" in entry["stack"]
+
+
+def make_record(name: str = "APP_LOGGER", level: int = logging.INFO,
+                msg: str = "message", module: str = "team_repository"
+                ) -> logging.LogRecord:
+    return logging.LogRecord(name, level, f"/app/{module}.py", 1, msg,
+                             None, None, func="get_team_by_id")
+
+
+def test_json_formatter_escapes_message():
+    line = JsonFormatter().format(
+        make_record(msg='Team "backend"\nfound: C:\\teams')
+    )
+    entry = json.loads(line)
+    assert entry["message"] == 'Team "backend"\nfound: C:\\teams'
+    assert entry["level"] == "INFO"
+    assert entry["function"] == "get_team_by_id"
+
+
+def test_sampling_filter():
+    sampling = SamplingFilter({"team_repository": 0.0, "uvicorn": 0.0})
+    assert not sampling.filter(make_record())
+    assert not sampling.filter(make_record(name="uvicorn.access",
+                                           module="h11_impl"))
+    assert sampling.filter(make_record(module="user_repository"))
+    # предупреждения и ошибки не выбрасываются
+    assert sampling.filter(make_record(level=logging.WARNING))
+
+    # решение одно на запись, сколько бы обработчиков её ни проверяло
+    half = SamplingFilter({"team_repository": 0.5})
+    record = make_record()
+    assert len({half.filter(record) for _ in range(50)}) == 1
+
+
+class CaptureHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.addFilter(RequestContextFilter())
+        self.setFormatter(JsonFormatter())
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(json.loads(self.format(record)))
+
+
+@pytest.mark.asyncio
+async def test_request_context_in_json_logs(client: AsyncClient, db_session):
+    team = Team(name="backend")
+    db_session.add(team)
+    await db_session.flush()
+    db_session.add(User(username="testuser", role=UserRoleEnum.USER,
+                        hashed_password=PasswordUtils.hash_password("pass")[0],
+                        team_id=team.id))
+    await db_session.commit()
+    response = await client.post(
+        "/auth/login", data={"username": "testuser", "password": "pass"},
+    )
+    tokens = response.json()
+
+    handler = CaptureHandler()
+    lprint.logger.addHandler(handler)
+    try:
+        response = await client.get(
+            "/team/get",
+            headers={"Authorization": f"Bearer {tokens['access_token']}",
+                     "X-Request-ID": "req-42"},
+        )
+    finally:
+        lprint.logger.removeHandler(handler)
+
+    assert response.status_code == 200
+    assert response.headers["X-Request-ID"] == "req-42"
+    entry = next(line for line in handler.lines
+                 if line["message"].startswith("Team found by"))
+    assert entry["request_id"] == "req-42"
+    assert entry["method"] == "GET"
+    assert entry["route"] == "/team/get"
+    assert entry["user_id"] == tokens["user_id"]
+    assert entry["duration_ms"] >= 0
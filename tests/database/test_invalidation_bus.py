@@ -0,0 +1,104 @@
+import asyncio
+import uuid
+
+import asyncpg
+import pytest
+
+from app.core.config.config import TEST_ASYNC_DATABASE_URL
+from app.database.invalidation import (
+    TEAM_TOPIC, InProcessInvalidationBus, PostgresInvalidationBus,
+)
+from app.schemas import TeamOut
+from app.services.team_roster_cache import TeamRosterCache
+
+
+def make_worker(bus) -> TeamRosterCache:
+    """Кэш одного "воркера", подписанный на его шину"""
+    cache = TeamRosterCache(max_size=16, ttl_seconds=60)
+    bus.subscribe(TEAM_TOPIC, cache.on_invalidation)
+    return cache
+
+
+def make_team() -> TeamOut:
+    return TeamOut(id=str(uuid.uuid4()), name="backend", members=[])
+
+
+async def wait_for(condition, timeout: float = 5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_in_process_bus_invalidates_local_cache():
+    bus = InProcessInvalidationBus()
+    cache = make_worker(bus)
+    team = make_team()
+    cache.put(team)
+
+    await bus.publish(TEAM_TOPIC, team.id)
+    assert cache.get(team.id) is None
+    assert bus.stats()["published"] == 1
+
+
+@pytest.mark.asyncio
+async def test_postgres_bus_between_workers():
+    channel = f"test_invalidation_{uuid.uuid4().hex}"
+    first = PostgresInvalidationBus(TEST_ASYNC_DATABASE_URL, channel)
+    second = PostgresInvalidationBus(TEST_ASYNC_DATABASE_URL, channel)
+    first_cache, second_cache = make_worker(first), make_worker(second)
+    other_team = make_team()
+    await first.start()
+    await second.start()
+    try:
+        team = make_team()
+        for cache in (first_cache, second_cache):
+            cache.put(team)
+            cache.put(other_team)
+
+        await first.publish(TEAM_TOPIC, team.id)
+        # у публикующего воркера сброс синхронный
+        assert first_cache.get(team.id) is None
+        await wait_for(lambda: second.received == 1)
+        assert second_cache.get(team.id) is None
+        assert second_cache.get(other_team.id) is not None
+        assert first.received == 0
+        assert second.stats()["latency_max_ms"] > 0
+    finally:
+        await first.stop()
+        await second.stop()
+
+
+@pytest.mark.asyncio
+async def test_postgres_bus_flushes_after_reconnect():
+    channel = f"test_invalidation_{uuid.uuid4().hex}"
+    bus = PostgresInvalidationBus(TEST_ASYNC_DATABASE_URL, channel,
+                                  reconnect_delay=0.05)
+    publisher = PostgresInvalidationBus(TEST_ASYNC_DATABASE_URL, channel)
+    cache = make_worker(bus)
+    team = make_team()
+    cache.put(team)
+    await bus.start()
+    try:
+        # рвём соединение слушателя на стороне сервера
+        conn = await asyncpg.connect(bus.dsn)
+        try:
+            await conn.execute("SELECT pg_terminate_backend($1)",
+                               bus._listen_conn.get_server_pid())
+        finally:
+            await conn.close()
+
+        await wait_for(lambda: bus.reconnects == 1)
+        assert bus.connected
+        assert bus.full_flushes == 1
+        assert cache.get(team.id) is None
+
+        # после переподключения сообщения снова доходят
+        cache.put(team)
+        await publisher.publish(TEAM_TOPIC, team.id)
+        await wait_for(lambda: bus.received == 1)
+        assert cache.get(team.id) is None
+    finally:
+        await bus.stop()
+        await publisher.stop()
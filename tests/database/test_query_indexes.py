@@ -0,0 +1,150 @@
+import contextlib
+
+import pytest
+from sqlalchemy import event
+
+from app.database import User, Team
+from app.enums import UserRoleEnum
+from app.repositories import (
+    UserRepository, PullRequestRepository, TeamRepository,
+)
+
+
+async def seed(db_session) -> tuple[Team, list[User], list[str]]:
+    """Команда из 4 человек и 3 открытых PR автора members[0]"""
+    team = Team(name="backend")
+    db_session.add(team)
+    await db_session.commit()
+    members = [
+        User(username=f"user{i}", hashed_password="x",
+             role=UserRoleEnum.USER, team_id=team.id)
+        for i in range(4)
+    ]
+    db_session.add_all(members)
+    await db_session.commit()
+    pr_repo = PullRequestRepository(db_session)
+    pr_ids = []
+    for i in range(3):
+        pr = await pr_repo.create_pull_request(
+            name=f"pr-{i}", author_id=str(members[0].id),
+            reviewers=[str(members[1].id), str(members[2].id)],
+        )
+        pr_ids.append(str(pr.id))
+    return team, members, pr_ids
+
+
+@contextlib.contextmanager
+def captured(db_session):
+    """SQL, который репозиторий отправил в БД, с параметрами"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters,
+                              context, executemany):
+        if not executemany:
+            statements.append((statement, parameters))
+
+    engine = db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+async def plans(db_session, statements) -> list[str]:
+    """EXPLAIN каждого запроса при запрещённом seq scan
+
+    В маленьких тестовых таблицах планировщик и так предпочёл бы seq
+    scan, поэтому он запрещается: если индекс для запроса подходит,
+    план его покажет.
+    """
+    result = []
+    async with db_session.bind.connect() as conn:
+        await conn.exec_driver_sql("SET enable_seqscan = off")
+        for statement, parameters in statements:
+            rows = await conn.exec_driver_sql("EXPLAIN " + statement,
+                                              parameters)
+            result.append("\n".join(row[0] for row in rows))
+    return result
+
+
+def uses(plans_: list[str], index: str) -> bool:
+    return any(f" {index} " in plan for plan in plans_)
+
+
+@pytest.mark.asyncio
+async def test_sample_reviewers_uses_team_and_open_review_indexes(db_session):
+    _, members, _ = await seed(db_session)
+    with captured(db_session) as statements:
+        await UserRepository(db_session).sample_reviewer_ids(
+            author_id=str(members[0].id), need_count=2, max_open_reviews=5,
+        )
+    found = await plans(db_session, statements)
+    assert uses(found, "user_team_id_idx")
+    assert uses(found, "reviewer_pr_assignment_open_user_idx")
+
+
+@pytest.mark.asyncio
+async def test_team_open_reviews_uses_team_and_open_review_indexes(
+        db_session):
+    team, _, _ = await seed(db_session)
+    with captured(db_session) as statements:
+        await UserRepository(db_session).get_team_open_reviews(str(team.id))
+    found = await plans(db_session, statements)
+    assert uses(found, "user_team_id_idx")
+    assert uses(found, "reviewer_pr_assignment_open_user_idx")
+
+
+@pytest.mark.asyncio
+async def test_team_members_use_team_index(db_session):
+    team, _, _ = await seed(db_session)
+    with captured(db_session) as statements:
+        await TeamRepository(db_session).get_team_by_id(str(team.id))
+    assert uses(await plans(db_session, statements), "user_team_id_idx")
+
+
+@pytest.mark.asyncio
+async def test_pull_request_reviewers_use_pr_id_index(db_session):
+    _, _, pr_ids = await seed(db_session)
+    with captured(db_session) as statements:
+        await PullRequestRepository(db_session).get_pull_request_by_id(
+            pr_ids[0],
+        )
+    assert uses(await plans(db_session, statements),
+                "reviewer_pr_assignment_pr_id_idx")
+
+
+@pytest.mark.asyncio
+async def test_pull_request_by_author_uses_author_name_index(db_session):
+    _, members, _ = await seed(db_session)
+    with captured(db_session) as statements:
+        await PullRequestRepository(
+            db_session
+        ).get_pull_request_by_name_and_author(
+            name="pr-0", author_id=str(members[0].id),
+        )
+    assert uses(await plans(db_session, statements),
+                "pull_request_author_id_name_key")
+
+
+@pytest.mark.asyncio
+async def test_merge_uses_pr_id_index(db_session):
+    _, members, pr_ids = await seed(db_session)
+    with captured(db_session) as statements:
+        await PullRequestRepository(db_session).merge_pull_request(
+            pr_id=pr_ids[0], user_id=str(members[1].id),
+        )
+    assert uses(await plans(db_session, statements),
+                "reviewer_pr_assignment_pr_id_idx")
+
+
+@pytest.mark.asyncio
+async def test_deactivation_uses_team_and_open_review_indexes(db_session):
+    team, _, _ = await seed(db_session)
+    with captured(db_session) as statements:
+        await UserRepository(db_session).deactivate_users(
+            team_id=str(team.id),
+        )
+    found = await plans(db_session, statements)
+    assert uses(found, "user_team_id_idx")
+    assert uses(found, "reviewer_pr_assignment_open_user_idx")